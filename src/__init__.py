@@ -0,0 +1,12 @@
+from .functions import (
+    load_data,
+    groupby_aggregate,
+    groupby_aggregate_multi,
+    filter_by_value,
+    groupby_size,
+    save_table_image,
+    save_histogram_image,
+    generate_pdf,
+    export_table,
+    export_workbook,
+)
@@ -0,0 +1,343 @@
+"""
+Mode lot : le rapport complet exécuté sur plusieurs fichiers d'entrée dans un pool de processus.
+
+Chaque fichier (dossier ou motif glob, tout format lu par DataLoader) est traité dans
+son propre processus : chargement, réponses à QUESTIONS (planner.run_questions), puis
+images et PDF écrits dans un dossier de sortie propre au fichier :
+
+    <sortie>/<nom du fichier>/tables/Q1.png, charts/Q4.png, reports/rapport_statistiques.pdf
+    <sortie>/consolidated/...      rapport consolidé (--consolidate), colonne REGION en tête
+    <sortie>/summary.csv           temps par étape et pic mémoire de chaque fichier
+
+Les exécutions ne partagent ni cache de rendu, ni état d'agrégats, ni base SQL : plusieurs
+fichiers (ou plusieurs lots) peuvent donc tourner en même temps sans s'écraser.
+
+Chaque fichier est traité dans un processus neuf (pic mémoire mesuré par fichier), limité
+à --max-memory-mb Mo d'espace d'adressage si demandé : un fichier trop gros échoue seul,
+avec son erreur dans le résumé, sans interrompre les autres.
+
+Lancement : python batch.py ../data/input/regions --workers 4 --consolidate (depuis src/),
+ou python -m src.batch "data/input/*.csv"
+"""
+
+# === IMPORTS ===
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd          # Pour la manipulation des données tabulaires
+try:
+    import resource          # Limite mémoire et pic mémoire des processus (POSIX)
+except ImportError:          # Windows : pas de limite mémoire, pic mémoire non mesuré
+    resource = None
+try:
+    from . import functions as fn
+    from . import planner
+    from .config import (LOAD_PROFILE, QUARTER_AS_INT, PDF_ENGINE, BATCH_WORKERS, BATCH_MAX_MEMORY_MB,
+                         BATCH_OUTPUT_DIR, DATE_COL, YEAR_COL, QUARTER_COL, QUESTIONS)
+    from .data_processing.loader import DataLoader
+except ImportError:  # exécution directe depuis src/ (python batch.py)
+    import functions as fn
+    import planner
+    from config import (LOAD_PROFILE, QUARTER_AS_INT, PDF_ENGINE, BATCH_WORKERS, BATCH_MAX_MEMORY_MB,
+                        BATCH_OUTPUT_DIR, DATE_COL, YEAR_COL, QUARTER_COL, QUESTIONS)
+    from data_processing.loader import DataLoader
+
+
+REGION_COL = "REGION"
+REPORT_NAME = "rapport_statistiques.pdf"
+CONSOLIDATED_DIR = "consolidated"
+SUMMARY_FIELDS = ("input", "status", "rows", "load_s", "questions_s", "render_s", "total_s", "peak_memory_mb",
+                  "output_dir", "error")
+
+
+# === ENTRÉES ===
+def resolve_inputs(patterns: list[str]) -> list[str]:
+    """
+    Fichiers d'entrée d'un lot, triés et sans doublon.
+
+    Params:
+        patterns (list[str]): dossiers (tous leurs fichiers d'extension lue par DataLoader),
+            motifs glob ("../data/input/*.csv") ou chemins de fichiers
+
+    Returns:
+        list[str]: chemins des fichiers (les fichiers de verrou Excel "~$..." sont ignorés)
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(os.path.join(pattern, name) for name in os.listdir(pattern))
+        elif glob.escape(pattern) != pattern:
+            paths.extend(glob.glob(pattern))
+        else:
+            paths.append(pattern)  # fichier explicite : s'il manque, l'erreur figure dans le résumé
+    inputs = {os.path.normpath(path) for path in paths
+              if os.path.splitext(path)[1].lower() in DataLoader.SUPPORTED_EXTENSIONS
+              and not os.path.basename(path).startswith("~$")}
+    return sorted(inputs)
+
+def output_dirs(inputs: list[str], output_root: str) -> dict:
+    """
+    Dossier de sortie de chaque fichier : <output_root>/<nom sans extension>. Quand deux
+    fichiers portent le même nom (nord.csv / nord.xlsx, est/ventes.xlsx / ouest/ventes.xlsx),
+    le dossier reprend leur chemin relatif au dossier commun (nord_csv, est_ventes_xlsx),
+    puis un suffixe numérique si besoin : deux fichiers n'ont jamais le même dossier.
+
+    Returns:
+        dict: {chemin du fichier: dossier de sortie}
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in inputs]
+    dirs, used = {}, set()
+    for path, stem in zip(inputs, stems):
+        name = stem
+        if stems.count(stem) > 1:
+            same = [os.path.abspath(other) for other, other_stem in zip(inputs, stems) if other_stem == stem]
+            relative = os.path.relpath(os.path.abspath(path), os.path.commonpath(same))
+            name = re.sub(r"[^\w-]+", "_", relative).strip("_")
+        unique, suffix = name, 2
+        while unique.lower() in used:
+            unique, suffix = f"{name}_{suffix}", suffix + 1
+        used.add(unique.lower())
+        dirs[path] = os.path.join(output_root, unique)
+    return dirs
+
+
+# === TRAITEMENT D'UN FICHIER ===
+def load_input(path: str) -> pd.DataFrame:
+    """Charge un fichier d'entrée (DataLoader + profil compact) et ajoute année et trimestre."""
+    with DataLoader(path, profile=LOAD_PROFILE) as loader:
+        return fn.add_date_parts(loader.load_data(), DATE_COL, YEAR_COL, QUARTER_COL, QUARTER_AS_INT)
+
+def write_report(results: dict, output_dir: str, pdf_engine: str = PDF_ENGINE) -> str:
+    """
+    Images (tables/, charts/) et PDF (reports/) des résultats dans output_dir, rendus
+    dans le processus courant (un processus de lot ne crée pas de pool de rendu).
+
+    Returns:
+        str: chemin du PDF
+    """
+    pdf_path = os.path.join(output_dir, "reports", REPORT_NAME)
+    jobs = fn.report_jobs(results, QUESTIONS, QUARTER_COL, output_dir)
+    native_pdf = pdf_engine == "reportlab"
+    fn.render_figures(jobs, None if native_pdf else pdf_path, workers=1)
+    if native_pdf:
+        fn.write_pdf_report(pdf_path, jobs)
+    return pdf_path
+
+def export_results(results: dict, output_dir: str, export_format: str) -> None:
+    """Exporte les résultats bruts dans output_dir/results (comme --format de main.py)."""
+    results_dir = os.path.join(output_dir, "results")
+    if export_format in ("xlsx", "ods"):
+        fn.export_workbook(os.path.join(results_dir, f"resultats.{export_format}"), results, [QUARTER_COL])
+    else:
+        for qid, result in results.items():
+            fn.export_table(result, os.path.join(results_dir, f"{qid}.{export_format}"), [QUARTER_COL])
+
+def peak_memory_mb() -> float | None:
+    """Pic de mémoire résidente du processus courant en Mo (None si non mesurable)."""
+    if resource is None:
+        return None
+    # ru_maxrss : Ko sous Linux, octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+def process_input(task: dict) -> dict:
+    """
+    Exécuté dans un processus du lot : charge un fichier, répond à QUESTIONS puis
+    écrit son rapport (ou ses résultats bruts) dans son dossier de sortie.
+
+    Params:
+        task (dict): {"input", "output_dir", "render" (bool), "export_format" (str | None),
+            "keep_results" (bool : renvoyer les résultats pour le rapport consolidé)}
+
+    Returns:
+        dict: ligne du résumé (SUMMARY_FIELDS), plus "results" si keep_results ;
+            une erreur (fichier illisible, mémoire insuffisante...) est rapportée dans
+            "status" / "error" au lieu d'être levée
+    """
+    summary = {"input": task["input"], "output_dir": task["output_dir"], "status": "ok", "rows": None,
+               "load_s": None, "questions_s": None, "render_s": None, "error": None}
+    start = time.perf_counter()
+    try:
+        df = load_input(task["input"])
+        summary["rows"] = len(df)
+        summary["load_s"] = round(time.perf_counter() - start, 3)
+
+        step = time.perf_counter()
+        results = planner.run_questions(df, QUESTIONS, YEAR_COL)
+        del df
+        summary["questions_s"] = round(time.perf_counter() - step, 3)
+
+        step = time.perf_counter()
+        if task.get("export_format"):
+            export_results(results, task["output_dir"], task["export_format"])
+        elif task.get("render", True):
+            write_report(results, task["output_dir"])
+        summary["render_s"] = round(time.perf_counter() - step, 3)
+        if task.get("keep_results"):
+            summary["results"] = results
+    except MemoryError:
+        summary.update(status="error", error="mémoire insuffisante (voir --max-memory-mb)")
+    except Exception as e:
+        summary.update(status="error", error=f"{type(e).__name__}: {e}")
+        traceback.print_exc()
+    summary["total_s"] = round(time.perf_counter() - start, 3)
+    summary["peak_memory_mb"] = peak_memory_mb()
+    return summary
+
+
+# === POOL ===
+def _init_batch_worker(max_memory_mb: int | None) -> None:
+    """
+    Initialise un processus du lot : backend matplotlib non interactif et, si demandé,
+    espace d'adressage limité à max_memory_mb Mo (une allocation au-delà lève MemoryError).
+    """
+    os.environ["MPLBACKEND"] = "Agg"
+    if max_memory_mb is not None and resource is not None:
+        limit = int(max_memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+def run_batch(inputs: list[str], output_root: str = BATCH_OUTPUT_DIR, workers: int | None = BATCH_WORKERS,
+              max_memory_mb: int | None = BATCH_MAX_MEMORY_MB, render: bool = True,
+              export_format: str | None = None, consolidate: bool = False) -> list[dict]:
+    """
+    Traite chaque fichier d'entrée dans un pool de processus.
+
+    Params:
+        inputs (list[str]): fichiers d'entrée (voir resolve_inputs)
+        output_root (str): dossier racine ; un sous-dossier par fichier (voir output_dirs)
+        workers (int | None): processus simultanés (None = nombre de cœurs) ; avec 1 et sans
+            limite mémoire, les fichiers sont traités dans le processus courant
+        max_memory_mb (int | None): espace d'adressage maximal de chaque processus, en Mo
+        render (bool): générer images et PDF (False : seulement calculer)
+        export_format (str | None): exporter les résultats bruts (csv, json, xlsx, ods)
+            au lieu de les dessiner
+        consolidate (bool): écrire aussi le rapport consolidé de tous les fichiers
+            dans <output_root>/consolidated (voir consolidate_results)
+
+    Returns:
+        list[dict]: une ligne de résumé par fichier (SUMMARY_FIELDS), dans l'ordre de inputs
+    """
+    dirs = output_dirs(inputs, output_root)
+    tasks = [{"input": path, "output_dir": dirs[path], "render": render, "export_format": export_format,
+              "keep_results": consolidate} for path in inputs]
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+
+    summaries = None
+    if workers > 1 or max_memory_mb is not None:
+        try:
+            # un processus neuf par fichier (spawn, max_tasks_per_child=1) : pic mémoire propre
+            # à chaque fichier et mémoire rendue au système entre deux fichiers
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_batch_worker, initargs=(max_memory_mb,),
+                                     max_tasks_per_child=1) as pool:
+                summaries = list(pool.map(process_input, tasks))
+        except (OSError, NotImplementedError):
+            # pool indisponible (ex. pas de sémaphores POSIX) : traitement séquentiel
+            summaries = None
+    if summaries is None:
+        summaries = [process_input(task) for task in tasks]
+
+    if consolidate:
+        results = {os.path.basename(summary["output_dir"]): summary.pop("results")
+                   for summary in summaries if "results" in summary}
+        if results:
+            write_consolidated(results, os.path.join(output_root, CONSOLIDATED_DIR), render, export_format)
+    return summaries
+
+
+# === RAPPORT CONSOLIDÉ ===
+def consolidate_results(results_by_region: dict) -> dict:
+    """
+    Réunit les résultats de plusieurs fichiers, question par question.
+
+    Params:
+        results_by_region (dict): {région (nom du fichier): {id de question: DataFrame}}
+
+    Returns:
+        dict: {id de question: DataFrame}, avec une colonne REGION_COL en tête (exportée
+            et dessinée comme les autres colonnes) ; les questions absentes d'un fichier
+            sont ignorées pour ce fichier
+    """
+    consolidated = {}
+    for qid in QUESTIONS:
+        frames = []
+        for region, results in results_by_region.items():
+            if qid in results:
+                frame = results[qid].reset_index(drop=True)
+                # colonnes MultiIndex (agg_dict, ex. Q6) : ("REGION", "") comme ("SELLER", "")
+                column = (REGION_COL,) + ("",) * (frame.columns.nlevels - 1) if frame.columns.nlevels > 1 \
+                    else REGION_COL
+                frame.insert(0, column, region)
+                frames.append(frame)
+        if frames:
+            consolidated[qid] = pd.concat(frames, ignore_index=True)
+    return consolidated
+
+def write_consolidated(results_by_region: dict, output_dir: str, render: bool = True,
+                       export_format: str | None = None) -> None:
+    """
+    Écrit le rapport consolidé : classeur resultats.xlsx (une feuille par question,
+    toutes régions), et rapport PDF + images sauf si render est faux.
+    """
+    results = consolidate_results(results_by_region)
+    export_results(results, output_dir, export_format or "xlsx")
+    if render and not export_format:
+        write_report(results, output_dir)
+
+
+# === RÉSUMÉ ===
+def write_summary(summaries: list[dict], path: str) -> None:
+    """Écrit le résumé par fichier (SUMMARY_FIELDS) en CSV."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(summaries)
+
+def print_summary(summaries: list[dict], wall_s: float) -> None:
+    """Affiche le tableau des temps par fichier et le total du lot."""
+    table = pd.DataFrame(summaries, columns=SUMMARY_FIELDS).drop(columns=["output_dir"])
+    table["input"] = table["input"].map(os.path.basename)
+    table["error"] = table["error"].fillna("")
+    print(table.to_string(index=False, na_rep="-"))
+    failed = int((table["status"] != "ok").sum())
+    print(f"\n{len(table)} fichier(s), {failed} en échec - durée totale {wall_s:.2f} s "
+          f"(somme des fichiers {table['total_s'].sum():.2f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapport des ventes sur plusieurs fichiers (pool de processus)")
+    parser.add_argument("inputs", nargs="+", help="dossiers, motifs glob ou fichiers d'entrée")
+    parser.add_argument("--output", default=BATCH_OUTPUT_DIR, help="dossier racine des sorties")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="processus simultanés (défaut : nombre de cœurs)")
+    parser.add_argument("--max-memory-mb", type=int, default=BATCH_MAX_MEMORY_MB,
+                        help="espace d'adressage maximal de chaque processus (Mo)")
+    parser.add_argument("--consolidate", action="store_true",
+                        help="écrire aussi le rapport consolidé de tous les fichiers (colonne REGION)")
+    parser.add_argument("--no-render", action="store_true", help="calculer sans générer images ni PDF")
+    parser.add_argument("--format", choices=("csv", "json", "xlsx", "ods"),
+                        help="exporter les résultats bruts de chaque fichier au lieu de les dessiner")
+    args = parser.parse_args(argv)
+
+    inputs = resolve_inputs(args.inputs)
+    if not inputs:
+        parser.error(f"aucun fichier d'entrée trouvé ({', '.join(DataLoader.SUPPORTED_EXTENSIONS)})")
+
+    start = time.perf_counter()
+    summaries = run_batch(inputs, args.output, args.workers, args.max_memory_mb, render=not args.no_render,
+                          export_format=args.format, consolidate=args.consolidate)
+    summary_path = os.path.join(args.output, "summary.csv")
+    write_summary(summaries, summary_path)
+    print_summary(summaries, time.perf_counter() - start)
+    print(f"Résumé écrit : {summary_path}")
+    return 0 if all(summary["status"] == "ok" for summary in summaries) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
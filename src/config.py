@@ -7,6 +7,17 @@
 # ==========================
 
 FILE_PATH = "../data/input/Data_Load.xlsx"  # Chemin du fichier Excel à analyser
+CACHE_DIR = "../data/cache"  # Cache Parquet des données chargées (None pour désactiver)
+AGGREGATE_STORE_PATH = "../data/cache/aggregates/state.parquet"  # État d'agrégats incrémental (None pour désactiver)
+SQL_DB_PATH = None  # Base locale (SQLite / DuckDB) où exécuter les questions hors mémoire, ex: "../data/cache/sales.db"
+RENDER_WORKERS = None  # Processus de rendu des figures (None = nombre de cœurs, 1 = séquentiel)
+WATCH_DIR = "../data/cache/watch"  # Mode --watch : empreintes des partitions et pages du PDF déjà rendues
+RENDER_CACHE_DIR = "../data/output/render_cache"  # Rendus déjà produits (images + pages du PDF), adressés par contenu (None pour désactiver)
+RENDER_CACHE_MAX_MB = 200  # Taille maximale du cache de rendu (les rendus les moins récemment utilisés sont évincés)
+PDF_ENGINE = "reportlab"  # "reportlab" (tableaux PDF natifs paginés, histogrammes vectoriels) ou "matplotlib" (une figure par page)
+BATCH_OUTPUT_DIR = "../data/output/batch"  # Mode lot (batch.py) : un sous-dossier de sortie par fichier d'entrée
+BATCH_WORKERS = None  # Processus du mode lot traitant des fichiers en parallèle (None = nombre de cœurs)
+BATCH_MAX_MEMORY_MB = None  # Mémoire maximale (espace d'adressage, Mo) de chaque processus du mode lot (None = sans limite)
 
 # Noms de colonnes standards
 SELLER_COL = "SELLER"
@@ -17,58 +28,101 @@ TOTAL_COL = "TOTAL"
 QUANTITY_COL = "QUANTITY"
 UNIT_PRICE_COL = "UNIT_PRICE"
 
+# Profil de chargement compact appliqué par load_data et DataLoader (None pour tout charger tel quel)
+# Les montants UNIT_PRICE / TOTAL restent en float64 : "float" (float32) diviserait leur
+# mémoire par deux mais arrondirait les totaux affichés dans les rapports.
+LOAD_PROFILE = {
+    "usecols": [SELLER_COL, DATE_COL, QUANTITY_COL, UNIT_PRICE_COL, TOTAL_COL],
+    "categories": [SELLER_COL],
+    "downcast": {QUANTITY_COL: "integer"},
+    "date_col": DATE_COL,
+    "date_format": "%Y-%m-%d",
+}
+
+# Trimestre codé en entier int32 (20231) plutôt qu'en Period : groupby plus rapides,
+# le libellé "2023Q1" n'est produit qu'à l'affichage
+QUARTER_AS_INT = True
+
+# Colonnes indexées par PartitionIndex (filtres d'égalité par recherche directe,
+# utilisé par filter_by_value(index=...) et DataAnalyzer(index_cols=...))
+INDEXED_COLS = [YEAR_COL, SELLER_COL]
+
+# Dimensions et mesures de l'état d'agrégats incrémental (AGGREGATE_STORE_PATH)
+AGGREGATE_DIMS = [SELLER_COL, YEAR_COL, QUARTER_COL]
+AGGREGATE_MEASURES = [TOTAL_COL, QUANTITY_COL, UNIT_PRICE_COL]
+# Grains du cube (SELLER × YEAR × QUARTER et ses agrégations) exportés en Parquet à côté des rapports
+# pour les questions ad hoc (None pour désactiver)
+CUBE_EXPORT_DIR = "../data/output/cube"
+
 # ==========================
 # Paramètres spécifiques par question/statistique
 # ==========================
+# "year"   : filtre optionnel sur l'année
+# "sort"   : "desc" pour classer le résultat par valeur décroissante
+# "render" : "table" (tableau PNG + PDF) ou "histogram" (histogramme PNG + PDF)
+# "agg_func" accepte aussi les quantiles approchés par sketch KLL (fusionnables, par lots) :
+#            "approx_median" ou "approx_quantile:0.9" ; "sketch_error" règle alors l'erreur
+#            de rang normalisée (0.01 par défaut, résultat exact sous ~165 valeurs par groupe)
 
 QUESTIONS = {
     "Q1": {
         "group_cols": [SELLER_COL, YEAR_COL],
         "agg_col": TOTAL_COL,
         "agg_func": "sum",
-        "title": "Chiffre d'affaires total par vendeur et par année"
+        "title": "Chiffre d'affaires total par vendeur et par année",
+        "render": "table"
     },
     "Q2": {
         "group_cols": [SELLER_COL, QUARTER_COL],
         "agg_col": TOTAL_COL,
         "agg_func": "mean",
-        "title": "Chiffre d'affaires moyen par trimestre et vendeur"
+        "title": "Chiffre d'affaires moyen par trimestre et vendeur",
+        "render": "table"
     },
     "Q3": {
         "group_cols": [SELLER_COL],
         "agg_col": QUANTITY_COL,
         "agg_func": "mean",
-        "title": "Quantité moyenne vendue par transaction et vendeur"
+        "title": "Quantité moyenne vendue par transaction et vendeur",
+        "render": "table"
     },
     "Q4": {
         "year": 2023,
         "group_cols": [SELLER_COL],
         "agg_col": UNIT_PRICE_COL,
         "agg_func": "std",
-        "title": "Dispersion des prix unitaires des vendeurs en 2023"
+        "title": "Dispersion des prix unitaires des vendeurs en 2023",
+        "render": "histogram"
     },
     "Q5": {
         "year": 2025,
         "group_cols": [SELLER_COL],
         "agg_col": TOTAL_COL,
         "agg_func": "mean",
-        "title": "Classement CA moyen par transaction en 2025"
+        "title": "Classement CA moyen par transaction en 2025",
+        "sort": "desc",
+        "render": "table"
     },
     "Q6": {
         "group_cols": [SELLER_COL],
         "agg_dict": {TOTAL_COL: ["min", "max", "mean"]},
-        "title": "Min, Max, Moy du CA par vendeur"
+        "title": "Min, Max, Moy du CA par vendeur",
+        "render": "table"
     },
     "Q7": {
         "year": 2023,
         "group_cols": [SELLER_COL],
         "agg_col": TOTAL_COL,
-        "agg_func": "median",
-        "title": "Médiane du CA en 2023 par vendeur"
+        "agg_func": "approx_median",
+        "sketch_error": 0.01,
+        "title": "Médiane du CA en 2023 par vendeur",
+        "sort": "desc",
+        "render": "table"
     },
     "Q8": {
         "group_cols": [SELLER_COL, YEAR_COL],
         "count_name": "TRANSACTIONS",
-        "title": "Nombre total de transactions par vendeur et par année"
+        "title": "Nombre total de transactions par vendeur et par année",
+        "render": "histogram"
     }
 }
\ No newline at end of file
@@ -0,0 +1,395 @@
+"""
+Module de stockage incrémental d'agrégats pour des données de ventes en ajout seul.
+
+Pour chaque groupe de dimensions (par défaut SELLER × YEAR × QUARTER) et chaque
+mesure numérique, on conserve un état partiel fusionnable :
+    count, sum, mean, M2 (Welford), min, max
+ainsi que le nombre de lignes du groupe.
+
+Les nouvelles lignes sont agrégées seules puis fusionnées avec l'état existant
+(formule de Chan), ce qui évite de rescanner tout l'historique. Les requêtes
+sum / mean / std / var / min / max / count / size sur n'importe quel
+sous-ensemble des dimensions sont ensuite servies à partir de l'état.
+
+L'état se comporte comme un cube : chaque grain plus grossier (ex: SELLER × YEAR,
+SELLER seul) est calculé à la demande à partir du plus petit grain déjà matérialisé
+qui le contient, puis conservé jusqu'à la prochaine modification de l'état.
+Une requête coûte ainsi O(cellules) et non O(lignes) ; materialize() précalcule
+tous les grains.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class AggregateStore:
+    """
+    État d'agrégation persistant, mis à jour de façon incrémentale.
+    """
+
+    SUPPORTED_FUNCS = ("count", "size", "sum", "mean", "std", "var", "min", "max")
+    ROWS_COL = "__rows"
+    STATS = ("count", "sum", "mean", "m2", "min", "max")
+
+    def __init__(self, dims: list, measures: list, path: str | None = None):
+        """
+        Initialise un état vide.
+
+        Parameters
+        ----------
+        dims : list
+            Colonnes de groupement au grain le plus fin (ex: [SELLER, YEAR, QUARTER])
+        measures : list
+            Colonnes numériques agrégées (ex: [TOTAL, QUANTITY, UNIT_PRICE])
+        path : str | None
+            Fichier Parquet de persistance de l'état (None = en mémoire uniquement)
+        """
+        self.dims = list(dims)
+        self.measures = list(measures)
+        self.path = path
+        self.rows_seen = 0
+        self.seen_hash = None  # empreinte des rows_seen lignes déjà intégrées
+        self.state = self._empty_state()
+
+    @property
+    def state(self) -> pd.DataFrame:
+        """État au grain le plus fin (dims), une ligne par cellule."""
+        return self._state
+
+    @state.setter
+    def state(self, state: pd.DataFrame):
+        """Remplace l'état : les grains matérialisés sont invalidés."""
+        self._state = state
+        self._cuboids = {}
+
+    # -----------------------------
+    # Persistance
+    # -----------------------------
+
+    @classmethod
+    def load(cls, path: str, dims: list, measures: list) -> "AggregateStore":
+        """
+        Recharge un état depuis le disque, ou crée un état vide si le fichier
+        n'existe pas ou a été construit pour d'autres dimensions / mesures.
+        """
+        store = cls(dims, measures, path)
+        meta_path = store._meta_path()
+        if not (os.path.exists(path) and os.path.exists(meta_path)):
+            return store
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("dims") != store.dims or meta.get("measures") != store.measures:
+            return store
+
+        store.state = pd.read_parquet(path).set_index(store.dims)
+        store.rows_seen = meta["rows_seen"]
+        store.seen_hash = meta.get("seen_hash")  # absente (ancien format) : état reconstruit
+        return store
+
+    def save(self) -> None:
+        """Écrit l'état (Parquet) et ses métadonnées (JSON) à côté."""
+        if self.path is None:
+            raise ValueError("Aucun chemin de persistance défini pour cet AggregateStore")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.state.reset_index().to_parquet(self.path, index=False)
+        with open(self._meta_path(), "w", encoding="utf-8") as f:
+            json.dump({
+                "dims": self.dims,
+                "measures": self.measures,
+                "rows_seen": self.rows_seen,
+                "seen_hash": self.seen_hash,
+            }, f)
+
+    # -----------------------------
+    # Mise à jour incrémentale
+    # -----------------------------
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Intègre les lignes de df ajoutées depuis la dernière mise à jour.
+
+        df est supposé être l'historique complet, en ajout seul : seules les lignes
+        au-delà de rows_seen sont agrégées. Si l'historique déjà vu a changé (moins de
+        lignes, ou empreinte des rows_seen premières lignes différente : ligne modifiée,
+        supprimée ou réordonnée, où qu'elle soit), l'état est reconstruit.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Historique complet des transactions
+
+        Returns
+        -------
+        int
+            Nombre de lignes intégrées
+        """
+        # hachage de chaque ligne (dims + mesures), calculé une fois pour l'historique vu et complet
+        row_hashes = pd.util.hash_pandas_object(df[self.dims + self.measures], index=False).to_numpy()
+        if len(df) < self.rows_seen or (
+                self.rows_seen and self._prefix_hash(row_hashes[:self.rows_seen]) != self.seen_hash):
+            self.rows_seen = 0
+            self.state = self._empty_state()
+
+        new_rows = df.iloc[self.rows_seen:]
+        if len(new_rows):
+            self.add(new_rows)
+            self.rows_seen = len(df)
+            self.seen_hash = self._prefix_hash(row_hashes)
+        return len(new_rows)
+
+    def add(self, batch: pd.DataFrame) -> None:
+        """
+        Fusionne un lot de lignes dans l'état, sans suivi de l'historique
+        (ex: blocs successifs d'un fichier lu par DataLoader.iter_chunks).
+
+        Parameters
+        ----------
+        batch : pd.DataFrame
+            Lignes à intégrer (doivent contenir dims et measures)
+        """
+        if len(batch):
+            self.state = self._merge(self.state, self._partial(batch))
+
+    # -----------------------------
+    # Requêtes
+    # -----------------------------
+
+    def supports(self, group_cols: list, agg_col: str | None, agg_func: str,
+                 filters: dict | None = None) -> bool:
+        """Indique si la requête peut être servie à partir de l'état."""
+        if self.state.empty:
+            return False
+        if not set(group_cols) <= set(self.dims) or not set(filters or {}) <= set(self.dims):
+            return False
+        if agg_func == "size":
+            return True
+        return agg_col in self.measures and agg_func in self.SUPPORTED_FUNCS
+
+    def query(self, group_cols: list, agg_col: str, agg_func: str,
+              filters: dict | None = None) -> pd.DataFrame:
+        """
+        Équivalent de functions.groupby_aggregate, servi à partir de l'état.
+
+        Parameters
+        ----------
+        group_cols : list
+            Colonnes de groupement (sous-ensemble de dims)
+        agg_col : str
+            Mesure à agréger
+        agg_func : str
+            'count', 'sum', 'mean', 'std', 'var', 'min' ou 'max'
+        filters : dict | None
+            Filtres d'égalité sur des dimensions (ex: {YEAR: 2023})
+
+        Returns
+        -------
+        pd.DataFrame
+            Colonnes group_cols + [agg_col]
+        """
+        rolled = self._rollup(group_cols, filters)
+        return pd.DataFrame({agg_col: self._finalize(rolled, agg_col, agg_func)}).reset_index()
+
+    def query_multi(self, group_cols: list, agg_dict: dict, filters: dict | None = None) -> pd.DataFrame:
+        """Équivalent de functions.groupby_aggregate_multi (colonnes MultiIndex)."""
+        aggs = [(col, func) for col, funcs in agg_dict.items()
+                for func in ([funcs] if isinstance(funcs, str) else funcs)]
+        result = self.aggregate(group_cols, aggs, filters)
+        result.index.names = [(name, "") for name in result.index.names]
+        return result.reset_index()
+
+    def aggregate(self, group_cols: list, aggs: list, filters: dict | None = None) -> pd.DataFrame:
+        """
+        Calcule plusieurs statistiques au grain group_cols.
+
+        Parameters
+        ----------
+        group_cols : list
+            Colonnes de groupement (sous-ensemble de dims)
+        aggs : list
+            Couples (mesure, fonction)
+        filters : dict | None
+            Filtres d'égalité sur des dimensions
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexé par group_cols, colonnes MultiIndex (mesure, fonction)
+        """
+        rolled = self._rollup(group_cols, filters)
+        result = pd.DataFrame({(col, func): self._finalize(rolled, col, func) for col, func in aggs},
+                              index=rolled.index)
+        result.columns = pd.MultiIndex.from_tuples(aggs)
+        return result
+
+    def query_size(self, group_cols: list, count_name: str = "COUNT",
+                   filters: dict | None = None) -> pd.DataFrame:
+        """Équivalent de functions.groupby_size."""
+        rolled = self._rollup(group_cols, filters)
+        return rolled[self.ROWS_COL].astype("int64").rename(count_name).reset_index()
+
+    def cuboid(self, group_cols: list) -> pd.DataFrame:
+        """
+        État agrégé au grain group_cols (sous-ensemble de dims), matérialisé à la demande.
+
+        Le grain est calculé à partir du plus petit grain déjà matérialisé qui contient
+        toutes ses colonnes (l'état le plus fin à défaut), puis conservé.
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexé par group_cols, mêmes colonnes que state
+        """
+        key = tuple(group_cols)
+        if key not in self._cuboids:
+            if not set(key) <= set(self.dims):
+                raise ValueError(f"Grain hors des dimensions de l'état : {list(key)}")
+            if list(key) == self.dims:
+                self._cuboids[key] = self.state
+            else:
+                sources = [frame for cols, frame in self._cuboids.items() if set(key) <= set(cols)]
+                source = min(sources, key=len) if sources else self.state
+                self._cuboids[key] = self._rollup_frame(source, list(key))
+        return self._cuboids[key]
+
+    def materialize(self) -> dict:
+        """
+        Précalcule tous les grains du cube (sous-ensembles ordonnés de dims), du plus fin
+        au plus grossier.
+
+        Returns
+        -------
+        dict
+            {tuple de colonnes: nombre de cellules}
+        """
+        for size in range(len(self.dims), 0, -1):
+            for cols in itertools.combinations(self.dims, size):
+                self.cuboid(list(cols))
+        return {cols: len(frame) for cols, frame in self._cuboids.items()}
+
+    def export(self, folder: str) -> list:
+        """
+        Écrit chaque grain matérialisé (voir materialize) dans un fichier Parquet
+        <folder>/<colonnes>.parquet, lisible sans ce module (ex: à côté des rapports).
+
+        Returns
+        -------
+        list
+            Chemins des fichiers écrits
+        """
+        os.makedirs(folder, exist_ok=True)
+        paths = []
+        for cols, frame in self._cuboids.items():
+            path = os.path.join(folder, "_".join(cols) + ".parquet")
+            frame.reset_index().to_parquet(path, index=False)
+            paths.append(path)
+        return paths
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _meta_path(self) -> str:
+        return f"{self.path}.json"
+
+    def _columns(self) -> list:
+        return [self.ROWS_COL] + [f"{m}|{stat}" for m in self.measures for stat in self.STATS]
+
+    def _empty_state(self) -> pd.DataFrame:
+        index = pd.MultiIndex.from_arrays([[] for _ in self.dims], names=self.dims)
+        return pd.DataFrame({col: pd.Series(dtype="float64") for col in self._columns()}, index=index)
+
+    @staticmethod
+    def _prefix_hash(row_hashes: np.ndarray) -> str:
+        """Empreinte d'une suite de lignes (sensible à toute modification et à l'ordre)."""
+        return hashlib.sha256(np.ascontiguousarray(row_hashes).tobytes()).hexdigest()
+
+    def _partial(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Agrège un lot de lignes en état partiel, au grain dims."""
+        grouped = df.groupby(self.dims, observed=True)
+        partial = {self.ROWS_COL: grouped.size()}
+        for m in self.measures:
+            stats = grouped[m].agg(["count", "sum", "mean", "var", "min", "max"])
+            partial[f"{m}|count"] = stats["count"]
+            partial[f"{m}|sum"] = stats["sum"]
+            partial[f"{m}|mean"] = stats["mean"]
+            partial[f"{m}|m2"] = (stats["var"] * (stats["count"] - 1)).fillna(0.0)
+            partial[f"{m}|min"] = stats["min"]
+            partial[f"{m}|max"] = stats["max"]
+        return pd.DataFrame(partial).astype("float64")
+
+    def _merge(self, left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        """Fusionne deux états partiels (formule parallèle de Chan pour mean / M2)."""
+        if left.empty:
+            return right
+        index = left.index.union(right.index)
+        a, b = left.reindex(index), right.reindex(index)
+        merged = {self.ROWS_COL: a[self.ROWS_COL].fillna(0) + b[self.ROWS_COL].fillna(0)}
+        for m in self.measures:
+            n_a, n_b = a[f"{m}|count"].fillna(0), b[f"{m}|count"].fillna(0)
+            mean_a, mean_b = a[f"{m}|mean"].fillna(0), b[f"{m}|mean"].fillna(0)
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = (mean_a + delta * n_b / n).where(n > 0)
+                m2 = a[f"{m}|m2"].fillna(0) + b[f"{m}|m2"].fillna(0) + delta ** 2 * n_a * n_b / n
+            merged[f"{m}|count"] = n
+            merged[f"{m}|sum"] = a[f"{m}|sum"].fillna(0) + b[f"{m}|sum"].fillna(0)
+            merged[f"{m}|mean"] = mean
+            merged[f"{m}|m2"] = m2.fillna(0.0)
+            merged[f"{m}|min"] = np.fmin(a[f"{m}|min"], b[f"{m}|min"])
+            merged[f"{m}|max"] = np.fmax(a[f"{m}|max"], b[f"{m}|max"])
+        return pd.DataFrame(merged)
+
+    def _rollup(self, group_cols: list, filters: dict | None) -> pd.DataFrame:
+        """Agrège l'état au grain group_cols, après filtres d'égalité sur les dimensions."""
+        if not filters:
+            return self.cuboid(group_cols)
+        # grain contenant les colonnes filtrées, filtré puis agrégé au grain demandé
+        grain = [col for col in self.dims if col in group_cols or col in filters]
+        state = self.cuboid(grain)
+        for col, value in filters.items():
+            state = state[state.index.get_level_values(col) == value]
+        return self._rollup_frame(state, group_cols)
+
+    def _rollup_frame(self, state: pd.DataFrame, group_cols: list) -> pd.DataFrame:
+        """Agrège un état (à n'importe quel grain contenant group_cols) au grain group_cols."""
+        keys = [state.index.get_level_values(col) for col in group_cols]
+        grouped = state.groupby(keys, observed=True)
+        rolled = {self.ROWS_COL: grouped[self.ROWS_COL].sum()}
+        for m in self.measures:
+            count = grouped[f"{m}|count"].sum()
+            total = grouped[f"{m}|sum"].sum()
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = (total / count).where(count > 0)
+                cell_mean = grouped[f"{m}|sum"].transform("sum") / grouped[f"{m}|count"].transform("sum")
+            # M2 global = somme des M2 + dispersion des moyennes de cellules autour de la moyenne du groupe
+            spread = (state[f"{m}|count"] * (state[f"{m}|mean"] - cell_mean) ** 2).fillna(0.0)
+            rolled[f"{m}|count"] = count
+            rolled[f"{m}|sum"] = total
+            rolled[f"{m}|mean"] = mean
+            rolled[f"{m}|m2"] = grouped[f"{m}|m2"].sum() + spread.groupby(keys, observed=True).sum()
+            rolled[f"{m}|min"] = grouped[f"{m}|min"].min()
+            rolled[f"{m}|max"] = grouped[f"{m}|max"].max()
+        rolled = pd.DataFrame(rolled)
+        rolled.index.names = group_cols
+        return rolled
+
+    def _finalize(self, rolled: pd.DataFrame, col: str, func: str) -> pd.Series:
+        """Calcule la statistique finale à partir de l'état agrégé."""
+        count = rolled[f"{col}|count"]
+        if func == "size":
+            return rolled[self.ROWS_COL].astype("int64")
+        if func == "count":
+            return count.astype("int64")
+        if func in ("sum", "mean", "min", "max"):
+            return rolled[f"{col}|{func}"]
+        if func in ("var", "std"):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                var = (rolled[f"{col}|m2"] / (count - 1)).where(count > 1)
+            return var if func == "var" else np.sqrt(var)
+        raise ValueError(f"Fonction d'agrégation non supportée par l'AggregateStore : {func}")
@@ -3,23 +3,112 @@ Module pour analyser les DataFrames et répondre à des requêtes simples
 ou complexes (filtrage, agrégations, statistiques, regroupements, etc.)
 """
 
+import ast
+import io
+import re
+import tokenize
+from collections import OrderedDict
+from typing import Callable, Iterable
+import numpy as np
 import pandas as pd
+from .aggregates import AggregateStore
+from .expressions import compile_condition
+from .index import PartitionIndex
+from .sketch import parse_quantile_func, groupby_sketches, merge_group_sketches
+
+# condition d'égalité simple servie par l'index : "YEAR == 2023", "`SELLER` == 'Bob'"
+EQUALITY_PATTERN = re.compile(r"^\s*`?(?P<col>[^`=<>!\s]+)`?\s*==\s*(?P<value>.+?)\s*$")
 
 class DataAnalyzer:
     """
     Classe pour manipuler un DataFrame et répondre à des requêtes dynamiques.
+
+    En mode streaming (chunks), les données ne sont jamais chargées en entier :
+    chaque requête relit les blocs et les replie en agrégats partiels, la mémoire
+    est bornée par la taille d'un bloc.
+
+    Les résultats de filter, count_rows et groupby sont mémorisés dans un cache LRU,
+    associé à la version courante des données : remplacer df (ou appeler
+    invalidate() après une modification en place) vide le cache. Les DataFrames
+    renvoyés depuis le cache sont partagés et ne doivent pas être modifiés.
+
+    Les conditions de filter et count_rows sont compilées une seule fois en masques
+    vectorisés (voir expressions.py) ; celles que le compilateur ne reconnaît pas
+    passent par DataFrame.query.
     """
 
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame | None = None,
+                 chunks: Callable[[], Iterable[pd.DataFrame]] | None = None,
+                 index_cols: list | None = None,
+                 cache_size: int = 128, cache_max_bytes: int | None = None,
+                 engine: str = "pandas"):
         """
-        Initialise avec un DataFrame existant.
+        Initialise avec un DataFrame existant, ou une source de blocs.
 
         Parameters
         ----------
-        df : pd.DataFrame
+        df : pd.DataFrame | None
+        chunks : Callable[[], Iterable[pd.DataFrame]] | None
+            Fonction renvoyant un nouvel itérateur de blocs à chaque appel
+            (ex: lambda: loader.iter_chunks(100_000))
+        index_cols : list | None
+            Colonnes à indexer (PartitionIndex) : les conditions "col == valeur"
+            sur ces colonnes sont servies sans parcourir le DataFrame
+        cache_size : int
+            Nombre maximal de résultats mémorisés (0 = pas de cache)
+        cache_max_bytes : int | None
+            Taille mémoire maximale des résultats mémorisés (None = pas de limite)
+        engine : str
+            Moteur d'évaluation des conditions compilées : "pandas" ou "numexpr"
+            (si installé, pour les conditions purement numériques)
         """
+        if (df is None) == (chunks is None):
+            raise ValueError("Fournir soit un DataFrame (df), soit une source de blocs (chunks)")
+        if index_cols and df is None:
+            raise ValueError("L'index de partitions n'est pas disponible en mode streaming")
+        self.chunks = chunks
+        self.index_cols = list(index_cols or [])
+        self.cache_size = cache_size
+        self.cache_max_bytes = cache_max_bytes
+        self.engine = engine
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._version = 0
         self.df = df
 
+    @property
+    def df(self) -> pd.DataFrame | None:
+        """DataFrame analysé (None en mode streaming)."""
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame | None):
+        """Remplace les données : l'index est reconstruit et le cache invalidé."""
+        self._df = df
+        self.index = PartitionIndex(df, self.index_cols) if self.index_cols and df is not None else None
+        self.invalidate()
+
+    @classmethod
+    def from_loader(cls, loader, chunksize: int = 100_000, sheet_name: str | None = None) -> "DataAnalyzer":
+        """
+        Crée un analyseur en streaming sur le fichier d'un DataLoader.
+
+        Parameters
+        ----------
+        loader : DataLoader
+        chunksize : int
+            Nombre de lignes par bloc
+        sheet_name : str | None
+            Feuille à lire (si Excel)
+        """
+        return cls(chunks=lambda: loader.iter_chunks(chunksize, sheet_name))
+
+    @property
+    def streaming(self) -> bool:
+        """Indique si l'analyseur travaille par blocs."""
+        return self.df is None
+
 
     # -------------------------------------------------
     # Statistiques simples
@@ -27,6 +116,14 @@ class DataAnalyzer:
 
     def mean(self, column: str) -> float:
         """Retourne la moyenne d'une colonne numérique."""
+        if self.streaming:
+            total, count = 0.0, 0
+            for chunk in self.chunks():
+                if column not in chunk.columns:
+                    raise ValueError(f"La colonne '{column}' n'existe pas dans le DataFrame")
+                total += chunk[column].sum()
+                count += chunk[column].count()
+            return total / count if count else float("nan")
         if column not in self.df.columns:
             raise ValueError(f"La colonne '{column}' n'existe pas dans le DataFrame")
         return self.df[column].mean()
@@ -36,11 +133,41 @@ class DataAnalyzer:
         Compte le nombre de lignes.
         Si `condition` est spécifiée, filtre selon cette condition (ex: "Score > 50").
         """
+        key = ("count_rows", normalize_condition(condition) if condition is not None else None)
+        return self._cached(key, lambda: self._count_rows(condition))
+
+    def _count_rows(self, condition: str | None) -> int:
+        if self.streaming:
+            if condition is None:
+                return sum(len(chunk) for chunk in self.chunks())
+            return sum(self._count_mask(chunk, condition) for chunk in self.chunks())
         if condition is None:
             return len(self.df)
-        else:
-            filtered = self.df.query(condition)
-            return len(filtered)
+        indexed = self._indexed_equality(condition)
+        if indexed is not None:
+            return self.index.count(*indexed)
+        return self._count_mask(self.df, condition)
+
+    def count_many(self, conditions: list) -> list:
+        """
+        Compte les lignes de plusieurs conditions en une seule passe sur les colonnes
+        (une seule lecture des blocs en streaming).
+
+        Parameters
+        ----------
+        conditions : list
+            Conditions au format de count_rows (ex: ["YEAR == 2023", "TOTAL > 100"])
+
+        Returns
+        -------
+        list
+            Nombre de lignes par condition, dans l'ordre de conditions
+        """
+        counts = [0] * len(conditions)
+        for chunk in (self.chunks() if self.streaming else [self.df]):
+            for i, mask in enumerate(self._masks(chunk, conditions)):
+                counts[i] += int(mask.sum())
+        return counts
 
 
     # -------------------------------------------------
@@ -52,7 +179,17 @@ class DataAnalyzer:
         Retourne un DataFrame filtré selon la condition.
         Ex: "Age > 25 and City == 'Paris'"
         """
-        return self.df.query(condition)
+        return self._cached(("filter", normalize_condition(condition)), lambda: self._filter(condition))
+
+    def _filter(self, condition: str) -> pd.DataFrame:
+        if self.streaming:
+            # seul le résultat filtré est conservé en mémoire
+            parts = [chunk[self._masks(chunk, [condition])[0]] for chunk in self.chunks()]
+            return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        indexed = self._indexed_equality(condition)
+        if indexed is not None:
+            return self.index.filter(*indexed)
+        return self.df[self._masks(self.df, [condition])[0]]
 
 
     # -------------------------------------------------
@@ -69,8 +206,35 @@ class DataAnalyzer:
             Colonnes pour le groupby
         agg_dict : dict
             Dictionnaire {colonne: fonction} pour l'agrégation
+            (en streaming : sum, mean, std, var, min, max, count, approx_median, approx_quantile:<q>)
+        """
+        agg_key = tuple((col, funcs if isinstance(funcs, str) else tuple(funcs)) for col, funcs in agg_dict.items())
+        key = ("groupby", tuple(by_columns), agg_key)
+        return self._cached(key, lambda: self._groupby(by_columns, agg_dict))
+
+    def _groupby(self, by_columns: list, agg_dict: dict) -> pd.DataFrame:
+        if self.streaming:
+            return self._stream_groupby(list(by_columns), agg_dict)
+        return self.df.groupby(by_columns, observed=True).agg(agg_dict).reset_index()
+
+
+    # -------------------------------------------------
+    # Cache des résultats
+    # -------------------------------------------------
+
+    def invalidate(self) -> None:
         """
-        return self.df.groupby(by_columns).agg(agg_dict).reset_index()
+        Vide le cache des résultats. À appeler après toute modification en place
+        de df (ou de la source des blocs) ; remplacer df le fait automatiquement.
+        """
+        self._version += 1
+        self._cache.clear()
+        self._cache_bytes = 0
+
+    def cache_info(self) -> dict:
+        """Statistiques du cache : hits, misses, evictions, entries, bytes, version."""
+        return {**self._stats, "entries": len(self._cache), "bytes": self._cache_bytes,
+                "version": self._version}
 
 
     # -------------------------------------------------
@@ -79,4 +243,151 @@ class DataAnalyzer:
 
     def describe(self) -> pd.DataFrame:
         """Retourne des statistiques descriptives du DataFrame"""
+        if self.streaming:
+            raise ValueError("describe() n'est pas disponible en mode streaming")
         return self.df.describe(include='all')
+
+
+    # -------------------------------------------------
+    # Méthodes internes
+    # -------------------------------------------------
+
+    def _cached(self, key: tuple, compute: Callable):
+        """Renvoie le résultat mémorisé pour key, ou le calcule et le mémorise (LRU)."""
+        if self.cache_size <= 0:
+            return compute()
+        key = (self._version,) + key
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._cache[key][0]
+
+        self._stats["misses"] += 1
+        result = compute()
+        size = int(result.memory_usage(index=True).sum()) if isinstance(result, pd.DataFrame) else 0
+        self._cache[key] = (result, size)
+        self._cache_bytes += size
+        while self._cache and (len(self._cache) > self.cache_size or (
+                self.cache_max_bytes is not None and self._cache_bytes > self.cache_max_bytes)):
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+            self._stats["evictions"] += 1
+        return result
+
+    def _count_mask(self, df: pd.DataFrame, condition: str) -> int:
+        """Nombre de lignes vérifiant condition : somme du masque, sans copie des lignes."""
+        return int(self._masks(df, [condition])[0].sum())
+
+    def _masks(self, df: pd.DataFrame, conditions: list) -> list:
+        """
+        Masques booléens des conditions sur df. Les conditions compilables sont
+        évaluées ensemble (colonnes partagées) ; les autres, et celles dont l'évaluation
+        compilée échoue (types incompatibles...), passent par df.eval. Si df.eval échoue
+        aussi, l'erreur de la version compilée est levée (ValueError pour une colonne inconnue).
+        """
+        masks, columns = [], {}
+        for condition in conditions:
+            try:
+                masks.append(compile_condition(condition)(df, engine=self.engine, columns=columns))
+            except Exception as error:
+                try:
+                    masks.append(df.eval(condition).to_numpy(dtype=bool))
+                except Exception:
+                    raise error
+        return masks
+
+    def _indexed_equality(self, condition: str) -> tuple | None:
+        """
+        Reconnaît une condition "col == littéral" sur une colonne indexée, le littéral
+        étant un scalaire (texte, entier, flottant, booléen). Retourne (colonne, valeur),
+        ou None si la condition doit passer par le masque compilé / query() (listes,
+        tuples... : "col == ['A', 'B']" est une appartenance, comme dans DataFrame.query).
+        """
+        if self.index is None:
+            return None
+        match = EQUALITY_PATTERN.match(condition)
+        if match is None or match.group("col") not in self.index:
+            return None
+        try:
+            value = ast.literal_eval(match.group("value"))
+        except (ValueError, SyntaxError):
+            return None
+        if not isinstance(value, (str, int, float, bool)):
+            return None
+        return match.group("col"), value
+
+    def _stream_groupby(self, by_columns: list, agg_dict: dict) -> pd.DataFrame:
+        """
+        Groupby par blocs : chaque bloc est replié dans un état partiel
+        (AggregateStore pour les moments, sketches KLL pour les quantiles approchés),
+        puis le résultat est mis au même format que df.groupby(...).agg(agg_dict).
+        """
+        aggs = [(col, func) for col, funcs in agg_dict.items()
+                for func in ([funcs] if isinstance(funcs, str) else funcs)]
+        for col, func in aggs:
+            if parse_quantile_func(func) is None and func not in AggregateStore.SUPPORTED_FUNCS:
+                raise ValueError(
+                    f"Agrégation '{func}' impossible en streaming "
+                    "(utiliser 'approx_median' ou 'approx_quantile:<q>' pour les quantiles)"
+                )
+        moments = [(col, func) for col, func in aggs if parse_quantile_func(func) is None]
+        quantiles = [(col, func) for col, func in aggs if parse_quantile_func(func) is not None]
+        measures = list(dict.fromkeys(col for col, _ in moments))
+        sketch_cols = list(dict.fromkeys(col for col, _ in quantiles))
+
+        store = AggregateStore(by_columns, measures)
+        sketches = {}
+        dtypes = {}  # type de chaque mesure, promu d'un bloc à l'autre (ex. int8 puis int16 après downcast)
+        for chunk in self.chunks():
+            store.add(chunk[by_columns + measures])
+            for col in measures:
+                dtypes[col] = _common_dtype(dtypes[col], chunk[col].dtype) if col in dtypes else chunk[col].dtype
+            for col in sketch_cols:
+                partial = groupby_sketches(chunk, by_columns, col)
+                sketches[col] = merge_group_sketches(sketches[col], partial) if col in sketches else partial
+
+        result = store.aggregate(by_columns, moments) if moments else pd.DataFrame()
+        for col, func in quantiles:
+            q = parse_quantile_func(func)
+            result[(col, func)] = sketches[col].map(lambda sketch: sketch.quantile(q)).astype("float64")
+        result = result[aggs]
+        # mêmes types que df.groupby(...).agg : min / max dans le type de la colonne,
+        # count (et sum d'une colonne entière) en int64
+        for col, func in moments:
+            dtype = dtypes.get(col)
+            if func == "count" or (func == "sum" and (pd.api.types.is_integer_dtype(dtype)
+                                                       or pd.api.types.is_bool_dtype(dtype))):
+                target = "int64"
+            elif func in ("min", "max") and pd.api.types.is_numeric_dtype(dtype):
+                target = dtype
+            else:
+                continue
+            if not result[(col, func)].isna().any():
+                result[(col, func)] = result[(col, func)].astype(target)
+        result.columns = pd.MultiIndex.from_tuples(aggs)
+        if all(isinstance(funcs, str) for funcs in agg_dict.values()):
+            result.columns = [col for col, _ in aggs]
+        else:
+            result.index.names = [(name, "") for name in result.index.names]
+        return result.reset_index()
+
+
+def _common_dtype(left, right):
+    """Type commun de deux blocs d'une même colonne (promotion numpy, object si impossible)."""
+    try:
+        return np.result_type(left, right)
+    except TypeError:
+        return left if left == right else np.dtype(object)
+
+def normalize_condition(condition: str) -> str:
+    """
+    Forme canonique d'une condition pour la clé de cache : la condition est découpée
+    en jetons Python, rejoints par un seul espace ("YEAR==2023" et "YEAR == 2023"
+    coïncident, les littéraux texte sont conservés tels quels).
+    """
+    try:
+        tokens = [token.string for token in tokenize.generate_tokens(io.StringIO(condition).readline)
+                  if token.string.strip()]
+    except (tokenize.TokenError, SyntaxError):
+        return " ".join(condition.split())
+    return " ".join(tokens)
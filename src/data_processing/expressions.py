@@ -0,0 +1,263 @@
+"""
+Module de compilation des conditions de filtrage (syntaxe de DataFrame.query).
+
+Une condition telle que "YEAR == 2023 and TOTAL > 100" est analysée une seule
+fois (module ast) en une fonction vectorisée qui calcule directement le masque
+booléen à partir des colonnes :
+    - pas de nouvelle analyse de la chaîne à chaque appel (cache des conditions) ;
+    - compter les lignes revient à sommer le masque, sans copier le DataFrame ;
+    - plusieurs conditions peuvent être évaluées en partageant les colonnes lues.
+
+Si numexpr est installé, les conditions purement numériques peuvent être
+évaluées avec son moteur (engine="numexpr"). Les conditions non reconnues
+(appels de méthodes, variables @locales...) lèvent ValueError à la compilation :
+l'appelant repasse alors par DataFrame.query.
+"""
+
+import ast
+import io
+import operator
+import re
+import tokenize
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+try:
+    import numexpr
+except ImportError:  # moteur optionnel
+    numexpr = None
+
+
+BACKTICK_PATTERN = re.compile(r"`([^`]*)`")
+# comme DataFrame.query, & et | sont lus comme and / or : moins prioritaires que les comparaisons
+BOOLEAN_TOKENS = {"&": " and ", "|": " or "}
+
+COMPARISONS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+ARITHMETIC = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv, ast.Mod: operator.mod,
+}
+LIST_NODES = (ast.List, ast.Tuple, ast.Set)
+NUMEXPR_SYMBOLS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+    ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%",
+    ast.And: "&", ast.Or: "|",
+}
+
+
+class CompiledCondition:
+    """
+    Condition de filtrage compilée en fonction de masque vectorisée.
+    """
+
+    def __init__(self, condition: str):
+        """
+        Analyse la condition.
+
+        Parameters
+        ----------
+        condition : str
+            Condition au format DataFrame.query (ex: "Score > 50 and City == 'Paris'")
+
+        Raises
+        ------
+        ValueError
+            Si la condition utilise une construction non supportée
+        """
+        self.condition = condition
+        names = {}
+
+        def placeholder(match):
+            return names.setdefault(match.group(1), f"__col{len(names)}")
+
+        source = BACKTICK_PATTERN.sub(placeholder, condition)
+        self._aliases = {alias: column for column, alias in names.items()}
+        try:
+            tree = ast.parse(_replace_booleans(source.strip()), mode="eval").body
+        except (SyntaxError, tokenize.TokenError) as e:
+            raise ValueError(f"Condition invalide : {condition}") from e
+
+        self.columns = []
+        self._evaluate = self._compile(tree)
+        self._numexpr = self._numexpr_source(tree)
+
+    def __call__(self, df: pd.DataFrame, engine: str = "pandas", columns: dict | None = None) -> np.ndarray:
+        """
+        Calcule le masque booléen de la condition sur df.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+        engine : str
+            "pandas" (opérations vectorisées sur les colonnes) ou "numexpr"
+            (si installé et si toutes les colonnes utilisées sont numériques)
+        columns : dict | None
+            Colonnes déjà extraites, partagées entre plusieurs conditions
+
+        Returns
+        -------
+        np.ndarray
+            Masque booléen de longueur len(df)
+        """
+        columns = columns if columns is not None else {}
+        for name in self.columns:
+            if name not in columns:
+                if name not in df.columns:
+                    raise ValueError(f"La colonne '{name}' n'existe pas dans le DataFrame")
+                columns[name] = df[name]
+
+        if engine == "numexpr" and self._numexpr is not None and numexpr is not None and all(
+                pd.api.types.is_numeric_dtype(columns[name]) for name in self.columns):
+            local_dict = {f"__v{i}": columns[name].to_numpy() for i, name in enumerate(self.columns)}
+            return np.asarray(numexpr.evaluate(self._numexpr, local_dict=local_dict), dtype=bool)
+
+        result = self._evaluate(columns)
+        if np.isscalar(result):
+            return np.full(len(df), bool(result))
+        return np.asarray(result, dtype=bool)
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _column(self, name: str) -> str:
+        column = self._aliases.get(name, name)
+        if column not in self.columns:
+            self.columns.append(column)
+        return column
+
+    def _compile(self, node):
+        """Transforme un nœud ast en fonction colonnes -> Series / scalaire."""
+        if isinstance(node, ast.BoolOp):
+            parts = [self._compile(value) for value in node.values]
+            combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+            def evaluate(cols):
+                result = parts[0](cols)
+                for part in parts[1:]:
+                    result = combine(result, part(cols))
+                return result
+            return evaluate
+
+        if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+            left, right, op = self._compile(node.left), self._compile(node.right), ARITHMETIC[type(node.op)]
+            return lambda cols: op(left(cols), right(cols))
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, (ast.Not, ast.Invert)):
+                def negate(cols):
+                    value = operand(cols)
+                    return (not value) if np.isscalar(value) else ~value
+                return negate
+            if isinstance(node.op, ast.USub):
+                return lambda cols: -operand(cols)
+
+        if isinstance(node, ast.Compare):
+            return self._compile_compare(node)
+
+        if isinstance(node, ast.Name):
+            column = self._column(node.id)
+            return lambda cols: cols[column]
+
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda cols: value
+
+        if isinstance(node, LIST_NODES):
+            values = [ast.literal_eval(element) for element in node.elts]
+            return lambda cols: values
+
+        raise ValueError(f"Construction non supportée dans la condition : {self.condition}")
+
+    def _compile_compare(self, node: ast.Compare):
+        """
+        Comparaisons, éventuellement chaînées (a < x < b) ; in / not in via isin,
+        ainsi que == / != face à une liste (comme DataFrame.query).
+        """
+        nodes = [node.left] + node.comparators
+        operands = [self._compile(operand) for operand in nodes]
+        steps = []
+        for i, op in enumerate(node.ops):
+            left, right = operands[i], operands[i + 1]
+            left_list, right_list = isinstance(nodes[i], LIST_NODES), isinstance(nodes[i + 1], LIST_NODES)
+            if isinstance(op, (ast.Eq, ast.NotEq)) and left_list != right_list:
+                # colonne == [valeurs] : appartenance (isin), comme DataFrame.query
+                if left_list:
+                    left, right = right, left
+                op = ast.In() if isinstance(op, ast.Eq) else ast.NotIn()
+            if isinstance(op, (ast.In, ast.NotIn)):
+                negate = isinstance(op, ast.NotIn)
+                steps.append(lambda cols, l=left, r=right, n=negate: ~l(cols).isin(r(cols)) if n
+                             else l(cols).isin(r(cols)))
+            elif type(op) in COMPARISONS:
+                steps.append(lambda cols, l=left, r=right, f=COMPARISONS[type(op)]: f(l(cols), r(cols)))
+            else:
+                raise ValueError(f"Comparaison non supportée dans la condition : {self.condition}")
+
+        def evaluate(cols):
+            result = steps[0](cols)
+            for step in steps[1:]:
+                result = result & step(cols)
+            return result
+        return evaluate
+
+    def _numexpr_source(self, node) -> str | None:
+        """Traduit la condition pour numexpr, ou None si elle contient des éléments non numériques."""
+        try:
+            return self._to_numexpr(node)
+        except ValueError:
+            return None
+
+    def _to_numexpr(self, node) -> str:
+        if isinstance(node, ast.BoolOp):
+            symbol = NUMEXPR_SYMBOLS[type(node.op)]
+            return "(" + f" {symbol} ".join(self._to_numexpr(value) for value in node.values) + ")"
+        if isinstance(node, ast.BinOp) and type(node.op) in NUMEXPR_SYMBOLS:
+            return f"({self._to_numexpr(node.left)} {NUMEXPR_SYMBOLS[type(node.op)]} {self._to_numexpr(node.right)})"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+            return f"(~{self._to_numexpr(node.operand)})"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return f"(-{self._to_numexpr(node.operand)})"
+        if isinstance(node, ast.Compare) and all(type(op) in NUMEXPR_SYMBOLS for op in node.ops):
+            operands = [node.left] + node.comparators
+            parts = [f"({self._to_numexpr(operands[i])} {NUMEXPR_SYMBOLS[type(op)]} "
+                     f"{self._to_numexpr(operands[i + 1])})" for i, op in enumerate(node.ops)]
+            return "(" + " & ".join(parts) + ")"
+        if isinstance(node, ast.Name):
+            return f"__v{self.columns.index(self._aliases.get(node.id, node.id))}"
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+            return repr(node.value)
+        raise ValueError("non traduisible pour numexpr")
+
+
+def _replace_booleans(source: str) -> str:
+    """Remplace les opérateurs & et | par and / or (hors chaînes de caractères), comme pandas."""
+    tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+    return tokenize.untokenize(
+        (token.type, BOOLEAN_TOKENS.get(token.string, token.string) if token.type == tokenize.OP else token.string)
+        for token in tokens)
+
+
+@lru_cache(maxsize=256)
+def compile_condition(condition: str) -> CompiledCondition:
+    """Compile une condition (résultat mémorisé : chaque chaîne n'est analysée qu'une fois)."""
+    return CompiledCondition(condition)
+
+def evaluate_conditions(df: pd.DataFrame, conditions: list, engine: str = "pandas") -> list:
+    """
+    Calcule les masques de plusieurs conditions en une passe : chaque colonne
+    utilisée n'est extraite qu'une fois et partagée entre les conditions.
+
+    Returns
+    -------
+    list
+        Un masque booléen (np.ndarray) par condition, dans l'ordre de conditions
+    """
+    compiled = [compile_condition(condition) for condition in conditions]
+    columns = {}
+    return [condition(df, engine=engine, columns=columns) for condition in compiled]
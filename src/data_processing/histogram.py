@@ -0,0 +1,171 @@
+"""
+Module de calcul d'histogrammes, séparé de leur dessin (functions.build_histogram_figure).
+
+Les effectifs sont calculés avec numpy sur des bornes de classes (edges) :
+    - histogram_counts : une colonne en mémoire, bornes déduites comme numpy.histogram ;
+    - HistogramAccumulator : bornes fixées à l'avance, alimenté par lots (update) et
+      fusionnable entre partitions (merge), pour des colonnes trop grandes pour la mémoire
+      (ex. UNIT_PRICE au niveau transaction, lu par DataLoader.iter_chunks) ;
+    - value_range : premier passage par lots pour fixer les bornes quand elles ne sont pas connues.
+
+Le dessin ne reçoit que (effectifs, bornes) : quelques dizaines de nombres, quelle que soit
+la taille des données.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _finite_values(values) -> np.ndarray:
+    """Valeurs numériques finies d'une colonne (NaN, manquantes et non numériques écartées)."""
+    if isinstance(values, pd.Series):
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    values = np.asarray(values, dtype="float64").ravel()
+    return values[np.isfinite(values)]
+
+
+def histogram_counts(values, bins=10, range: tuple | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Effectifs d'une colonne en mémoire.
+
+    Parameters
+    ----------
+    values : array-like | pd.Series
+        Valeurs (les NaN sont ignorés, comme dans ax.hist(df[col].dropna()))
+    bins : int | sequence
+        Nombre de classes de même largeur, ou bornes des classes
+    range : tuple | None
+        (min, max) des classes quand bins est un nombre (None = min et max des valeurs)
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (effectifs int64 de longueur n, bornes de longueur n + 1)
+    """
+    counts, edges = np.histogram(_finite_values(values), bins=bins, range=range)
+    return counts.astype("int64"), edges
+
+
+def value_range(chunks, col: str) -> tuple[float, float] | None:
+    """
+    Minimum et maximum d'une colonne lue par lots (premier passage avant HistogramAccumulator).
+
+    Returns
+    -------
+    tuple | None
+        (min, max), ou None si la colonne ne contient aucune valeur
+    """
+    low, high = np.inf, -np.inf
+    for chunk in chunks:
+        values = _finite_values(chunk[col])
+        if values.size:
+            low, high = min(low, values.min()), max(high, values.max())
+    return (float(low), float(high)) if low <= high else None
+
+
+class HistogramAccumulator:
+    """
+    Histogramme à bornes fixes construit par lots, en mémoire constante.
+    """
+
+    def __init__(self, edges):
+        """
+        Initialise un histogramme vide.
+
+        Parameters
+        ----------
+        edges : sequence
+            Bornes croissantes des classes (n + 1 bornes pour n classes) ; la dernière
+            classe inclut sa borne supérieure, comme numpy.histogram
+        """
+        edges = np.asarray(edges, dtype="float64")
+        if edges.ndim != 1 or edges.size < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("Les bornes doivent être au moins deux valeurs strictement croissantes")
+        self.edges = edges
+        # bornes régulières : chemin rapide de numpy.histogram (nombre de classes + intervalle)
+        self._uniform = bool(np.allclose(np.diff(edges), (edges[-1] - edges[0]) / (edges.size - 1)))
+        self.counts = np.zeros(edges.size - 1, dtype="int64")
+        self.underflow = 0  # valeurs sous la première borne
+        self.overflow = 0   # valeurs au-dessus de la dernière borne
+        self.missing = 0    # NaN / valeurs manquantes
+
+    @classmethod
+    def from_range(cls, low: float, high: float, bins: int = 10) -> "HistogramAccumulator":
+        """Crée un histogramme de bins classes de même largeur entre low et high (comme numpy.histogram)."""
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        return cls(np.linspace(low, high, bins + 1))
+
+    @property
+    def total(self) -> int:
+        """Nombre de valeurs comptées dans les classes."""
+        return int(self.counts.sum())
+
+    # -----------------------------
+    # Construction
+    # -----------------------------
+
+    def update(self, values) -> "HistogramAccumulator":
+        """Ajoute un lot de valeurs (hors bornes et manquantes comptées à part)."""
+        raw = values
+        values = _finite_values(values)
+        self.missing += len(raw) - values.size
+        below = values < self.edges[0]
+        above = values > self.edges[-1]
+        self.underflow += int(below.sum())
+        self.overflow += int(above.sum())
+        if self._uniform:
+            counts, _ = np.histogram(values, bins=self.counts.size, range=(self.edges[0], self.edges[-1]))
+        else:
+            counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+        return self
+
+    def update_chunks(self, chunks, col: str) -> "HistogramAccumulator":
+        """Ajoute la colonne col de chaque lot (ex. DataLoader.iter_chunks())."""
+        for chunk in chunks:
+            self.update(chunk[col])
+        return self
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        """Fusionne un histogramme de mêmes bornes (ex: autre partition) dans celui-ci."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Seuls des histogrammes de mêmes bornes peuvent être fusionnés")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.missing += other.missing
+        return self
+
+    def result(self) -> tuple[np.ndarray, np.ndarray]:
+        """(effectifs, bornes), au format de histogram_counts."""
+        return self.counts.copy(), self.edges.copy()
+
+
+def streaming_histogram(chunks_factory, col: str, bins: int = 10,
+                        range: tuple | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Histogramme d'une colonne lue par lots, sans jamais la charger en entier.
+
+    Parameters
+    ----------
+    chunks_factory : callable
+        Fonction sans argument renvoyant un nouvel itérateur de lots (ex.
+        lambda: loader.iter_chunks()) ; appelée deux fois si range est None
+        (un passage pour les bornes, un pour les effectifs)
+    col : str
+        Colonne à compter
+    bins : int
+        Nombre de classes de même largeur
+    range : tuple | None
+        (min, max) des classes ; None = min et max de la colonne
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        (effectifs, bornes), identiques à histogram_counts sur la colonne complète
+    """
+    if range is None:
+        range = value_range(chunks_factory(), col) or (0.0, 1.0)
+    accumulator = HistogramAccumulator.from_range(range[0], range[1], bins)
+    return accumulator.update_chunks(chunks_factory(), col).result()
@@ -0,0 +1,100 @@
+"""
+Module d'index de partitions pour des filtres d'égalité répétés.
+
+Un PartitionIndex est construit une seule fois sur un DataFrame : pour chaque
+colonne indexée, il associe chaque valeur aux positions de ses lignes. Un
+filtre "colonne == valeur" devient alors une simple recherche dans un dict :
+    - si les lignes de la valeur sont contiguës (DataFrame trié sur la colonne,
+      voir sort_by), le résultat est une tranche df.iloc[début:fin], sans copie
+      des données ;
+    - sinon, les positions sont extraites directement, sans masque booléen
+      sur toute la colonne.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class PartitionIndex:
+    """
+    Index valeur -> positions des lignes, pour une ou plusieurs colonnes.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list, sort_by: str | None = None):
+        """
+        Construit l'index.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Données à indexer
+        columns : list
+            Colonnes indexées (ex: INDEXED_COLS de src/config.py)
+        sort_by : str | None
+            Colonne sur laquelle trier les données (tri stable) avant l'indexation :
+            les filtres sur cette colonne renvoient alors des tranches sans copie.
+            Les données triées sont disponibles dans l'attribut df.
+        """
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Colonnes à indexer introuvables : {missing}")
+        if sort_by is not None:
+            df = df.sort_values(sort_by, kind="stable", ignore_index=True)
+        self.df = df
+        self.columns = list(columns)
+        self._partitions = {col: self._build(df[col]) for col in self.columns}
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._partitions
+
+    # -----------------------------
+    # Requêtes
+    # -----------------------------
+
+    def filter(self, column: str, value) -> pd.DataFrame:
+        """
+        Retourne les lignes où column == value.
+
+        Parameters
+        ----------
+        column : str
+            Colonne indexée
+        value
+            Valeur recherchée
+
+        Returns
+        -------
+        pd.DataFrame
+            Tranche de self.df (vide si la valeur est absente)
+        """
+        return self.df.iloc[self.positions(column, value)]
+
+    def count(self, column: str, value) -> int:
+        """Nombre de lignes où column == value, sans construire le résultat."""
+        positions = self.positions(column, value)
+        if isinstance(positions, slice):
+            return positions.stop - positions.start
+        return len(positions)
+
+    def positions(self, column: str, value) -> slice | np.ndarray:
+        """Positions des lignes où column == value (slice si elles sont contiguës)."""
+        if column not in self._partitions:
+            raise KeyError(f"La colonne '{column}' n'est pas indexée")
+        return self._partitions[column].get(value, slice(0, 0))
+
+    def values(self, column: str) -> list:
+        """Valeurs distinctes présentes dans une colonne indexée."""
+        return list(self._partitions[column])
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    @staticmethod
+    def _build(column: pd.Series) -> dict:
+        """Associe chaque valeur à une tranche (lignes contiguës) ou à un tableau de positions."""
+        partitions = {}
+        for value, positions in column.groupby(column, observed=True, sort=False).indices.items():
+            start, stop = int(positions[0]), int(positions[-1]) + 1
+            partitions[value] = slice(start, stop) if stop - start == len(positions) else positions
+        return partitions
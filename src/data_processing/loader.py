@@ -6,7 +6,10 @@ Renvoie toujours un DataFrame pour faciliter l'analyse.
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
 import pandas as pd
+from .utils import apply_load_profile
 
 
 class DataLoader:
@@ -14,9 +17,12 @@ class DataLoader:
     Classe responsable du chargement et de la gestion des données.
     """
 
-    SUPPORTED_EXTENSIONS = (".xlsx", ".xls", ".csv", ".json")
+    SUPPORTED_EXTENSIONS = (".xlsx", ".xls", ".csv", ".json", ".ndjson", ".jsonl")
+    DEFAULT_CHUNKSIZE = 100_000
+    # moteurs Excel : ceux de pandas.read_excel, et "stream" (openpyxl en lecture seule, ligne à ligne)
+    EXCEL_ENGINES = (None, "openpyxl", "calamine", "stream")
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, profile: dict | None = None, engine: str | None = None):
         """
         Initialise le DataLoader avec un chemin de fichier.
 
@@ -24,11 +30,40 @@ class DataLoader:
         ----------
         file_path : str
             Chemin complet du fichier de données à charger.
+        profile : dict | None
+            Profil de types compact (LOAD_PROFILE de src/config.py) appliqué à la lecture :
+            colonnes lues, category, downcast, format de date.
+        engine : str | None
+            Moteur de lecture Excel : None (choix de pandas), "openpyxl", "calamine"
+            (python-calamine, le plus rapide, si installé) ou "stream" (openpyxl en
+            lecture seule, sans construire le classeur complet en mémoire).
+
+        Notes
+        -----
+        Un fichier Excel n'est ouvert qu'une fois : le classeur est conservé et partagé
+        par list_sheets et load_data jusqu'à close() (ou la sortie d'un bloc with).
         """
+        if engine not in self.EXCEL_ENGINES:
+            raise ValueError(f"Moteur Excel inconnu : {engine} (attendu : {self.EXCEL_ENGINES})")
         self.file_path = file_path
+        self.profile = profile
+        self.engine = engine
+        self._workbook = None
         self._check_file()
         self.file_type = self._detect_file_type()
 
+    def __enter__(self) -> "DataLoader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Ferme le classeur Excel ouvert (il sera rouvert au besoin)."""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
     # -----------------------------
     # Vérifications de base
     # -----------------------------
@@ -43,7 +78,7 @@ class DataLoader:
             raise ValueError(f"Extension non supportée : {ext}")
 
     def _detect_file_type(self) -> str:
-        """Retourne le type du fichier : 'excel', 'csv', 'json'."""
+        """Retourne le type du fichier : 'excel', 'csv', 'json', 'ndjson'."""
         ext = os.path.splitext(self.file_path)[1].lower()
         if ext in (".xlsx", ".xls"):
             return "excel"
@@ -51,6 +86,8 @@ class DataLoader:
             return "csv"
         elif ext == ".json":
             return "json"
+        elif ext in (".ndjson", ".jsonl"):
+            return "ndjson"
         else:
             raise ValueError(f"Type de fichier inconnu : {ext}")
 
@@ -68,13 +105,12 @@ class DataLoader:
             return None
 
         try:
-            excel_file = pd.ExcelFile(self.file_path)
-            return excel_file.sheet_names
+            return self._sheet_names()
         except Exception as e:
             print(f"Erreur lors de la lecture des feuilles : {e}")
             return None
 
-    def load_data(self, sheet_name: str | None = None) -> pd.DataFrame:
+    def load_data(self, sheet_name: str | None = None, verbose: bool = False) -> pd.DataFrame:
         """
         Charge les données du fichier dans un DataFrame.
 
@@ -82,6 +118,8 @@ class DataLoader:
         ----------
         sheet_name : str | None
             Nom de la feuille à lire (si Excel). Si None, la première feuille est chargée.
+        verbose : bool
+            Afficher le gain mémoire du profil de chargement (comme fn.load_data).
 
         Returns
         -------
@@ -89,13 +127,85 @@ class DataLoader:
             Données chargées dans un DataFrame.
         """
         if self.file_type == "excel":
-            return self._load_excel(sheet_name)
+            df = self._load_excel(sheet_name)
         elif self.file_type == "csv":
-            return pd.read_csv(self.file_path)
+            df = pd.read_csv(self.file_path, **self._csv_options())
         elif self.file_type == "json":
-            return pd.read_json(self.file_path)
+            df = pd.read_json(self.file_path)
+        elif self.file_type == "ndjson":
+            df = pd.read_json(self.file_path, lines=True)
         else:
             raise ValueError(f"Format de fichier non supporté : {self.file_type}")
+        return apply_load_profile(df, self.profile, verbose=verbose and self.profile is not None)
+
+    def load_all_sheets(self, workers: int | None = None) -> dict:
+        """
+        Charge toutes les feuilles d'un fichier Excel, en parallèle.
+
+        Parameters
+        ----------
+        workers : int | None
+            Nombre de processus (None = nombre de cœurs, 1 = lecture séquentielle
+            avec le classeur partagé). Chaque processus ouvre le fichier une fois
+            et analyse une feuille ; le profil est appliqué à chaque feuille.
+
+        Returns
+        -------
+        dict
+            {nom de feuille: DataFrame}, dans l'ordre des feuilles du classeur
+        """
+        if self.file_type != "excel":
+            raise ValueError("Le chargement de toutes les feuilles n'est disponible que pour les fichiers Excel")
+        sheets = self._sheet_names()
+        workers = min(workers or os.cpu_count() or 1, len(sheets))
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    tasks = [(self.file_path, self.profile, self.engine, sheet) for sheet in sheets]
+                    return dict(zip(sheets, pool.map(_load_sheet, tasks)))
+            except (OSError, NotImplementedError):
+                # pool indisponible (ex. pas de sémaphores POSIX) : lecture séquentielle
+                pass
+        return {sheet: self.load_data(sheet) for sheet in sheets}
+
+    def iter_chunks(self, chunksize: int = DEFAULT_CHUNKSIZE,
+                    sheet_name: str | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Lit le fichier par blocs de lignes, sans jamais le charger en entier.
+
+        Parameters
+        ----------
+        chunksize : int
+            Nombre de lignes par bloc (borne la mémoire utilisée)
+        sheet_name : str | None
+            Nom de la feuille à lire (si Excel). Si None, la première feuille est lue.
+
+        Yields
+        ------
+        pd.DataFrame
+            Blocs successifs de chunksize lignes au plus.
+        """
+        if chunksize <= 0:
+            raise ValueError(f"chunksize doit être strictement positif : {chunksize}")
+
+        if self.file_type == "csv":
+            # pas de category par bloc : chaque bloc aurait ses propres catégories
+            options = {k: v for k, v in self._csv_options().items() if k != "dtype"}
+            with pd.read_csv(self.file_path, chunksize=chunksize, **options) as reader:
+                for chunk in reader:
+                    yield apply_load_profile(chunk, self.profile, categories=False)
+        elif self.file_type == "ndjson" or (self.file_type == "json" and self._is_ndjson()):
+            with pd.read_json(self.file_path, lines=True, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    yield apply_load_profile(chunk, self.profile, categories=False)
+        elif self.file_type == "excel":
+            for chunk in self._iter_excel_chunks(chunksize, sheet_name):
+                yield apply_load_profile(chunk, self.profile, categories=False)
+        else:
+            raise ValueError(
+                "La lecture par blocs d'un JSON tableau n'est pas possible : "
+                "utiliser un fichier JSON lignes (.ndjson / .jsonl)"
+            )
 
     # -----------------------------
     # Méthodes internes
@@ -106,10 +216,120 @@ class DataLoader:
         Charge un fichier Excel et retourne un DataFrame.
         Si sheet_name=None et plusieurs feuilles, prend la première feuille.
         """
-        excel_file = pd.ExcelFile(self.file_path)
         if sheet_name is None:
-            sheet_name = excel_file.sheet_names[0]
+            sheet_name = self._sheet_names()[0]
+        if self.engine == "stream":
+            return self._read_sheet_rows(sheet_name)
+        return self._excel_handle().parse(sheet_name, usecols=self._usecols())
+
+    def _excel_handle(self):
+        """
+        Classeur ouvert une seule fois et réutilisé : pd.ExcelFile, ou classeur
+        openpyxl en lecture seule pour le moteur "stream".
+        """
+        if self._workbook is None:
+            if self.engine == "stream":
+                from openpyxl import load_workbook
+                self._workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+            else:
+                try:
+                    self._workbook = pd.ExcelFile(self.file_path, engine=self.engine)
+                except ImportError as e:
+                    raise ValueError(f"Moteur Excel '{self.engine}' indisponible : {e}") from e
+        return self._workbook
+
+    def _sheet_names(self) -> list:
+        handle = self._excel_handle()
+        return list(handle.sheetnames if self.engine == "stream" else handle.sheet_names)
+
+    def _read_sheet_rows(self, sheet_name: str) -> pd.DataFrame:
+        """Lit une feuille ligne à ligne (moteur "stream"), les colonnes hors profil sont écartées."""
+        columns, rows = self._sheet_rows(sheet_name)
+        if columns is None:
+            return pd.DataFrame()
+        return pd.DataFrame(list(rows), columns=columns)
+
+    def _sheet_rows(self, sheet_name: str) -> tuple:
+        """
+        En-tête et lignes d'une feuille lues ligne à ligne dans le classeur openpyxl du
+        DataLoader : colonnes limitées au profil (usecols), lignes entièrement vides écartées.
+
+        Returns
+        -------
+        tuple
+            (colonnes gardées, itérateur de lignes), ou (None, itérateur vide) si la feuille est vide
+        """
+        rows = self._openpyxl_workbook()[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return None, iter(())
+        usecols = self._usecols()
+        keep = [i for i, col in enumerate(header) if usecols is None or usecols(col)]
+        data = ([row[i] for i in keep] for row in rows if any(value is not None for value in row))
+        return [header[i] for i in keep], data
+
+    def _openpyxl_workbook(self):
+        """
+        Classeur openpyxl (lecture seule) du DataLoader : celui du moteur "stream", ou
+        celui ouvert par pd.ExcelFile avec le moteur openpyxl (pas de second classeur).
+        """
+        handle = self._excel_handle()
+        if self.engine == "stream":
+            return handle
+        book = getattr(handle, "book", None)
+        if not hasattr(book, "worksheets"):
+            raise ValueError(f"La lecture ligne à ligne nécessite le moteur openpyxl ou \"stream\" "
+                             f"(moteur : {self.engine})")
+        return book
+
+    def _usecols(self):
+        """Filtre de colonnes du profil (None = toutes les colonnes)."""
+        if not self.profile or "usecols" not in self.profile:
+            return None
+        usecols = set(self.profile["usecols"])
+        return lambda col: col in usecols
+
+    def _csv_options(self) -> dict:
+        """Options de read_csv dérivées du profil : élagage des colonnes et category à la lecture."""
+        if not self.profile:
+            return {}
+        return {
+            "usecols": self._usecols(),
+            "dtype": {col: "category" for col in self.profile.get("categories", [])},
+        }
+
+    def _iter_excel_chunks(self, chunksize: int, sheet_name: str | None) -> Iterator[pd.DataFrame]:
+        """
+        Lit une feuille Excel ligne à ligne (openpyxl en lecture seule, classeur du
+        DataLoader) et regroupe les lignes en DataFrames de chunksize lignes ; mêmes
+        colonnes et mêmes lignes que le moteur "stream" (voir _sheet_rows).
+        """
+        if os.path.splitext(self.file_path)[1].lower() != ".xlsx":
+            raise ValueError("La lecture par blocs n'est disponible que pour les fichiers .xlsx")
+
+        columns, rows = self._sheet_rows(sheet_name if sheet_name is not None else self._sheet_names()[0])
+        if columns is None:
+            return
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+
+    def _is_ndjson(self) -> bool:
+        """Indique si un fichier .json est au format JSON lignes (un objet par ligne)."""
+        with open(self.file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    return line.lstrip().startswith("{")
+        return False
 
-        df = pd.read_excel(self.file_path, sheet_name=sheet_name)
-        return df
 
+def _load_sheet(task: tuple) -> pd.DataFrame:
+    """Exécuté dans un processus de DataLoader.load_all_sheets : lit une feuille."""
+    file_path, profile, engine, sheet_name = task
+    with DataLoader(file_path, profile=profile, engine=engine) as loader:
+        return loader.load_data(sheet_name)
@@ -0,0 +1,192 @@
+"""
+Module d'estimation approchée de quantiles (médiane, déciles...) par sketch KLL.
+
+Un KLLSketch résume une colonne en O(k) valeurs, quelle que soit sa taille :
+il se construit par lots (update), se fusionne entre partitions (merge) et
+répond aux quantiles avec une erreur de rang normalisée d'environ 1.65 / k.
+Tant qu'aucune compaction n'a eu lieu (moins de k valeurs), le résultat est
+exact et identique à pandas (interpolation linéaire).
+
+Les fonctions d'agrégation "approx_median" et "approx_quantile:<q>" de
+config.QUESTIONS s'appuient sur ce module.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_ERROR = 0.01  # erreur de rang normalisée visée par défaut (k = 165)
+
+
+class KLLSketch:
+    """
+    Sketch KLL fusionnable pour l'estimation de quantiles.
+    """
+
+    RANK_ERROR_FACTOR = 1.65  # erreur de rang normalisée ≈ RANK_ERROR_FACTOR / k
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        """
+        Initialise un sketch vide.
+
+        Parameters
+        ----------
+        k : int
+            Taille du compacteur de plus haut niveau (précision / mémoire)
+        seed : int
+            Graine du tirage des compactions (résultats reproductibles)
+        """
+        if k < 8:
+            raise ValueError(f"k doit être >= 8 (reçu : {k})")
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_error(cls, error: float = DEFAULT_ERROR, seed: int = 0) -> "KLLSketch":
+        """Crée un sketch dont l'erreur de rang normalisée vaut environ error."""
+        if not 0 < error < 1:
+            raise ValueError(f"L'erreur doit être comprise entre 0 et 1 (reçu : {error})")
+        return cls(max(8, math.ceil(cls.RANK_ERROR_FACTOR / error)), seed)
+
+    @property
+    def error(self) -> float:
+        """Erreur de rang normalisée attendue."""
+        return self.RANK_ERROR_FACTOR / self.k
+
+    # -----------------------------
+    # Construction
+    # -----------------------------
+
+    def update(self, values) -> "KLLSketch":
+        """Ajoute un lot de valeurs (les NaN sont ignorés, comme en pandas)."""
+        values = np.asarray(values, dtype="float64").ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += values.size
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fusionne un autre sketch (ex: autre partition) dans celui-ci."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    # -----------------------------
+    # Requêtes
+    # -----------------------------
+
+    def quantile(self, q: float) -> float:
+        """
+        Estime le quantile q (0 <= q <= 1).
+
+        Returns
+        -------
+        float
+            Quantile estimé, NaN si le sketch est vide
+        """
+        if self.n == 0:
+            return float("nan")
+        if all(items.size == 0 for items in self.levels[1:]):
+            # aucune compaction : toutes les valeurs sont connues, résultat exact
+            return float(np.quantile(self.levels[0], q))
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level_items.size, 2 ** level)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        position = min(np.searchsorted(cumulative, q * cumulative[-1]), items.size - 1)
+        return float(items[order][position])
+
+    def median(self) -> float:
+        """Estime la médiane."""
+        return self.quantile(0.5)
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        """Compacte les niveaux pleins : la moitié des valeurs triées monte d'un niveau (poids x2)."""
+        while True:
+            full = [level for level, items in enumerate(self.levels) if items.size > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(self.levels[level])
+            kept = items[:0]
+            if items.size % 2:
+                kept, items = items[-1:], items[:-1]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+
+# -----------------------------------------------------
+# Fonctions d'agrégation par groupe
+# -----------------------------------------------------
+
+def parse_quantile_func(agg_func) -> float | None:
+    """
+    Reconnaît les fonctions d'agrégation approchées de config.QUESTIONS.
+
+    "approx_median" -> 0.5, "approx_quantile:0.9" -> 0.9, autre -> None
+    """
+    if not isinstance(agg_func, str):
+        return None
+    if agg_func == "approx_median":
+        return 0.5
+    if agg_func.startswith("approx_quantile:"):
+        q = float(agg_func.split(":", 1)[1])
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile hors de [0, 1] : {agg_func}")
+        return q
+    return None
+
+def groupby_sketches(df: pd.DataFrame, group_cols: list, agg_col: str,
+                     error: float = DEFAULT_ERROR) -> pd.Series:
+    """
+    Construit un KLLSketch par groupe (un lot = une partition ou un chunk du fichier).
+
+    Returns
+    -------
+    pd.Series
+        Sketches indexés par les clés de groupement, dans l'ordre de df.groupby
+    """
+    grouped = df.groupby(group_cols, observed=True)[agg_col]
+    sketches = [KLLSketch.from_error(error).update(values.to_numpy()) for _, values in grouped]
+    return pd.Series(sketches, index=grouped.size().index, dtype="object", name=agg_col)
+
+def merge_group_sketches(left: pd.Series, right: pd.Series) -> pd.Series:
+    """
+    Fusionne deux séries de sketches par groupe (ex: deux chunks d'un même fichier).
+
+    Les sketches de left sont modifiés en place ; les groupes présents d'un seul côté sont conservés.
+    """
+    merged = dict(left.items())
+    for key, sketch in right.items():
+        merged[key] = merged[key].merge(sketch) if key in merged else sketch
+    result = pd.Series(merged, dtype="object", name=left.name)
+    result.index.names = left.index.names
+    return result.sort_index()
+
+def groupby_approx_quantile(df: pd.DataFrame, group_cols: list, agg_col: str, q: float,
+                            error: float = DEFAULT_ERROR) -> pd.Series:
+    """Quantile approché de agg_col par groupe (Series indexée par les clés de groupement)."""
+    sketches = groupby_sketches(df, group_cols, agg_col, error)
+    return sketches.map(lambda sketch: sketch.quantile(q)).astype("float64")
@@ -0,0 +1,325 @@
+"""
+Module de stockage des ventes dans une base locale (SQLite, ou DuckDB si installé).
+
+Les données sont ingérées une fois, par blocs (DataLoader.iter_chunks), dans une
+table indexée ; les agrégations sont ensuite calculées par le moteur SQL, sans
+charger les lignes en mémoire : seuls les résultats agrégés (une ligne par groupe)
+reviennent en pandas. La mémoire utilisée ne dépend donc pas de la taille du fichier.
+
+Les résultats ont le même format et les mêmes types que le chemin pandas
+(planner.execute_step) : les types d'origine des colonnes (category, Period,
+int32...) sont enregistrés à l'ingestion et restaurés sur les résultats.
+
+Agrégations supportées : sum, mean, min, max, count, std, var, median, size,
+ainsi que approx_median / approx_quantile:<q>, calculés exactement en SQL
+(identiques au sketch KLL tant qu'un groupe compte moins de ~165 valeurs).
+"""
+
+import json
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from .sketch import parse_quantile_func
+
+try:
+    import duckdb
+except ImportError:  # moteur optionnel
+    duckdb = None
+
+
+SIZE_AGG = "size"
+SIMPLE_FUNCS = {"sum": "SUM", "mean": "AVG", "min": "MIN", "max": "MAX", "count": "COUNT"}
+MOMENT_FUNCS = ("std", "var")
+
+
+class SQLBackend:
+    """
+    Table de ventes dans une base locale, interrogée par agrégations groupées.
+    """
+
+    def __init__(self, path: str, engine: str | None = None, table: str = "sales"):
+        """
+        Ouvre (ou crée) la base.
+
+        Parameters
+        ----------
+        path : str
+            Fichier de la base (":memory:" pour une base temporaire)
+        engine : str | None
+            "sqlite", "duckdb", ou None (DuckDB s'il est installé, sinon SQLite)
+        table : str
+            Nom de la table des ventes
+        """
+        if engine is None:
+            engine = "duckdb" if duckdb is not None else "sqlite"
+        if engine not in ("sqlite", "duckdb"):
+            raise ValueError(f"Moteur SQL inconnu : {engine}")
+        if engine == "duckdb" and duckdb is None:
+            raise ValueError("Le moteur 'duckdb' n'est pas installé")
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.engine = engine
+        self.table = table
+        self.con = duckdb.connect(path) if engine == "duckdb" else sqlite3.connect(path)
+        self.con.execute("CREATE TABLE IF NOT EXISTS _meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._categories = {}
+
+    def __enter__(self) -> "SQLBackend":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Ferme la connexion à la base."""
+        self.con.close()
+
+    # -----------------------------
+    # Ingestion
+    # -----------------------------
+
+    def ingest(self, chunks, index_cols: list | None = None, categories: list | None = None,
+               source: str | None = None) -> int:
+        """
+        Remplace le contenu de la table par les blocs fournis.
+
+        Parameters
+        ----------
+        chunks : Iterable[pd.DataFrame]
+            Blocs de lignes (mêmes colonnes), ex: DataLoader.iter_chunks enrichis
+            des colonnes année / trimestre
+        index_cols : list | None
+            Colonnes indexées (ex: INDEXED_COLS de src/config.py)
+        categories : list | None
+            Colonnes à restituer en category (comme le profil de chargement, les blocs
+            n'ayant pas de catégories communes)
+        source : str | None
+            Empreinte de la source (voir is_current), enregistrée avec les données
+
+        Returns
+        -------
+        int
+            Nombre de lignes ingérées
+        """
+        self.con.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+        dtypes, rows = {}, 0
+        for chunk in chunks:
+            for col, dtype in chunk.dtypes.items():
+                dtypes[col] = _widest_dtype(dtypes.get(col), dtype)
+            self._insert(_to_storage(chunk), create=rows == 0)
+            rows += len(chunk)
+        for col in categories or []:
+            if col in dtypes:
+                dtypes[col] = "category"
+        for col in index_cols or []:
+            if col in dtypes:
+                self.con.execute(f'CREATE INDEX "{self.table}_{col}" ON "{self.table}" ("{col}")')
+
+        self._set_meta("dtypes", {col: str(dtype) for col, dtype in dtypes.items()})
+        self._set_meta("rows", rows)
+        self._set_meta("source", source)
+        self.con.commit()
+        self._categories = {}
+        return rows
+
+    def is_current(self, source: str | None) -> bool:
+        """Indique si la base contient déjà les données de la source (même empreinte)."""
+        return source is not None and self._get_meta("source") == source
+
+    @property
+    def rows(self) -> int:
+        """Nombre de lignes ingérées."""
+        return self._get_meta("rows") or 0
+
+    # -----------------------------
+    # Requêtes
+    # -----------------------------
+
+    def execute_step(self, keys: tuple, aggs: list[tuple]) -> pd.DataFrame:
+        """
+        Calcule en SQL toutes les agrégations d'un jeu de clés (équivalent de planner.execute_step).
+
+        Parameters
+        ----------
+        keys : tuple
+            Colonnes de groupement
+        aggs : list[tuple]
+            Couples (colonne, fonction), (None, "size") pour un comptage
+
+        Returns
+        -------
+        pd.DataFrame
+            Une ligne par groupe (trié par clés), colonnes clés puis "colonne|fonction" / "size"
+        """
+        keys = list(keys)
+        key_sql = ", ".join(f't."{col}"' for col in keys)
+        where = " AND ".join(f't."{col}" IS NOT NULL' for col in keys)
+        dtypes = self._get_meta("dtypes")
+
+        selects, moment_cols, quantiles = [], [], []
+        for col, func in aggs:
+            name = _agg_name(col, func)
+            if func == SIZE_AGG:
+                selects.append(f'COUNT(*) AS "{name}"')
+            elif func == "sum":
+                selects.append(f'COALESCE(SUM(t."{col}"), 0) AS "{name}"')
+            elif func in SIMPLE_FUNCS:
+                selects.append(f'{SIMPLE_FUNCS[func]}(t."{col}") AS "{name}"')
+            elif func in MOMENT_FUNCS:
+                moment_cols.append(col)
+                deviation = f'(t."{col}" - m."{col}|mu")'
+                variance = f'SUM({deviation} * {deviation}) / (COUNT(t."{col}") - 1)'
+                selects.append(f'{variance} AS "{name}"')  # racine prise après la requête pour std
+            elif func == "median" or parse_quantile_func(func) is not None:
+                quantiles.append((col, func, 0.5 if func == "median" else parse_quantile_func(func)))
+            else:
+                raise ValueError(f"Agrégation '{func}' non supportée par le moteur SQL")
+
+        source = f'"{self.table}" t'
+        if moment_cols:
+            # variance en deux passes (moyenne par groupe, puis écarts) : même précision que pandas
+            means = ", ".join(f'AVG(t."{col}") AS "{col}|mu"' for col in dict.fromkeys(moment_cols))
+            join = " AND ".join(f't."{col}" = m."{col}"' for col in keys)
+            source += (f' JOIN (SELECT {key_sql}, {means} FROM "{self.table}" t '
+                       f'WHERE {where} GROUP BY {key_sql}) m ON {join}')
+        key_select = ", ".join(f't."{col}" AS "{col}"' for col in keys)
+        sql = (f"SELECT {key_select}{''.join(', ' + select for select in selects)} FROM {source} "
+               f"WHERE {where} GROUP BY {key_sql} ORDER BY {key_sql}")
+        result = self._query(sql)
+        for col, func in aggs:
+            if func == "std":
+                result[_agg_name(col, func)] = np.sqrt(result[_agg_name(col, func)].astype("float64"))
+
+        for col, func, q in quantiles:
+            values = self._quantile(keys, col, q)
+            result = result.merge(values.rename(_agg_name(col, func)), how="left",
+                                  left_on=keys, right_index=True)
+
+        result = self._restore_keys(result, keys, dtypes)
+        for col, func in aggs:
+            name = _agg_name(col, func)
+            result[name] = result[name].astype(_result_dtype(func, dtypes.get(col)))
+        return result[keys + [_agg_name(col, func) for col, func in aggs]]
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _quantile(self, keys: list, col: str, q: float) -> pd.Series:
+        """
+        Quantile exact par groupe (interpolation linéaire, comme numpy) : seules les
+        deux valeurs encadrant le rang q * (n - 1) de chaque groupe sont lues.
+        """
+        key_sql = ", ".join(f'"{c}"' for c in keys)
+        where = " AND ".join(f'"{c}" IS NOT NULL' for c in keys + [col])
+        sql = (f'SELECT {key_sql}, "{col}" AS value, rn, n FROM ('
+               f'SELECT {key_sql}, "{col}", ROW_NUMBER() OVER (PARTITION BY {key_sql} ORDER BY "{col}") - 1 AS rn, '
+               f'COUNT(*) OVER (PARTITION BY {key_sql}) AS n FROM "{self.table}" WHERE {where}) r '
+               f'WHERE rn >= {q!r} * (n - 1) - 1 AND rn <= {q!r} * (n - 1) + 1')
+        rows = self._query(sql)
+        values = {}
+        for key, group in rows.groupby(keys, sort=False):
+            n = int(group["n"].iloc[0])
+            position = q * (n - 1)
+            lo = int(np.floor(position))
+            hi = min(lo + 1, n - 1)
+            by_rank = dict(zip(group["rn"].astype(int), group["value"].astype("float64")))
+            a, b, t = by_rank[lo], by_rank[hi], position - lo
+            # même formule que numpy (_lerp) pour un résultat identique au bit près
+            values[key] = b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t
+        index = pd.MultiIndex.from_tuples(list(values), names=keys) if len(keys) > 1 else \
+            pd.Index([k[0] if isinstance(k, tuple) else k for k in values], name=keys[0])
+        return pd.Series(list(values.values()), index=index, dtype="float64")
+
+    def _restore_keys(self, result: pd.DataFrame, keys: list, dtypes: dict) -> pd.DataFrame:
+        """Restaure le type d'origine des colonnes clés (category, Period, datetime, entiers...)."""
+        for col in keys:
+            dtype = dtypes.get(col)
+            if dtype == "category":
+                result[col] = pd.Categorical(result[col], categories=self._category_values(col))
+            elif dtype is not None and dtype.startswith("period"):
+                result[col] = pd.PeriodIndex(result[col], freq=pd.api.types.pandas_dtype(dtype).freq)
+            elif dtype is not None and dtype.startswith("datetime"):
+                result[col] = pd.to_datetime(result[col]).astype(dtype)
+            elif dtype is not None:
+                result[col] = result[col].astype(dtype)
+        return result.reset_index(drop=True)
+
+    def _category_values(self, col: str) -> list:
+        """Catégories d'une colonne : valeurs distinctes triées (comme astype("category"))."""
+        if col not in self._categories:
+            values = self._query(f'SELECT DISTINCT "{col}" AS v FROM "{self.table}" '
+                                 f'WHERE "{col}" IS NOT NULL ORDER BY "{col}"')["v"]
+            self._categories[col] = values.tolist()
+        return self._categories[col]
+
+    def _insert(self, df: pd.DataFrame, create: bool) -> None:
+        if self.engine == "duckdb":
+            self.con.register("_chunk", df)
+            if create:
+                self.con.execute(f'CREATE TABLE "{self.table}" AS SELECT * FROM _chunk')
+            else:
+                self.con.execute(f'INSERT INTO "{self.table}" SELECT * FROM _chunk')
+            self.con.unregister("_chunk")
+        else:
+            df.to_sql(self.table, self.con, if_exists="replace" if create else "append", index=False)
+
+    def _query(self, sql: str) -> pd.DataFrame:
+        if self.engine == "duckdb":
+            return self.con.execute(sql).df()
+        return pd.read_sql_query(sql, self.con)
+
+    def _set_meta(self, key: str, value) -> None:
+        self.con.execute("DELETE FROM _meta WHERE key = ?", [key])
+        self.con.execute("INSERT INTO _meta VALUES (?, ?)", [key, json.dumps(value)])
+
+    def _get_meta(self, key: str):
+        row = self.con.execute("SELECT value FROM _meta WHERE key = ?", [key]).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+# -----------------------------------------------------
+# Conversions de types
+# -----------------------------------------------------
+
+def _agg_name(col, func) -> str:
+    """Nom de la colonne résultat (identique à planner._agg_name)."""
+    return SIZE_AGG if func == SIZE_AGG else f"{col}|{func}"
+
+def _to_storage(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertit les types sans équivalent SQL : category et Period en texte, dates en ISO."""
+    converted = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            converted[col] = df[col].astype(dtype.categories.dtype)
+        elif isinstance(dtype, pd.PeriodDtype):
+            converted[col] = df[col].astype(str).where(df[col].notna(), None)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            converted[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif pd.api.types.is_bool_dtype(dtype):
+            converted[col] = df[col].astype("int64")
+    return df.assign(**converted) if converted else df
+
+def _widest_dtype(previous, dtype):
+    """Type commun de deux blocs : les entiers réduits par bloc (downcast) sont élargis."""
+    if previous is None or previous == dtype:
+        return dtype
+    if isinstance(previous, np.dtype) and isinstance(dtype, np.dtype) and \
+            previous.kind in "iuf" and dtype.kind in "iuf":
+        return np.promote_types(previous, dtype)
+    return previous
+
+def _result_dtype(func: str, source_dtype: str | None) -> str:
+    """Type du résultat d'une agrégation, identique à celui de pandas groupby.agg."""
+    if func in (SIZE_AGG, "count"):
+        return "int64"
+    source = np.dtype(source_dtype) if source_dtype and source_dtype[0] in "iuf" else np.dtype("float64")
+    if func in ("min", "max"):
+        return str(source)
+    if func == "sum":
+        return "int64" if source.kind in "iu" else str(source)
+    if parse_quantile_func(func) is not None:
+        return "float64"
+    return str(source) if source.kind == "f" else "float64"
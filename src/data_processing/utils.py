@@ -3,6 +3,7 @@ Fonctions utilitaires pour le projet data_processing
 """
 
 import os
+import numpy as np
 import pandas as pd
 
 """
@@ -58,3 +59,190 @@ def ensure_test_data():
     if not os.path.exists(json_path):
         df_csv = pd.read_csv(csv_path)
         df_csv.to_json(json_path, orient="records", indent=2)
+
+
+"""
+Profil de chargement compact (voir LOAD_PROFILE dans src/config.py) :
+    - "usecols"     : colonnes à lire, les autres sont ignorées dès la lecture
+    - "categories"  : colonnes texte chargées en category (clés de groupement)
+    - "downcast"    : {colonne: "integer" | "float"} ; "integer" est sans perte,
+                      "float" passe en float32 (perte de précision sur les montants)
+    - "date_col" / "date_format" : format explicite des dates lues sous forme de texte
+"""
+def apply_load_profile(df: pd.DataFrame, profile: dict | None, categories: bool = True,
+                       verbose: bool = False) -> pd.DataFrame:
+    """
+    Applique un profil de types compact à un DataFrame déjà lu.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Données brutes
+    profile : dict | None
+        Profil de chargement (None = DataFrame inchangé)
+    categories : bool
+        Convertir les colonnes "categories" (désactivé pour une lecture par blocs,
+        où chaque bloc aurait ses propres catégories)
+    verbose : bool
+        Afficher la mémoire occupée avant / après conversion
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame converti
+    """
+    if not profile:
+        return df
+
+    before = df.memory_usage(deep=True).sum() if verbose else 0
+    usecols = [col for col in profile.get("usecols", df.columns) if col in df.columns]
+    df = df[usecols].copy()
+
+    date_col = profile.get("date_col")
+    if date_col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+        df[date_col] = pd.to_datetime(df[date_col], format=profile.get("date_format"))
+
+    if categories:
+        for col in profile.get("categories", []):
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
+    for col, kind in profile.get("downcast", {}).items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast=kind)
+
+    if verbose:
+        after = df.memory_usage(deep=True).sum()
+        print(f"Mémoire : {before / 1e6:.2f} Mo -> {after / 1e6:.2f} Mo ({len(df)} lignes)")
+    return df
+
+
+"""
+Génération de données de ventes synthétiques, au format de data/input/Data_Load.xlsx
+(ID, FIRST_NAME, LAST_NAME, SELLER, DATE, QUANTITY, UNIT_PRICE, TOTAL, MONTH, QUARTER,
+WEEK, YEAR), pour mesurer le pipeline à grande échelle (voir tests/benchmarks).
+La génération est reproductible (seed) et se fait par blocs : un fichier CSV ou
+Parquet de 1e8 lignes s'écrit sans jamais tenir en mémoire.
+"""
+FIRST_NAMES = ["Alice", "Bob", "Chloé", "David", "Emma", "Farid", "Gary", "Hugo", "Inès", "Julie",
+               "Karim", "Léa", "Mario", "Nina", "Omar", "Paul", "Rose", "Sofia", "Tom", "Yasmine"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Durand", "Leroy", "Moreau", "Simon", "Laurent",
+              "Michel", "Garcia", "Walker", "Hunter", "Pitts", "Tate", "Freeman", "Saunders"]
+EXCEL_MAX_ROWS = 1_048_575  # limite d'une feuille Excel, ligne d'en-tête exclue
+
+def iter_sales_data(n_rows: int, n_sellers: int = 50, years: tuple = (2022, 2025),
+                    seed: int = 0, chunksize: int = 1_000_000):
+    """
+    Génère des données de ventes synthétiques par blocs.
+
+    Parameters
+    ----------
+    n_rows : int
+        Nombre total de lignes
+    n_sellers : int
+        Nombre de vendeurs distincts
+    years : tuple
+        Première et dernière année couvertes (incluses)
+    seed : int
+        Graine aléatoire (même graine et mêmes paramètres, chunksize compris = mêmes données)
+    chunksize : int
+        Nombre de lignes par bloc
+
+    Yields
+    ------
+    pd.DataFrame
+        Blocs successifs (ID continu d'un bloc à l'autre)
+    """
+    rng = np.random.default_rng(seed)
+    sellers = [_seller_name(i) for i in range(n_sellers)]
+    # quelques vendeurs réalisent l'essentiel des ventes (loi de Zipf tronquée)
+    weights = 1 / np.arange(1, n_sellers + 1)
+    weights /= weights.sum()
+    start = np.datetime64(f"{years[0]}-01-01")
+    n_days = int((np.datetime64(f"{years[1] + 1}-01-01") - start).astype(int))
+
+    for offset in range(0, n_rows, chunksize):
+        size = min(chunksize, n_rows - offset)
+        dates = pd.DatetimeIndex(start + rng.integers(0, n_days, size).astype("timedelta64[D]"))
+        quantity = rng.integers(1, 11, size)
+        unit_price = np.round(rng.uniform(5, 100, size), 2)
+        yield pd.DataFrame({
+            "ID": np.arange(offset + 1, offset + size + 1),
+            "FIRST_NAME": np.take(FIRST_NAMES, rng.integers(0, len(FIRST_NAMES), size)),
+            "LAST_NAME": np.take(LAST_NAMES, rng.integers(0, len(LAST_NAMES), size)),
+            "SELLER": np.take(sellers, rng.choice(n_sellers, size, p=weights)),
+            "DATE": dates,
+            "QUANTITY": quantity,
+            "UNIT_PRICE": unit_price,
+            "TOTAL": np.round(quantity * unit_price, 2),
+            "MONTH": dates.month.astype("int64"),
+            "QUARTER": dates.quarter.astype("int64"),
+            "WEEK": dates.isocalendar().week.to_numpy(dtype="int64"),
+            "YEAR": dates.year.astype("int64"),
+        })
+
+def _seller_name(i: int) -> str:
+    """Nom unique du i-ème vendeur ("Alice Martin", ..., puis "Alice Martin 2"...)."""
+    first, rest = i % len(FIRST_NAMES), i // len(FIRST_NAMES)
+    name = f"{FIRST_NAMES[first]} {LAST_NAMES[rest % len(LAST_NAMES)]}"
+    return name if rest < len(LAST_NAMES) else f"{name} {rest // len(LAST_NAMES) + 1}"
+
+def generate_sales_data(n_rows: int, n_sellers: int = 50, years: tuple = (2022, 2025),
+                        seed: int = 0) -> pd.DataFrame:
+    """Génère des données de ventes synthétiques en un seul DataFrame (voir iter_sales_data)."""
+    chunks = list(iter_sales_data(n_rows, n_sellers, years, seed, chunksize=max(n_rows, 1)))
+    return pd.concat(chunks, ignore_index=True) if chunks else next(iter_sales_data(1)).iloc[:0]
+
+def write_sales_data(path: str, n_rows: int, n_sellers: int = 50, years: tuple = (2022, 2025),
+                     seed: int = 0, chunksize: int = 1_000_000) -> str:
+    """
+    Écrit un fichier de ventes synthétiques ; le format dépend de l'extension.
+
+    Parameters
+    ----------
+    path : str
+        Fichier à créer : .xlsx, .csv, .json (tableau d'enregistrements) ou .parquet
+    n_rows, n_sellers, years, seed, chunksize
+        Voir iter_sales_data
+
+    Returns
+    -------
+    str
+        Chemin du fichier créé
+
+    Notes
+    -----
+    CSV et Parquet sont écrits bloc par bloc (mémoire bornée par chunksize).
+    Excel est limité à EXCEL_MAX_ROWS lignes ; JSON est écrit en une fois.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in (".xlsx", ".csv", ".json", ".parquet"):
+        raise ValueError(f"Format non supporté : {ext}")
+    if ext == ".xlsx" and n_rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"Une feuille Excel est limitée à {EXCEL_MAX_ROWS} lignes (demandé : {n_rows})")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    chunks = iter_sales_data(n_rows, n_sellers, years, seed, chunksize)
+
+    if ext == ".csv":
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, index=False, mode="w" if i == 0 else "a", header=i == 0,
+                         date_format="%Y-%m-%d")
+    elif ext == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        df = pd.concat(list(chunks), ignore_index=True)
+        if ext == ".xlsx":
+            df.to_excel(path, index=False)
+        else:
+            df.to_json(path, orient="records", date_format="iso")
+    return path
@@ -1,14 +1,43 @@
 # === IMPORTS ===
 import os               #gestion des chemins et répertoires
+import hashlib          # empreinte des fichiers pour le cache
+import json             # paramètres de rendu dans la clé du cache de rendu
+import shutil           # copie des images du cache de rendu
+import pickle           # transfert des figures entre processus de rendu
+import time             # mesure du rendu dans les processus du pool
+import sys              # détection de PdfPages sans importer matplotlib
+import zipfile          # conteneur des classeurs ODS écrits en flux
+import warnings         # cache Parquet non écrit (le chargement continue sans lui)
+import numpy as np
 import pandas as pd          # Pour la manipulation des données tabulaires
-import matplotlib.pyplot as plt  # Pour la génération des graphiques et tableaux
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib.metadata import version
 from pathlib import Path
-from typing import Union
-from matplotlib.axes import Axes
-from matplotlib.backends.backend_pdf import PdfPages
+from typing import TYPE_CHECKING, Iterator, Union
+from xml.sax.saxutils import escape
+if TYPE_CHECKING:  # matplotlib n'est importé qu'au premier rendu (voir _pyplot)
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_pdf import PdfPages
+try:
+    from .data_processing.histogram import histogram_counts
+    from .data_processing.sketch import DEFAULT_ERROR, parse_quantile_func, groupby_approx_quantile
+    from .data_processing.utils import EXCEL_MAX_ROWS, apply_load_profile
+    from .instrumentation import NULL_TRACER
+except ImportError:  # exécution directe depuis src/ (python main.py)
+    from data_processing.histogram import histogram_counts
+    from data_processing.sketch import DEFAULT_ERROR, parse_quantile_func, groupby_approx_quantile
+    from data_processing.utils import EXCEL_MAX_ROWS, apply_load_profile
+    from instrumentation import NULL_TRACER
 
 # === DATA LOADING ===
-def load_data(file_path: Union[str, Path], date_col: str, year_col: str, quarter_col: str) -> pd.DataFrame:
+CACHE_FORMAT_VERSION = 1  # à incrémenter si l'enrichissement de load_data change
+
+def load_data(file_path: Union[str, Path], date_col: str, year_col: str, quarter_col: str,
+              cache_dir: Union[str, Path, None] = None, max_cache_entries: int = 8,
+              hash_content: bool = False, profile: dict | None = None,
+              quarter_as_int: bool = False, verbose: bool = False) -> pd.DataFrame:
     """
     Charge un fichier Excel, ajoute les colonnes année et trimestre.
 
@@ -17,23 +46,185 @@ def load_data(file_path: Union[str, Path], date_col: str, year_col: str, quarter
         date_col (str): nom de la colonne contenant la date
         year_col (str): nom de la colonne à créer pour l'année
         quarter_col (str): nom de la colonne à créer pour le trimestre
+        cache_dir (str | None): dossier du cache Parquet (None = pas de cache)
+        max_cache_entries (int): nombre maximal de fichiers conservés dans le cache
+        hash_content (bool): clé de cache sur le contenu du fichier (sha256)
+            plutôt que sur sa taille et sa date de modification
+        profile (dict | None): profil de types compact (LOAD_PROFILE de config.py) :
+            colonnes lues, category, downcast, format de date
+        quarter_as_int (bool): trimestre codé en entier int32 année*10+trimestre (20231)
+            au lieu d'une Period, formaté en "2023Q1" seulement à l'affichage
+        verbose (bool): afficher le gain mémoire du profil (lecture sans cache uniquement)
 
     Scripts:
-        1. lecture du fichier Excel et conversion de la colonne de date (date_col) en objets datetime
-        2. Création d'une nouvelle colonne (nommée year_col) et extraction de l'année
-        3. Création d'une nouvelle colonne (nommée quarter_col)
-            et extraction du trimestre sous la forme "YYYYQn" (par exemple "2023Q1").
+        1. si un cache valide existe pour ce fichier et ces colonnes, il est relu directement
+        2. lecture du fichier Excel et conversion de la colonne de date (date_col) en objets datetime
+            (avec un profil : seules ses colonnes sont lues, puis converties en types compacts)
+        3. Création d'une nouvelle colonne (nommée year_col) et extraction de l'année
+        4. Création d'une nouvelle colonne (nommée quarter_col)
+            et extraction du trimestre sous la forme "YYYYQn" (par exemple "2023Q1"),
+            ou sous forme de clé entière YYYYn (par exemple 20231) si quarter_as_int.
+        5. écriture du résultat enrichi dans le cache (les anciennes versions du fichier sont supprimées)
 
     Returns:
         pd.DataFrame: DataFrame pandas enrichi
     """
-    df = pd.read_excel(str(file_path), parse_dates=[date_col])
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = _cache_path(file_path, cache_dir, (date_col, year_col, quarter_col, repr(profile),
+                                                           str(quarter_as_int)),
+                                 hash_content)
+        cached = _read_cache(cache_path)
+        if cached is not None:
+            return cached
+
+    if profile:
+        df = pd.read_excel(str(file_path), usecols=profile.get("usecols"))
+        df = apply_load_profile(df, {**profile, "date_col": date_col}, verbose=verbose)
+    else:
+        df = pd.read_excel(str(file_path), parse_dates=[date_col])
+    df = add_date_parts(df, date_col, year_col, quarter_col, quarter_as_int)
+
+    if cache_path is not None:
+        _write_cache(df, cache_path, max_cache_entries)
+    return df
+
+def add_date_parts(df: pd.DataFrame, date_col: str, year_col: str, quarter_col: str,
+                   quarter_as_int: bool = False) -> pd.DataFrame:
+    """
+    Ajoute les colonnes année et trimestre (étapes 3 et 4 de load_data), par ex. sur
+    chacun des blocs de DataLoader.iter_chunks.
+
+    Params:
+        df (pd.DataFrame): données contenant une colonne de dates (datetime)
+        date_col, year_col, quarter_col (str): voir load_data
+        quarter_as_int (bool): trimestre codé en entier int32 année*10+trimestre
+
+    Returns:
+        pd.DataFrame: df, complété (modifié en place)
+    """
     df[year_col] = df[date_col].dt.year
-    df[quarter_col] = df[date_col].dt.to_period('Q')
+    if quarter_as_int:
+        df[quarter_col] = quarter_key(df[date_col])
+    else:
+        df[quarter_col] = df[date_col].dt.to_period('Q')
+    return df
+
+def quarter_key(dates: pd.Series) -> pd.Series:
+    """
+    Calcule la clé entière de trimestre année*10+trimestre (ex: 20231 pour 2023Q1).
+
+    Params:
+        dates (pd.Series): dates (datetime)
+
+    Returns:
+        pd.Series: clés int32, rapides à hacher et à trier dans les groupby
+    """
+    return (dates.dt.year * 10 + dates.dt.quarter).astype("int32")
+
+def format_quarter_keys(values: pd.Series) -> pd.Series:
+    """
+    Formate des clés de trimestre entières (20231) en libellés "2023Q1".
+    Les valeurs non entières (Period, texte) sont renvoyées telles quelles.
+    """
+    if not pd.api.types.is_integer_dtype(values):
+        return values
+    return (values // 10).astype(str) + "Q" + (values % 10).astype(str)
+
+def format_for_display(df: pd.DataFrame, quarter_cols: list[str] | None = None) -> pd.DataFrame:
+    """
+    Prépare un résultat pour l'affichage (console, tableaux) : les clés de trimestre
+    entières des colonnes quarter_cols sont converties en "2023Q1".
+
+    Params:
+        df (pd.DataFrame): résultat à afficher
+        quarter_cols (list[str] | None): colonnes contenant des clés de trimestre
+
+    Returns:
+        pd.DataFrame: copie formatée (df inchangé si rien à formater)
+    """
+    cols = [col for col in quarter_cols or [] if col in df.columns
+            and pd.api.types.is_integer_dtype(df[col])]
+    if not cols:
+        return df
+    df = df.copy()
+    for col in cols:
+        df[col] = format_quarter_keys(df[col])
     return df
 
+def _cache_path(file_path: Union[str, Path], cache_dir: Union[str, Path], columns: tuple,
+                hash_content: bool) -> Path:
+    """
+    Construit le chemin du fichier de cache associé à un fichier source.
+
+    Le nom est "<source>-<clé>.parquet" : la partie source identifie le fichier d'origine
+    (pour purger ses anciennes versions), la clé dépend de son contenu (ou taille + mtime)
+    et des colonnes demandées.
+    """
+    source = os.path.abspath(str(file_path))
+    stat = os.stat(source)
+    key = hashlib.sha256()
+    key.update(f"{CACHE_FORMAT_VERSION}|{'|'.join(columns)}|".encode())
+    if hash_content:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                key.update(block)
+    else:
+        key.update(f"{stat.st_size}|{stat.st_mtime_ns}".encode())
+    source_id = hashlib.sha256(source.encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{source_id}-{key.hexdigest()[:32]}.parquet"
+
+def _read_cache(cache_path: Path) -> Union[pd.DataFrame, None]:
+    """Relit un DataFrame depuis le cache, ou None si absent/illisible."""
+    if not cache_path.exists():
+        return None
+    try:
+        df = pd.read_parquet(cache_path)
+    except Exception:
+        # cache corrompu ou moteur Parquet indisponible : on repart du fichier source
+        cache_path.unlink(missing_ok=True)
+        return None
+    os.utime(cache_path)  # marque l'entrée comme récemment utilisée (éviction LRU)
+    return df
+
+def _write_cache(df: pd.DataFrame, cache_path: Path, max_entries: int) -> None:
+    """
+    Écrit le DataFrame dans le cache, supprime les versions périmées du même fichier source
+    puis évince les entrées les moins récemment utilisées au-delà de max_entries.
+    """
+    cache_dir = cache_path.parent
+    tmp_path = cache_path.with_suffix(".tmp")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except ImportError:
+        # ni pyarrow ni fastparquet : le cache est simplement désactivé
+        return
+    except Exception as e:
+        # colonne non convertible en Parquet (types mélangés...), disque plein, droits :
+        # le chargement n'échoue jamais à cause du cache, les données sont servies sans lui
+        warnings.warn(f"Cache Parquet non écrit pour {cache_path.name} : {type(e).__name__}: {e}",
+                      RuntimeWarning, stacklevel=3)
+        tmp_path.unlink(missing_ok=True)
+        return
+
+    source_id = cache_path.name.split("-")[0]
+    entries = []
+    for entry in cache_dir.glob("*.parquet"):
+        if entry == cache_path:
+            continue
+        if entry.name.startswith(f"{source_id}-"):
+            entry.unlink(missing_ok=True)
+        else:
+            entries.append(entry)
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[max(0, max_entries - 1):]:
+        entry.unlink(missing_ok=True)
+
 # === GENERIC FUNCTIONS ===
-def groupby_aggregate(df: pd.DataFrame, group_cols: list[str], agg_col: str, agg_func: str) -> pd.DataFrame:
+def groupby_aggregate(df: pd.DataFrame, group_cols: list[str], agg_col: str, agg_func: str,
+                      store=None, sketch_error: float = DEFAULT_ERROR) -> pd.DataFrame:
     """
     Regroupe le DataFrame selon group_cols et applique une agrégation agg_func sur agg_col.
 
@@ -41,14 +232,24 @@ def groupby_aggregate(df: pd.DataFrame, group_cols: list[str], agg_col: str, agg
         df (pd.DataFrame): DataFrame source
         group_cols (list[str]): colonnes pour le groupement
         agg_col (str): colonne à agréger
-        agg_func (str): fonction d'agrégation ('sum', 'mean', etc.)
+        agg_func (str): fonction d'agrégation ('sum', 'mean', etc.), ou quantile approché
+            par sketch KLL : 'approx_median', 'approx_quantile:0.9'
+        store (AggregateStore | None): état d'agrégats incrémental couvrant exactement df ;
+            utilisé à la place du groupby s'il sait répondre
+        sketch_error (float): erreur de rang normalisée des quantiles approchés
 
     Returns:
         pd.DataFrame: DataFrame agrégé
     """
-    return df.groupby(group_cols)[agg_col].agg(agg_func).reset_index()
-
-def groupby_aggregate_multi(df: pd.DataFrame, group_cols: list[str], agg_dict: dict) -> pd.DataFrame:
+    if store is not None and store.supports(group_cols, agg_col, agg_func):
+        return store.query(group_cols, agg_col, agg_func)
+    q = parse_quantile_func(agg_func)
+    if q is not None:
+        return groupby_approx_quantile(df, group_cols, agg_col, q, sketch_error).reset_index()
+    return df.groupby(group_cols, observed=True)[agg_col].agg(agg_func).reset_index()
+
+def groupby_aggregate_multi(df: pd.DataFrame, group_cols: list[str], agg_dict: dict,
+                            store=None) -> pd.DataFrame:
     """
     Regroupe le DataFrame selon group_cols et applique les agrégations du dictionnaire agg_dict.
 
@@ -56,13 +257,19 @@ def groupby_aggregate_multi(df: pd.DataFrame, group_cols: list[str], agg_dict: d
         df (pd.DataFrame): DataFrame source
         group_cols (list[str]): colonnes pour le groupement
         agg_dict (dict): dictionnaire des agrégations {colonne: [fonctions]}
+        store (AggregateStore | None): état d'agrégats incrémental couvrant exactement df
 
     Returns:
         pd.DataFrame: DataFrame agrégé
     """
-    return df.groupby(group_cols).agg(agg_dict).reset_index()
-
-def filter_by_value(df: pd.DataFrame, col: str, value) -> pd.DataFrame:
+    if store is not None and all(
+            store.supports(group_cols, col, func)
+            for col, funcs in agg_dict.items()
+            for func in ([funcs] if isinstance(funcs, str) else funcs)):
+        return store.query_multi(group_cols, agg_dict)
+    return df.groupby(group_cols, observed=True).agg(agg_dict).reset_index()
+
+def filter_by_value(df: pd.DataFrame, col: str, value, index=None) -> pd.DataFrame:
     """
     Filtre le DataFrame sur une colonne et une valeur donnée.
 
@@ -70,14 +277,20 @@ def filter_by_value(df: pd.DataFrame, col: str, value) -> pd.DataFrame:
         df (DataFrame): DataFrame source
         col (str): colonne à filtrer
         value: valeur à conserver
+        index (PartitionIndex | None): index de partitions construit sur df
+            (data_processing.index) ; si col y est indexée, le filtre est une
+            recherche directe (tranche sans copie si les lignes sont contiguës)
 
     Returns:
         DataFrame: DataFrame filtré
     """
+    if index is not None and index.df is df and col in index:
+        return index.filter(col, value)
     mask: pd.Series[bool] = df[col] == value
     return df[mask]
 
-def groupby_size(df: pd.DataFrame, group_cols: list[str], count_name: str = "COUNT") -> pd.DataFrame:
+def groupby_size(df: pd.DataFrame, group_cols: list[str], count_name: str = "COUNT",
+                 store=None) -> pd.DataFrame:
     """
     Compte le nombre de lignes par groupe.
 
@@ -85,30 +298,218 @@ def groupby_size(df: pd.DataFrame, group_cols: list[str], count_name: str = "COU
         df (pd.DataFrame): DataFrame source
         group_cols (list[str]): colonnes pour le groupement
         count_name (str): nom de la colonne résultat
+        store (AggregateStore | None): état d'agrégats incrémental couvrant exactement df
 
     Returns:
         pd.DataFrame: DataFrame avec les tailles des groupes
     """
-    return df.groupby(group_cols).size().reset_index(name=count_name)
+    if store is not None and store.supports(group_cols, None, "size"):
+        return store.query_size(group_cols, count_name)
+    return df.groupby(group_cols, observed=True).size().reset_index(name=count_name)
 
 # === TABLE & CHART EXPORT FUNCTIONS ===
-def save_table_image(df: pd.DataFrame, title: str, img_path_or_pdf, max_rows: int = 30) -> None:
+def _pyplot():
     """
-    Sauvegarde un DataFrame sous forme de tableau image (png ou PDF).
+    matplotlib.pyplot, importé au premier rendu seulement : les exécutions sans rendu
+    (--no-render, --format) ne chargent ni matplotlib ni son backend.
+    """
+    import matplotlib.pyplot as plt  # Pour la génération des graphiques et tableaux
+    return plt
+
+def _is_pdf(output) -> bool:
+    """Indique si une sortie est un PdfPages (sans importer matplotlib s'il ne l'est pas déjà)."""
+    backend_pdf = sys.modules.get("matplotlib.backends.backend_pdf")
+    return backend_pdf is not None and isinstance(output, backend_pdf.PdfPages)
+
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Aplatit des colonnes MultiIndex (agg_dict) en libellés simples : ("TOTAL", "min") -> "TOTAL min"."""
+    if not isinstance(df.columns, pd.MultiIndex):
+        return df
+    df = df.copy()
+    df.columns = [" ".join(str(part) for part in col if part != "") for col in df.columns]
+    return df
+
+def export_table(df: pd.DataFrame, path: Union[str, Path], quarter_cols: list[str] | None = None) -> None:
+    """
+    Exporte un résultat en données brutes, sans matplotlib (--format csv|json de main.py).
+
+    Params:
+        df (pd.DataFrame): résultat d'une question
+        path (str): fichier de sortie, .csv ou .json (liste d'objets, un par ligne)
+        quarter_cols (list[str] | None): colonnes de trimestre formatées en "2023Q1"
+    """
+    df = _prepare_export(df, quarter_cols)
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in (".csv", ".json"):
+        raise ValueError(f"Format d'export non supporté : {ext} (attendu : .csv, .json)")
+    os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", date_format="iso", force_ascii=False, indent=2)
+
+def export_workbook(path: Union[str, Path], tables: dict, quarter_cols: list[str] | None = None,
+                    chunksize: int = 50_000, max_rows: int = EXCEL_MAX_ROWS) -> list[str]:
+    """
+    Exporte plusieurs résultats dans un classeur .xlsx ou .ods, une feuille par résultat,
+    en écrivant les lignes au fil de l'eau (mémoire bornée par chunksize lignes formatées).
+
+    Params:
+        path (str): classeur de sortie, .xlsx (openpyxl en écriture seule) ou
+            .ods (OpenDocument écrit directement en XML dans l'archive)
+        tables (dict): {nom de feuille: DataFrame}, par exemple les résultats de QUESTIONS
+        quarter_cols (list[str] | None): colonnes de trimestre formatées en "2023Q1"
+        chunksize (int): lignes formatées à la fois
+        max_rows (int): lignes par feuille (en-tête exclu) ; au-delà, le résultat continue
+            sur les feuilles "<nom> (2)", "<nom> (3)"...
+
+    Returns:
+        list[str]: noms des feuilles écrites, dans l'ordre
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in (".xlsx", ".ods"):
+        raise ValueError(f"Format de classeur non supporté : {ext} (attendu : .xlsx, .ods)")
+    if chunksize <= 0 or max_rows <= 0:
+        raise ValueError("chunksize et max_rows doivent être strictement positifs")
+    os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+
+    sheets = []
+    for name, df in tables.items():
+        header = list(flatten_columns(df.head(0)).columns)
+        parts = range(0, max(len(df), 1), max_rows)
+        for part, start in enumerate(parts):
+            sheet = _sheet_name(str(name) if part == 0 else f"{name} ({part + 1})", sheets)
+            rows = _export_rows(df.iloc[start:start + max_rows], quarter_cols, chunksize)
+            sheets.append((sheet, [str(col) for col in header], rows))
+
+    writer = _write_xlsx if ext == ".xlsx" else _write_ods
+    writer(path, sheets)
+    return [sheet for sheet, _, _ in sheets]
+
+def _prepare_export(df: pd.DataFrame, quarter_cols: list[str] | None) -> pd.DataFrame:
+    """Trimestres formatés, colonnes aplaties, Period converties en texte."""
+    df = flatten_columns(format_for_display(df, quarter_cols))
+    return df.astype({col: str for col, dtype in df.dtypes.items() if isinstance(dtype, pd.PeriodDtype)})
+
+def _export_rows(df: pd.DataFrame, quarter_cols: list[str] | None, chunksize: int) -> Iterator[list]:
+    """Lignes d'un résultat en valeurs Python (None pour les manquantes), formatées par blocs."""
+    for start in range(0, len(df), chunksize):
+        chunk = _prepare_export(df.iloc[start:start + chunksize], quarter_cols).astype(object)
+        yield from chunk.where(chunk.notna(), None).to_numpy().tolist()
+
+def _sheet_name(name: str, taken: list) -> str:
+    """Nom de feuille valide (31 caractères, sans []:*?/\\) et unique dans le classeur."""
+    name = "".join("_" if char in "[]:*?/\\" else char for char in name)[:31] or "Feuille"
+    used = {sheet for sheet, _, _ in taken}
+    candidate, i = name, 2
+    while candidate in used:
+        suffix = f"~{i}"
+        candidate, i = name[:31 - len(suffix)] + suffix, i + 1
+    return candidate
+
+def _write_xlsx(path: Union[str, Path], sheets: list[tuple]) -> None:
+    """Classeur openpyxl en écriture seule : chaque ligne est écrite dans le fichier temporaire de sa feuille."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for name, header, rows in sheets:
+        worksheet = workbook.create_sheet(name)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+
+ODS_MANIFEST = """<?xml version="1.0" encoding="UTF-8"?>
+<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">
+ <manifest:file-entry manifest:full-path="/" manifest:version="1.2" manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>
+ <manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>
+</manifest:manifest>
+"""
+
+ODS_CONTENT_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" \
+xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" \
+xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" office:version="1.2">
+<office:body><office:spreadsheet>
+"""
+
+def _write_ods(path: Union[str, Path], sheets: list[tuple]) -> None:
+    """
+    Classeur OpenDocument écrit en flux : content.xml est produit ligne par ligne directement
+    dans l'archive (odfpy construirait tout le document en mémoire avant de l'enregistrer).
+    """
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        # le type MIME doit être la première entrée, non compressée
+        archive.writestr(zipfile.ZipInfo("mimetype"), "application/vnd.oasis.opendocument.spreadsheet",
+                         compress_type=zipfile.ZIP_STORED)
+        archive.writestr("META-INF/manifest.xml", ODS_MANIFEST)
+        with archive.open("content.xml", "w") as content:
+            content.write(ODS_CONTENT_HEAD.encode("utf-8"))
+            for name, header, rows in sheets:
+                sheet_name = escape(name, {'"': "&quot;"})
+                content.write(f'<table:table table:name="{sheet_name}">'.encode("utf-8"))
+                content.write(_ods_row(header))
+                for row in rows:
+                    content.write(_ods_row(row))
+                content.write(b"</table:table>\n")
+            content.write(b"</office:spreadsheet></office:body></office:document-content>\n")
+
+def _ods_row(values: list) -> bytes:
+    """
+    Ligne <table:table-row> : nombres, booléens et dates typés, le reste en texte.
+    NaN et ±inf (pas des xsd:double valides) donnent des cellules vides, comme NaN en xlsx.
+    """
+    cells = []
+    for value in values:
+        if value is None or (isinstance(value, float) and not np.isfinite(value)):
+            cells.append("<table:table-cell/>")
+        elif isinstance(value, bool):
+            cells.append(f'<table:table-cell office:value-type="boolean" office:boolean-value="{str(value).lower()}">'
+                         f"<text:p>{value}</text:p></table:table-cell>")
+        elif isinstance(value, (int, float)):
+            cells.append(f'<table:table-cell office:value-type="float" office:value="{value!r}">'
+                         f"<text:p>{value}</text:p></table:table-cell>")
+        elif hasattr(value, "isoformat"):  # datetime, date, Timestamp
+            iso = value.isoformat()
+            cells.append(f'<table:table-cell office:value-type="date" office:date-value="{iso}">'
+                         f"<text:p>{iso}</text:p></table:table-cell>")
+        else:
+            cells.append(f'<table:table-cell office:value-type="string"><text:p>{escape(str(value))}</text:p>'
+                         "</table:table-cell>")
+    return f"<table:table-row>{''.join(cells)}</table:table-row>\n".encode("utf-8")
+
+RENDER_CACHE_VERSION = 2  # à incrémenter si build_table_figure / build_histogram_figure changent
+DEFAULT_RENDER_CACHE_BYTES = 200 * 1024 * 1024
+
+def build_table_figure(df: pd.DataFrame, title: str, max_rows: int = 30,
+                       quarter_cols: list[str] | None = None) -> "Figure":
+    """
+    Construit la figure matplotlib d'un tableau (mise en page comprise), sans l'enregistrer.
+
+    Params:
+        df (pd.DataFrame): DataFrame à afficher
+        title (str): titre du tableau
+        max_rows (int): nombre maximal de lignes affichées
+        quarter_cols (list[str] | None): colonnes de clés de trimestre entières,
+            formatées en "2023Q1" sur les seules lignes affichées
+
+    Returns:
+        Figure: figure prête à être envoyée vers une ou plusieurs sorties (export_figure)
     """
     display_df = df.copy()
     note = ""
     if display_df.shape[0] > max_rows:
         display_df = display_df.head(max_rows)
         note = f"Affichage limité à {max_rows} lignes sur {df.shape[0]}."
+    display_df = format_for_display(display_df, quarter_cols)
 
     nrows, ncols = display_df.shape
     fig_height = min(18.0, 1.5 + nrows * 0.6)
     fig_width = min(18.0, 2.5 + ncols * 1.3)
 
-    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    fig, ax = _pyplot().subplots(figsize=(fig_width, fig_height))
     # ax: Axes  # type hint si tu veux calmer le linter
-    ax: Axes
+    ax: "Axes"
     ax.axis('off')
     ax.set_title(title, fontsize=17, weight='bold', pad=18, color="#2563eb")
 
@@ -140,44 +541,135 @@ def save_table_image(df: pd.DataFrame, title: str, img_path_or_pdf, max_rows: in
     for col in range(ncols):
         tbl.auto_set_column_width(col)
 
-    plt.tight_layout()
-
-    if isinstance(img_path_or_pdf, PdfPages):
-        img_path_or_pdf.savefig(fig, bbox_inches='tight')
-    else:
-        os.makedirs(os.path.dirname(img_path_or_pdf), exist_ok=True)
-        fig.savefig(img_path_or_pdf, bbox_inches='tight')
+    fig.tight_layout()
+    return fig
 
-    plt.close(fig)
-
-def save_histogram_image(df: pd.DataFrame, col: str, title: str, output, bins=10) -> None:
+def build_histogram_figure(df: pd.DataFrame, col: str, title: str, bins=10) -> "Figure":
     """
-    Sauvegarde un histogramme soit en image PNG, soit directement dans un PDF (PdfPages).
+    Construit la figure matplotlib d'un histogramme, sans l'enregistrer.
 
     Params:
         df (pd.DataFrame): DataFrame source
         col (str): colonne à afficher en histogramme
         title (str): titre du graphique
-        img_path (str): chemin de l'image à sauvegarder
+        bins: nombre de classes ou bornes des classes (comme numpy.histogram)
+
+    Returns:
+        Figure: figure prête à être envoyée vers une ou plusieurs sorties (export_figure)
+    """
+    counts, edges = histogram_counts(df[col], bins)
+    return build_counts_figure(counts, edges, col, title)
+
+def build_counts_figure(counts, edges, xlabel: str, title: str) -> "Figure":
+    """
+    Dessine un histogramme déjà calculé (data_processing.histogram) : le dessin ne dépend
+    que des effectifs, pas de la taille des données (ex. streaming_histogram sur UNIT_PRICE).
+
+    Params:
+        counts: effectifs des classes
+        edges: bornes des classes (len(counts) + 1 valeurs)
+        xlabel (str): libellé de l'axe des valeurs
+        title (str): titre du graphique
+
+    Returns:
+        Figure: figure prête à être envoyée vers une ou plusieurs sorties (export_figure)
     """
-    fig, ax = plt.subplots(figsize=(8, 6))
-    n, bins, patches = ax.hist(df[col].dropna(), bins=10, color="#2563eb", alpha=0.7, edgecolor="black")
+    fig, ax = _pyplot().subplots(figsize=(8, 6))
+    bars = ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge",
+                  color="#2563eb", alpha=0.7, edgecolor="black")
+    ax.bar_label(bars, labels=[f"{int(n)}" for n in counts], fontsize=11, color='#334155')
     ax.set_title(title, fontsize=16, weight='bold', pad=15, color="#2563eb")
-    ax.set_xlabel(col, fontsize=13)
+    ax.set_xlabel(xlabel, fontsize=13)
     ax.set_ylabel('Fréquence', fontsize=13)
     ax.grid(True, linestyle='--', alpha=0.5)
-    for i in range(len(n)):
-        ax.text(float((bins[i] + bins[i + 1]) / 2), float(n[i]), f"{int(n[i])}",
-                ha='center', va='bottom', fontsize=11, color='#334155')
-    plt.tight_layout()
-    if isinstance(output, str):
-        os.makedirs(os.path.dirname(output), exist_ok=True)
-        fig.savefig(output, bbox_inches="tight")
-    else:
-        output.savefig(fig, bbox_inches="tight")
-    plt.close(fig)
+    fig.tight_layout()
+    return fig
+
+def export_figure(fig: "Figure", outputs, close: bool = True) -> None:
+    """
+    Envoie une figure déjà construite vers une ou plusieurs sorties, puis la ferme.
+
+    Params:
+        fig (Figure): figure issue de build_table_figure / build_histogram_figure
+        outputs: une sortie ou une liste de sorties ; chaque sortie est soit un PdfPages
+            (ajout d'une page), soit un chemin dont l'extension choisit le format (.png, .svg, .pdf)
+        close (bool): fermer la figure après l'export
+    """
+    if isinstance(outputs, (str, Path)) or _is_pdf(outputs):
+        outputs = [outputs]
+    try:
+        for output in outputs:
+            if _is_pdf(output):
+                output.savefig(fig, bbox_inches='tight')
+            else:
+                os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+                fig.savefig(output, bbox_inches='tight')
+    finally:
+        if close:
+            _pyplot().close(fig)
+
+def save_table_image(df: pd.DataFrame, title: str, img_path_or_pdf, max_rows: int = 30,
+                     quarter_cols: list[str] | None = None, cache_dir: Union[str, Path, None] = None,
+                     max_cache_bytes: int = DEFAULT_RENDER_CACHE_BYTES) -> None:
+    """
+    Sauvegarde un DataFrame sous forme de tableau image (png ou PDF).
+
+    img_path_or_pdf peut être une liste de sorties : la figure n'est alors construite qu'une fois.
+    Avec cache_dir, un tableau déjà rendu (mêmes données, titre et paramètres) est
+    repris du cache de rendu sans reconstruire la figure (voir render_key).
+    """
+    job = {"kind": "table", "df": df, "title": title, "max_rows": max_rows, "quarter_cols": quarter_cols}
+    _export_job(job, img_path_or_pdf, cache_dir, max_cache_bytes)
+
+def save_histogram_image(df: pd.DataFrame, col: str, title: str, output, bins=10,
+                         cache_dir: Union[str, Path, None] = None,
+                         max_cache_bytes: int = DEFAULT_RENDER_CACHE_BYTES) -> None:
+    """
+    Sauvegarde un histogramme soit en image PNG, soit directement dans un PDF (PdfPages).
+
+    Params:
+        df (pd.DataFrame): DataFrame source
+        col (str): colonne à afficher en histogramme
+        title (str): titre du graphique
+        output: chemin de l'image, PdfPages, ou liste de sorties (figure construite une seule fois)
+        cache_dir (str | None): cache de rendu (None = figure toujours reconstruite)
+        max_cache_bytes (int): taille maximale du cache de rendu
+    """
+    job = {"kind": "histogram", "df": df, "col": col, "title": title, "bins": bins}
+    _export_job(job, output, cache_dir, max_cache_bytes)
+
+PDF_ENGINES = ("matplotlib", "reportlab")
+
+def write_pdf_report(path: str, jobs: list[dict], tracer=NULL_TRACER) -> int:
+    """
+    Écrit le PDF de travaux de rendu avec reportlab (pdf_report.write_report) ; le module
+    n'est importé qu'au premier appel, reportlab n'étant chargé que pour ce moteur.
+
+    Returns:
+        int: nombre de pages écrites
+    """
+    try:
+        from .pdf_report import write_report
+    except ImportError:  # exécution directe depuis src/ (python main.py)
+        from pdf_report import write_report
+    return write_report(path, jobs, tracer)
+
+def open_pdf(path: str) -> "PdfPages":
+    """
+    Ouvre un PDF multi-pages (à utiliser comme gestionnaire de contexte) en créant son dossier.
+
+    Params:
+        path (str): chemin complet du PDF à sauvegarder
 
-def generate_pdf(path: str, dataframes: list[tuple], histograms: list[tuple]):
+    Returns:
+        PdfPages: sortie utilisable par export_figure / save_table_image / save_histogram_image
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return PdfPages(path)
+
+def generate_pdf(path: str, dataframes: list[tuple], histograms: list[tuple], tracer=NULL_TRACER,
+                 engine: str = "matplotlib"):
     """
     Génère un PDF unique contenant des tables et histogrammes.
 
@@ -185,14 +677,290 @@ def generate_pdf(path: str, dataframes: list[tuple], histograms: list[tuple]):
         path (str): chemin complet du PDF à sauvegarder
         dataframes (list of tuple): liste de tuples (df, title) pour les tables
         histograms (list of tuple): liste de tuples (df, col, title) pour les histogrammes
+        tracer (StageTracer): mesure de la génération complète (étape "generate_pdf")
+        engine (str): "matplotlib" (une figure par page, tableaux limités à 30 lignes) ou
+            "reportlab" (tableaux PDF natifs paginés, histogrammes vectoriels, voir pdf_report.py)
     """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    with PdfPages(path) as pdf:
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Moteur PDF inconnu : {engine} (attendu : {PDF_ENGINES})")
+    if engine == "reportlab":
+        jobs = [{"kind": "table", "df": df, "title": title} for df, title in dataframes]
+        jobs += [{"kind": "histogram", "df": df, "col": col, "title": title} for df, col, title in histograms]
+        with tracer.stage("generate_pdf"):
+            write_pdf_report(path, jobs, tracer)
+        return
+
+    with tracer.stage("generate_pdf"), open_pdf(path) as pdf:
         # Tables
         for table_df, table_title in dataframes:
             save_table_image(table_df, table_title, pdf)
 
         # Histogrammes
         for hist_df, col_name, hist_title in histograms:
-            save_histogram_image(hist_df, col_name, hist_title, pdf)
\ No newline at end of file
+            save_histogram_image(hist_df, col_name, hist_title, pdf)
+
+# === PARALLEL REPORT RENDERING ===
+def build_job_figure(job: dict) -> "Figure":
+    """
+    Construit la figure décrite par un travail de rendu.
+
+    Params:
+        job (dict): {"kind": "table", "df", "title"} ou {"kind": "histogram", "df", "col", "title"},
+            avec éventuellement "max_rows" / "quarter_cols" / "bins" et "outputs" (chemins des images)
+
+    Returns:
+        Figure: figure construite (non enregistrée)
+    """
+    if job["kind"] == "histogram":
+        return build_histogram_figure(job["df"], job["col"], job["title"], job.get("bins", 10))
+    return build_table_figure(job["df"], job["title"], job.get("max_rows", 30), job.get("quarter_cols"))
+
+def report_image_path(qid: str, question: dict, output_dir: Union[str, Path]) -> str:
+    """Image PNG d'une question dans un dossier de sortie : tables/<id>.png ou charts/<id>.png."""
+    folder = "charts" if question["render"] == "histogram" else "tables"
+    return os.path.join(str(output_dir), folder, f"{qid}.png")
+
+def report_jobs(results: dict, questions: dict, quarter_col: str, output_dir: Union[str, Path]) -> list[dict]:
+    """
+    Travaux de rendu du rapport, dans l'ordre des pages (tables puis histogrammes).
+
+    Params:
+        results (dict): {id de question: DataFrame résultat} ; une question absente donne
+            un travail {"reuse": True} dont la page est reprise d'un dossier de pages
+        questions (dict): dictionnaire QUESTIONS
+        quarter_col (str): colonne de trimestre formatée dans les tableaux
+        output_dir (str): dossier de sortie des images (voir report_image_path)
+
+    Returns:
+        list[dict]: travaux pour render_figures / write_pdf_report
+    """
+    jobs = []
+    for qid in sorted(questions, key=lambda qid: questions[qid]["render"] == "histogram"):
+        question = questions[qid]
+        if qid not in results:
+            jobs.append({"name": qid, "title": question["title"], "reuse": True})
+        elif question["render"] == "histogram":
+            # histogramme de la valeur agrégée (Q4 : écart-type, Q8 : nombre de transactions)
+            col = question.get("agg_col", question.get("count_name"))
+            jobs.append({"kind": "histogram", "name": qid, "df": results[qid], "col": col, "title": question["title"],
+                         "outputs": [report_image_path(qid, question, output_dir)]})
+        else:
+            jobs.append({"kind": "table", "name": qid, "df": results[qid], "title": question["title"],
+                         "quarter_cols": [quarter_col], "outputs": [report_image_path(qid, question, output_dir)]})
+    return jobs
+
+def _init_render_worker() -> None:
+    """Initialise un processus de rendu sur le backend non interactif Agg."""
+    _pyplot().switch_backend("Agg")
+
+def _render_job(job: dict) -> tuple[bytes, float, float]:
+    """
+    Exécuté dans un processus de rendu : construit la figure, écrit ses images
+    et renvoie la figure sérialisée pour l'assemblage du PDF par le processus principal,
+    avec les temps écoulé et CPU du rendu.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    fig = build_job_figure(job)
+    try:
+        export_figure(fig, job.get("outputs", []), close=False)
+        return pickle.dumps(fig), time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        _pyplot().close(fig)
+
+def _job_name(job: dict) -> str:
+    """Nom d'un travail de rendu dans les mesures d'instrumentation."""
+    return f"render {job.get('name', job['title'])}"
+
+# === RENDER CACHE ===
+@lru_cache(maxsize=None)
+def _matplotlib_version() -> str:
+    """Version de matplotlib lue dans les métadonnées (un rendu repris du cache n'importe pas matplotlib)."""
+    return version("matplotlib")
+
+def render_key(job: dict) -> str:
+    """
+    Clé du cache de rendu : empreinte des données du résultat (valeurs, index, colonnes, types),
+    du titre et des paramètres de rendu du travail, et de la version de matplotlib.
+    """
+    df = job["df"]
+    params = {k: v for k, v in job.items() if k not in ("df", "outputs", "name", "reuse")}
+    key = hashlib.sha256()
+    key.update(f"{RENDER_CACHE_VERSION}|{_matplotlib_version()}|".encode())
+    key.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    key.update(repr((list(df.columns), [str(t) for t in df.dtypes], list(df.index.names))).encode("utf-8"))
+    key.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return key.hexdigest()[:32]
+
+def _read_render_cache(job: dict, cache_dir: Union[str, Path]) -> Union[bytes, None]:
+    """
+    Cherche un rendu identique dans le cache : copie ses images vers les sorties du travail
+    et renvoie la page du PDF (figure sérialisée), ou None si le rendu est absent.
+    """
+    key = render_key(job)
+    page = Path(cache_dir) / f"{key}.pickle"
+    outputs = [str(o) for o in job.get("outputs", [])]
+    images = [Path(cache_dir) / f"{key}{os.path.splitext(o)[1].lower()}" for o in outputs]
+    if not page.exists() or not all(image.exists() for image in images):
+        return None
+    for image, output in zip(images, outputs):
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        shutil.copyfile(image, output)
+        os.utime(image)
+    os.utime(page)  # marque l'entrée comme récemment utilisée (éviction LRU)
+    return page.read_bytes()
+
+def _write_render_cache(job: dict, page: bytes, cache_dir: Union[str, Path], max_cache_bytes: int) -> None:
+    """
+    Conserve la page sérialisée et les images écrites d'un travail rendu, puis évince
+    les rendus les moins récemment utilisés au-delà de max_cache_bytes.
+    """
+    cache_dir = Path(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = render_key(job)
+    for output in job.get("outputs", []):
+        shutil.copyfile(output, cache_dir / f"{key}{os.path.splitext(str(output))[1].lower()}")
+    tmp_path = cache_dir / f"{key}.tmp"
+    tmp_path.write_bytes(page)
+    os.replace(tmp_path, cache_dir / f"{key}.pickle")
+    _evict_render_cache(cache_dir, max_cache_bytes, keep=key)
+
+def _evict_render_cache(cache_dir: Path, max_cache_bytes: int, keep: str) -> None:
+    """Supprime les rendus les moins récemment utilisés (sauf keep) au-delà de max_cache_bytes."""
+    entries = {}
+    for entry in cache_dir.iterdir():
+        entries.setdefault(entry.name.split(".")[0], []).append(entry)
+    total = sum(entry.stat().st_size for files in entries.values() for entry in files)
+    by_age = sorted(entries.items(), key=lambda item: max(e.stat().st_mtime for e in item[1]))
+    for entry_key, files in by_age:
+        if total <= max_cache_bytes or entry_key == keep:
+            continue
+        for entry in files:
+            total -= entry.stat().st_size
+            entry.unlink(missing_ok=True)
+
+def _export_job(job: dict, outputs, cache_dir: Union[str, Path, None], max_cache_bytes: int) -> None:
+    """Exporte un travail de rendu vers ses sorties, en passant par le cache de rendu si cache_dir."""
+    if cache_dir is None:
+        export_figure(build_job_figure(job), outputs)
+        return
+    if isinstance(outputs, (str, Path)) or _is_pdf(outputs):
+        outputs = [outputs]
+    pdfs = [output for output in outputs if _is_pdf(output)]
+    job = {**job, "outputs": [output for output in outputs if not _is_pdf(output)]}
+    page = _read_render_cache(job, cache_dir)
+    if page is None:
+        page = _render_job(job)[0]
+        _write_render_cache(job, page, cache_dir, max_cache_bytes)
+    if pdfs:
+        export_figure(pickle.loads(page), pdfs)
+
+def page_path(page_dir: Union[str, Path], name: str) -> str:
+    """Chemin de la page sérialisée (figure pickle) d'un travail de rendu nommé."""
+    return os.path.join(page_dir, f"{name}.pickle")
+
+def render_figures(jobs: list[dict], pdf_path: Union[str, None] = None, workers: Union[int, None] = 1,
+                   tracer=NULL_TRACER, page_dir: Union[str, Path, None] = None,
+                   cache_dir: Union[str, Path, None] = None,
+                   max_cache_bytes: int = DEFAULT_RENDER_CACHE_BYTES) -> None:
+    """
+    Rend une liste de figures (images + pages d'un PDF unique), éventuellement en parallèle.
+
+    Avec plusieurs workers, chaque figure est construite et ses images écrites dans un
+    processus du pool ; le processus principal ajoute ensuite les pages au PDF dans
+    l'ordre de jobs, ce qui garde un rapport identique au rendu séquentiel.
+
+    Params:
+        jobs (list[dict]): travaux de rendu (voir build_job_figure), dans l'ordre des pages
+        pdf_path (str | None): chemin du PDF à générer (None = images seulement)
+        workers (int | None): nombre de processus (None = nombre de cœurs, 1 = séquentiel)
+        tracer (StageTracer): mesures par figure ("render <name>", name = job["name"] ou titre)
+            et de l'écriture du PDF ; en parallèle, les figures sont mesurées dans les
+            processus du pool (sans pic mémoire)
+        page_dir (str | None): dossier des pages du PDF (figures sérialisées, voir page_path) ;
+            chaque figure rendue y est conservée, et les travaux {"name", "reuse": True}
+            ne sont pas reconstruits : leur page est relue depuis ce dossier
+        cache_dir (str | None): cache de rendu adressé par contenu (voir render_key) ; un travail
+            déjà rendu à l'identique reprend ses images et sa page sans reconstruire la figure
+            ("render <name> (cache)" dans les mesures) ; un PDF déjà assemblé à partir
+            des mêmes pages est simplement recopié
+        max_cache_bytes (int): taille maximale du cache de rendu (éviction LRU)
+    """
+    todo = [job for job in jobs if not job.get("reuse")]
+    if page_dir is None and len(todo) < len(jobs):
+        raise ValueError("Les travaux \"reuse\" nécessitent un dossier de pages (page_dir)")
+    pages = {}
+    if cache_dir is not None:
+        for job in todo:
+            with tracer.stage(f"{_job_name(job)} (cache)"):
+                page = _read_render_cache(job, cache_dir)
+            if page is not None:
+                pages[id(job)] = page
+    misses = [job for job in todo if id(job) not in pages]
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(misses))
+
+    rendered = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+                rendered = list(pool.map(_render_job, misses))
+        except (OSError, NotImplementedError):
+            # pool indisponible (ex. pas de sémaphores POSIX) : rendu séquentiel
+            rendered = None
+
+    if rendered is None and page_dir is None and cache_dir is None:
+        pdf = open_pdf(pdf_path) if pdf_path else None
+        try:
+            for job in jobs:
+                outputs = list(job.get("outputs", []))
+                with tracer.stage(_job_name(job)):
+                    export_figure(build_job_figure(job), outputs + ([pdf] if pdf else []))
+        finally:
+            if pdf is not None:
+                pdf.close()
+        return
+
+    if rendered is None:
+        # rendu séquentiel, figures sérialisées pour le dossier de pages / le cache de rendu
+        rendered = []
+        for job in misses:
+            with tracer.stage(_job_name(job)):
+                rendered.append(_render_job(job))
+    else:
+        for job, (_, wall, cpu) in zip(misses, rendered):
+            tracer.record(_job_name(job), wall, cpu)
+    for job, (data, _, _) in zip(misses, rendered):
+        pages[id(job)] = data
+        if cache_dir is not None:
+            _write_render_cache(job, data, cache_dir, max_cache_bytes)
+
+    if page_dir is not None:
+        os.makedirs(page_dir, exist_ok=True)
+        for job in todo:
+            Path(page_path(page_dir, job["name"])).write_bytes(pages[id(job)])
+    if pdf_path is None:
+        return
+    for job in jobs:
+        if id(job) not in pages:
+            pages[id(job)] = Path(page_path(page_dir, job["name"])).read_bytes()
+
+    # PDF déjà assemblé à partir des mêmes pages : simple copie
+    cached_pdf = None
+    if cache_dir is not None:
+        pdf_key = hashlib.sha256()
+        for job in jobs:
+            pdf_key.update(hashlib.sha256(pages[id(job)]).digest())
+        cached_pdf = Path(cache_dir) / f"{pdf_key.hexdigest()[:32]}.pdf"
+        if cached_pdf.exists():
+            with tracer.stage("pdf (cache)"):
+                os.makedirs(os.path.dirname(pdf_path) or ".", exist_ok=True)
+                shutil.copyfile(cached_pdf, pdf_path)
+                os.utime(cached_pdf)
+            return
+
+    with tracer.stage("pdf"), open_pdf(pdf_path) as pdf:
+        for job in jobs:
+            export_figure(pickle.loads(pages[id(job)]), pdf)
+    if cached_pdf is not None:
+        shutil.copyfile(pdf_path, cached_pdf)
+        _evict_render_cache(cached_pdf.parent, max_cache_bytes, keep=cached_pdf.stem)
@@ -0,0 +1,148 @@
+"""
+Instrumentation par étape du pipeline (chargement, questions, rendu, PDF).
+
+Un StageTracer mesure, pour chaque étape encadrée par `with tracer.stage(...)` :
+    - le temps écoulé (wall_s) et le temps CPU du processus (cpu_s) ;
+    - le nombre de lignes en entrée / en sortie (rows_in / rows_out, si renseignés) ;
+    - le pic de mémoire Python allouée pendant l'étape (peak_mb, via tracemalloc).
+
+Désactivé (NULL_TRACER, valeur par défaut des fonctions instrumentées), stage()
+renvoie un contexte vide partagé : aucune mesure, aucun enregistrement.
+Les étapes peuvent s'imbriquer ; le pic mémoire d'une étape inclut celui de ses sous-étapes.
+
+Utilisation depuis main.py : python main.py --trace ../data/output/trace.json --trace-summary
+"""
+
+# === IMPORTS ===
+import csv
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+import pandas as pd          # Pour le tableau récapitulatif
+
+
+FIELDS = ["stage", "parent", "wall_s", "cpu_s", "rows_in", "rows_out", "peak_mb"]
+
+
+class StageTracer:
+    """
+    Collecte les mesures des étapes du pipeline.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True):
+        """
+        Params:
+            enabled (bool): False = aucune mesure (coût nul)
+            trace_memory (bool): mesurer le pic mémoire par étape (tracemalloc ralentit
+                nettement les allocations : à désactiver pour des temps représentatifs)
+        """
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records = []
+        self._stack = []
+        self._started_tracemalloc = False
+        self._disabled_stage = nullcontext({})
+
+    def stage(self, name: str, rows_in: int | None = None):
+        """
+        Contexte mesurant une étape. Le dictionnaire renvoyé peut recevoir "rows_out"
+        (ou corriger "rows_in") avant la sortie du bloc :
+
+            with tracer.stage("load_data") as stage:
+                df = load_data(...)
+                stage["rows_out"] = len(df)
+
+        Les nombres de lignes ne sont renseignés que pour les étapes qui lisent ou
+        produisent réellement des lignes (pas pour le rendu, ni pour une étape sans travail).
+        """
+        if not self.enabled:
+            return self._disabled_stage
+        return self._measure(name, rows_in)
+
+    def record(self, name: str, wall_s: float, cpu_s: float, rows_in: int | None = None,
+               rows_out: int | None = None, peak_mb: float | None = None) -> None:
+        """Enregistre une étape mesurée ailleurs (ex: rendu dans un processus du pool)."""
+        if self.enabled:
+            self.records.append({"stage": name, "parent": self._stack[-1]["stage"] if self._stack else None,
+                                 "wall_s": wall_s, "cpu_s": cpu_s, "rows_in": rows_in,
+                                 "rows_out": rows_out, "peak_mb": peak_mb})
+
+    def close(self) -> None:
+        """Arrête tracemalloc s'il a été démarré par ce traceur."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # -----------------------------
+    # Sorties
+    # -----------------------------
+
+    def summary(self) -> pd.DataFrame:
+        """Tableau des étapes mesurées, dans l'ordre de fin d'exécution."""
+        return pd.DataFrame(self.records, columns=FIELDS)
+
+    def print_summary(self) -> None:
+        """Affiche le tableau récapitulatif des étapes."""
+        table = self.summary()
+        print("\nInstrumentation par étape :")
+        print(table.to_string(index=False, na_rep="-", float_format=lambda value: f"{value:.3f}"))
+
+    def write(self, path: str) -> str:
+        """
+        Écrit les mesures dans un fichier .json (liste d'enregistrements) ou .csv.
+
+        Returns:
+            str: chemin du fichier écrit
+        """
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in (".json", ".csv"):
+            raise ValueError(f"Format de trace non supporté : {ext} (attendu .json ou .csv)")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if ext == ".json":
+                json.dump(self.records, f, indent=2, ensure_ascii=False)
+            else:
+                writer = csv.DictWriter(f, fieldnames=FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        return path
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    @contextmanager
+    def _measure(self, name: str, rows_in: int | None):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            if self._stack:
+                # le pic de l'étape englobante jusqu'ici est conservé avant remise à zéro
+                parent = self._stack[-1]
+                parent["_peak"] = max(parent["_peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        stage = {"stage": name, "parent": self._stack[-1]["stage"] if self._stack else None,
+                 "rows_in": rows_in, "rows_out": None, "_peak": 0}
+        self._stack.append(stage)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stage
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._stack.pop()
+            peak = None
+            if self.trace_memory:
+                peak = max(stage["_peak"], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+                peak = round(peak / 1e6, 3)
+            self.records.append({"stage": name, "parent": stage["parent"], "wall_s": wall, "cpu_s": cpu,
+                                 "rows_in": stage["rows_in"], "rows_out": stage["rows_out"],
+                                 "peak_mb": peak})
+
+
+NULL_TRACER = StageTracer(enabled=False)  # traceur par défaut : aucune mesure
@@ -1,96 +1,239 @@
+import argparse
 import os
 from config import (
-    FILE_PATH, SELLER_COL, DATE_COL, YEAR_COL, QUARTER_COL,
-    TOTAL_COL, QUANTITY_COL, UNIT_PRICE_COL, QUESTIONS
+    FILE_PATH, CACHE_DIR, LOAD_PROFILE, QUARTER_AS_INT, AGGREGATE_STORE_PATH, SQL_DB_PATH, RENDER_WORKERS, WATCH_DIR,
+    RENDER_CACHE_DIR, RENDER_CACHE_MAX_MB, PDF_ENGINE,
+    DATE_COL, YEAR_COL, QUARTER_COL, INDEXED_COLS, AGGREGATE_DIMS, AGGREGATE_MEASURES, CUBE_EXPORT_DIR, QUESTIONS
 )
 import functions as fn
+import planner
+from data_processing.aggregates import AggregateStore
+from data_processing.loader import DataLoader
+from data_processing.sql_backend import SQLBackend
+from instrumentation import StageTracer, NULL_TRACER
+from watch import (partition_fingerprints, changed_partitions, affected_questions, load_state, save_state,
+                   watch_loop, save_results, load_results)
+
+OUTPUT_DIR = "../data/output"
+PDF_PATH = f"{OUTPUT_DIR}/reports/rapport_statistiques.pdf"
+RESULTS_DIR = f"{OUTPUT_DIR}/results"
+EXPORT_FORMATS = ("csv", "json", "xlsx", "ods")  # xlsx / ods : un classeur, une feuille par question
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse des ventes et génération du rapport PDF")
+    parser.add_argument("--trace", metavar="FICHIER",
+                        help="écrire les mesures par étape (temps, CPU, lignes, pic mémoire) en .json ou .csv")
+    parser.add_argument("--trace-summary", action="store_true",
+                        help="afficher le tableau des mesures par étape en fin d'exécution")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="ne pas mesurer le pic mémoire (tracemalloc ralentit les allocations)")
+    parser.add_argument("--watch", action="store_true",
+                        help="surveiller le fichier d'entrée et ne recalculer que les questions touchées")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="délai entre deux vérifications du fichier en mode --watch (secondes)")
+    parser.add_argument("--no-render", action="store_true",
+                        help="afficher les résultats sans générer images ni PDF (matplotlib n'est pas chargé)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help=f"exporter les résultats bruts dans {RESULTS_DIR} au lieu de les dessiner")
+    args = parser.parse_args(argv)
+    if args.watch and (args.no_render or args.format):
+        parser.error("--watch ne se combine pas avec --no-render / --format")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracer = NULL_TRACER
+    if args.trace or args.trace_summary:
+        tracer = StageTracer(trace_memory=not args.no_trace_memory)
+
+    try:
+        if args.watch:
+            try:
+                watch_loop(FILE_PATH, lambda: run_incremental(tracer), args.interval)
+            except KeyboardInterrupt:
+                pass
+        else:
+            run(tracer, render=not (args.no_render or args.format), export_format=args.format)
+    finally:
+        tracer.close()
+    if args.trace:
+        print(f"Mesures écrites : {tracer.write(args.trace)}")
+    if args.trace_summary:
+        tracer.print_summary()
+
+def open_sql_backend(tracer=NULL_TRACER) -> SQLBackend:
+    """
+    Ouvre la base SQL_DB_PATH et y ingère FILE_PATH par blocs si la base ne
+    correspond plus au fichier (taille, date de modification ou profil changés).
+    """
+    backend = SQLBackend(SQL_DB_PATH)
+    stat = os.stat(FILE_PATH)
+    source = f"{os.path.abspath(FILE_PATH)}|{stat.st_size}|{stat.st_mtime_ns}|{LOAD_PROFILE!r}|{QUARTER_AS_INT}"
+    if not backend.is_current(source):
+        with tracer.stage("sql_ingest") as stage:
+            chunks = (fn.add_date_parts(chunk, DATE_COL, YEAR_COL, QUARTER_COL, QUARTER_AS_INT)
+                      for chunk in DataLoader(FILE_PATH, profile=LOAD_PROFILE).iter_chunks())
+            stage["rows_out"] = backend.ingest(chunks, index_cols=INDEXED_COLS,
+                                               categories=(LOAD_PROFILE or {}).get("categories"),
+                                               source=source)
+    return backend
+
+def run(tracer=NULL_TRACER, render: bool = True, export_format: str | None = None):
+    """
+    Calcule les réponses à QUESTIONS puis les dessine (images + PDF), ou, sans rendu,
+    les affiche (render=False) ou les exporte en csv / json (export_format).
+    """
+    if SQL_DB_PATH is not None:
+        # Questions exécutées en SQL dans la base locale : les lignes ne sont jamais chargées en mémoire
+        with open_sql_backend(tracer) as backend:
+            results = planner.run_questions(None, QUESTIONS, YEAR_COL, tracer=tracer, backend=backend)
+        output(results, tracer, render, export_format)
+        return
 
-def main():
     # Charger les données
-    df = fn.load_data(
-        file_path=FILE_PATH,
-        date_col=DATE_COL,
-        year_col=YEAR_COL,
-        quarter_col=QUARTER_COL
-    )
-
-    # Créer les dossiers de sortie si besoin
-    os.makedirs("../data/output/tables", exist_ok=True)
-    os.makedirs("../data/output/charts", exist_ok=True)
-    os.makedirs("../data/output/reports", exist_ok=True)
-
-    # Préparer les listes pour le PDF
-    tables = []  # Liste des tables (DataFrame, titre)
-    histograms = []  # Liste des histogrammes (DataFrame, colonne, titre)
-
-    # Q1 - Pour chaque vendeur, quel est le chiffre d'affaires total par année? (Table-pdf)
-    q1 = QUESTIONS["Q1"]
-
-    result1 = fn.groupby_aggregate(df, q1["group_cols"], q1["agg_col"], q1["agg_func"])
-    print(f"Q1 : {q1['title']}\n", result1)
-    fn.save_table_image(result1, q1["title"], "../data/output/tables/Q1.png")
-    tables.append((result1, q1["title"]))
-
-    # Q2 - Pour chaque vendeur, quel est le chiffre d'affaires moyen par trimestre? (Table-odf)
-    q2 = QUESTIONS["Q2"]
-    result2 = fn.groupby_aggregate(df, q2["group_cols"], q2["agg_col"], q2["agg_func"])
-    print(f"\nQ2 : {q2['title']}\n", result2)
-    fn.save_table_image(result2, q2["title"], "../data/output/tables/Q2.png")
-    tables.append((result2, q2["title"]))
-
-    # Q3 - Pour chaque vendeur, quelle est la quantité moyenne (QUANTITY) vendue par transaction ?
-    q3 = QUESTIONS["Q3"]
-    result3 = fn.groupby_aggregate(df, q3["group_cols"], q3["agg_col"], q3["agg_func"])
-    print(f"\nQ3 : {q3['title']}\n", result3)
-    fn.save_table_image(result3, q3["title"], "../data/output/tables/Q3.png")
-    tables.append((result3, q3["title"]))
-
-    # Q4 - En 2023, quel est le vendeur ayant la plus grande dispersion des prix unitaires (UNIT_PRICE)? (Histo-pdf)
-    q4 = QUESTIONS["Q4"]
-    df_2023 = fn.filter_by_value(df, YEAR_COL, q4["year"])
-    result4 = fn.groupby_aggregate(df_2023, q4["group_cols"], q4["agg_col"], q4["agg_func"])
-    print(f"\nQ4 : {q4['title']}\n", result4)
-    fn.save_histogram_image(result4, q4["agg_col"], q4["title"], "../output/charts/Q4.png")
-    histograms.append((result4, q4["agg_col"], q4["title"]))
-
-    # Q5 - En 2025, quel est le classement des vendeurs par chiffre d'affaires moyen par transaction ? (Table-pdf)
-    q5 = QUESTIONS["Q5"]
-    df_2025 = fn.filter_by_value(df, YEAR_COL, q5["year"])
-    result5 = fn.groupby_aggregate(df_2025, q5["group_cols"], q5["agg_col"], q5["agg_func"])
-    result5 = result5.sort_values(by=q5["agg_col"], ascending=False)
-    print(f"\nQ5 : {q5['title']}\n", result5)
-    fn.save_table_image(result5, q5["title"], "../data/output/tables/Q5.png")
-    tables.append((result5, q5["title"]))
-
-    # Q6 - Pour chaque vendeur, quelles sont les valeurs min, max et moyennes du chiffre d'affaires (TOTAL) sur toute la période? (Table-pdf)
-    q6 = QUESTIONS["Q6"]
-    result6 = fn.groupby_aggregate_multi(df, q6["group_cols"], q6["agg_dict"])
-    print(f"\nQ6 : {q6['title']}\n", result6)
-    fn.save_table_image(result6, q6["title"], "../data/output/tables/Q6.png")
-    tables.append((result6, q6["title"]))
-
-    # Q7 - Quel vendeur a obtenu la médiane de chiffre d'affaires (TOTAL) la plus élevée en 2023 ? (Table-pdf)
-    q7 = QUESTIONS["Q7"]
-    df_2023b = fn.filter_by_value(df, YEAR_COL, q7["year"])
-    result7 = fn.groupby_aggregate(df_2023b, q7["group_cols"], q7["agg_col"], q7["agg_func"])
-    result7 = result7.sort_values(by=q7["agg_col"], ascending=False)
-    print(f"\nQ7 : {q7['title']}\n", result7)
-    fn.save_table_image(result7, q7["title"], "../data/output/tables/Q7.png")
-    tables.append((result7, q7["title"]))
-
-    # Q8 - Pour chaque vendeur, quel est le nombre total de transactions par année? (bisto-pdf)
-    q8 = QUESTIONS["Q8"]
-    result8 = fn.groupby_size(df, q8["group_cols"], q8["count_name"])
-    print(f"\nQ8 : {q8['title']}\n", result8)
-    #fn.save_table_image(result8, q8["title"], "../output/tables/Q8.png")
-    fn.save_histogram_image(result8, q8["count_name"], q8["title"], "../output/charts/Q8.png")
-    histograms.append((result8, q8["count_name"], q8["title"]))
-
-    # --- Générer le PDF unique avec toutes les tables et histogrammes ---
-    pdf_path = "../data/output/reports/rapport_statistiques.pdf"
-    fn.generate_pdf(pdf_path, tables, histograms)
-
-    print(f"\nPDF généré avec succès : {pdf_path}")
+    with tracer.stage("load_data") as stage:
+        df = fn.load_data(
+            file_path=FILE_PATH,
+            date_col=DATE_COL,
+            year_col=YEAR_COL,
+            quarter_col=QUARTER_COL,
+            cache_dir=CACHE_DIR,
+            profile=LOAD_PROFILE,
+            quarter_as_int=QUARTER_AS_INT,
+            verbose=True
+        )
+        stage["rows_out"] = len(df)
+
+    # Mettre à jour l'état d'agrégats avec les seules lignes ajoutées depuis le dernier run
+    store = None
+    if AGGREGATE_STORE_PATH is not None:
+        with tracer.stage("aggregate_store") as stage:
+            store = AggregateStore.load(AGGREGATE_STORE_PATH, AGGREGATE_DIMS, AGGREGATE_MEASURES)
+            added = store.update(df)
+            if added:
+                stage["rows_in"] = added
+                store.save()
+            if CUBE_EXPORT_DIR is not None:
+                store.materialize()
+                store.export(CUBE_EXPORT_DIR)
+
+    # Répondre à toutes les questions de QUESTIONS en partageant filtres et groupby
+    # (les questions servies par l'état d'agrégats ne rescannent pas l'historique,
+    # les autres sont regroupées par jeu de clés, cf. planner.py)
+    with tracer.stage("questions"):
+        results = planner.run_questions(df, QUESTIONS, YEAR_COL, store=store, tracer=tracer)
+    output(results, tracer, render, export_format)
+
+def output(results: dict, tracer=NULL_TRACER, render: bool = True, export_format: str | None = None):
+    """Aiguille les résultats vers le rapport, l'export brut ou le seul affichage."""
+    if export_format is not None:
+        export_results(results, export_format, tracer)
+    elif render:
+        report(results, tracer)
+    else:
+        print_results(results)
+
+def print_results(results: dict):
+    """Affiche les résultats des questions (celles absentes de results sont ignorées)."""
+    for qid, question in QUESTIONS.items():
+        if qid in results:
+            print(f"\n{qid} : {question['title']}\n", fn.format_for_display(results[qid], [QUARTER_COL]))
+
+def export_results(results: dict, export_format: str, tracer=NULL_TRACER):
+    """
+    Exporte les résultats sans passer par matplotlib : RESULTS_DIR/<id>.csv|json, ou un
+    classeur RESULTS_DIR/resultats.xlsx|ods avec une feuille par question (écrit en flux).
+    """
+    with tracer.stage(f"export {export_format}"):
+        if export_format in ("xlsx", "ods"):
+            path = os.path.join(RESULTS_DIR, f"resultats.{export_format}")
+            fn.export_workbook(path, results, [QUARTER_COL])
+            print(f"Résultats exportés : {path}")
+            return
+        for qid, result in results.items():
+            fn.export_table(result, os.path.join(RESULTS_DIR, f"{qid}.{export_format}"), [QUARTER_COL])
+    print(f"Résultats exportés ({export_format}) : {RESULTS_DIR}")
+
+def run_incremental(tracer=NULL_TRACER) -> list:
+    """
+    Mode --watch : compare les empreintes des partitions (YEAR, QUARTER) à celles du
+    passage précédent, ne recalcule et ne redessine que les questions qui en dépendent,
+    puis reconstruit le PDF avec les pages déjà rendues des autres questions (moteur
+    matplotlib) ou à partir de leurs résultats conservés (moteur reportlab).
+
+    Returns:
+        list: identifiants des questions recalculées
+    """
+    with tracer.stage("load_data") as stage:
+        df = fn.load_data(FILE_PATH, DATE_COL, YEAR_COL, QUARTER_COL, cache_dir=CACHE_DIR,
+                          profile=LOAD_PROFILE, quarter_as_int=QUARTER_AS_INT, verbose=True)
+        stage["rows_out"] = len(df)
+
+    state_path = os.path.join(WATCH_DIR, "state.json")
+    page_dir = os.path.join(WATCH_DIR, "pages")
+    result_dir = os.path.join(WATCH_DIR, "results")
+    state = load_state(state_path)
+    with tracer.stage("partition_fingerprints", rows_in=len(df)):
+        partitions = partition_fingerprints(df, YEAR_COL, QUARTER_COL)
+    changed = changed_partitions(state.get("partitions", {}), partitions)
+    affected = affected_questions(QUESTIONS, changed, state.get("questions", {}))
+    # page ou image absente (premier passage, sorties effacées) : la question est aussi recalculée
+    native_pdf = PDF_ENGINE == "reportlab"
+    affected = [qid for qid in QUESTIONS if qid in affected or not os.path.exists(output_path(qid))
+                or (not native_pdf and not os.path.exists(fn.page_path(page_dir, qid)))]
+    # moteur reportlab : le PDF complet est réécrit, il faut le résultat de chaque question non recalculée
+    previous = {}
+    if native_pdf:
+        previous = load_results(result_dir, [qid for qid in QUESTIONS if qid not in affected])
+        affected = [qid for qid in QUESTIONS if qid in affected or qid not in previous]
+
+    if not affected:
+        print("\nAucune partition modifiée : rapport inchangé")
+    else:
+        print(f"\nPartitions modifiées : {', '.join(sorted(changed)) or 'aucune'}"
+              f" ; questions recalculées : {', '.join(affected)}")
+        with tracer.stage("questions"):
+            results = planner.run_questions(df, {qid: QUESTIONS[qid] for qid in affected}, YEAR_COL, tracer=tracer)
+        save_results(result_dir, results)
+        report(results, tracer, page_dir=page_dir, previous_results=previous)
+    save_state(state_path, partitions, QUESTIONS)
+    return affected
+
+def output_path(qid: str) -> str:
+    """Image PNG d'une question (tables/ ou charts/ selon son rendu)."""
+    return fn.report_image_path(qid, QUESTIONS[qid], OUTPUT_DIR)
+
+def report(results: dict, tracer=NULL_TRACER, page_dir=None, previous_results=None):
+    """
+    Affiche les résultats des questions et génère les images et le PDF.
+
+    Les questions absentes de results (mode --watch) ne sont pas redessinées : leur page
+    du PDF est relue depuis page_dir (moteur matplotlib) ou réécrite à partir de
+    previous_results (moteur reportlab, qui pagine toujours le rapport complet).
+    """
+    print_results(results)
+
+    # --- Générer les images et le PDF unique : chaque figure est construite une seule fois ---
+    # (éventuellement dans un pool de RENDER_WORKERS processus) puis envoyée vers son PNG
+    # et vers sa page du PDF, toujours dans le même ordre (tables puis histogrammes)
+    jobs = fn.report_jobs(results, QUESTIONS, QUARTER_COL, OUTPUT_DIR)
+
+    # Moteur reportlab : les figures ne servent qu'aux PNG (questions recalculées seulement),
+    # le PDF est écrit à part (tableaux paginés) avec les résultats de toutes les questions.
+    # Moteur matplotlib en mode --watch (page_dir) : les pages déjà rendues sont reprises telles quelles.
+    native_pdf = PDF_ENGINE == "reportlab"
+    with tracer.stage("render_figures"):
+        fn.render_figures([job for job in jobs if not (native_pdf and job.get("reuse"))],
+                          None if native_pdf else PDF_PATH, workers=RENDER_WORKERS, tracer=tracer,
+                          page_dir=None if native_pdf else page_dir, cache_dir=RENDER_CACHE_DIR,
+                          max_cache_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024)
+    if native_pdf:
+        if previous_results:
+            jobs = fn.report_jobs({**previous_results, **results}, QUESTIONS, QUARTER_COL, OUTPUT_DIR)
+        with tracer.stage("pdf_report"):
+            fn.write_pdf_report(PDF_PATH, jobs, tracer)
+
+    print(f"\nPDF généré avec succès : {PDF_PATH}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
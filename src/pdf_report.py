@@ -0,0 +1,281 @@
+"""
+Rapport PDF écrit directement avec reportlab, sans passer par les figures matplotlib.
+
+    - les tableaux sont de vrais tableaux PDF (texte sélectionnable), paginés : toutes
+      les lignes sont écrites, l'en-tête est répété sur chaque page ;
+    - les histogrammes sont dessinés en vectoriel (barres, axes, libellés) ;
+    - l'écriture est incrémentale : chaque page est mise en forme, compressée puis
+      libérée, seules les lignes de la page en cours sont formatées.
+
+Utilisation :
+    with PdfReportWriter("rapport.pdf") as report:
+        report.add_table(df, "Titre", quarter_cols=["QUARTER"])
+        report.add_histogram(df, "TOTAL", "Titre", bins=10)
+"""
+
+# === IMPORTS ===
+import math
+import os
+import numpy as np
+import pandas as pd          # Pour la manipulation des données tabulaires
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Table, TableStyle
+try:
+    from .data_processing.histogram import histogram_counts
+    from .functions import format_for_display, flatten_columns
+    from .instrumentation import NULL_TRACER
+except ImportError:  # exécution directe depuis src/ (python main.py)
+    from data_processing.histogram import histogram_counts
+    from functions import format_for_display, flatten_columns
+    from instrumentation import NULL_TRACER
+
+
+# Couleurs reprises des figures matplotlib (build_table_figure / build_histogram_figure)
+TITLE_COLOR = colors.HexColor("#2563eb")
+HEADER_COLOR = colors.HexColor("#dbeafe")
+HEADER_TEXT_COLOR = colors.HexColor("#1e293b")
+STRIPE_COLOR = colors.HexColor("#f3f4f6")
+LABEL_COLOR = colors.HexColor("#334155")
+
+FONT, BOLD_FONT = "Helvetica", "Helvetica-Bold"
+
+
+# === ÉCRITURE DU RAPPORT ===
+class PdfReportWriter:
+    """
+    Rapport PDF multi-pages construit page par page (tables puis histogrammes, dans l'ordre d'ajout).
+    """
+
+    def __init__(self, path: str, pagesize: tuple = landscape(A4), font_size: float = 9,
+                 margin: float = 36):
+        """
+        Params:
+            path (str): chemin du PDF (son dossier est créé)
+            pagesize (tuple): format des pages, en points (A4 paysage par défaut)
+            font_size (float): taille du texte des tableaux (réduite si le tableau est trop large)
+            margin (float): marges, en points
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.width, self.height = pagesize
+        self.font_size = font_size
+        self.margin = margin
+        self.pages = 0
+        self._canvas = Canvas(path, pagesize=pagesize, pageCompression=1)
+
+    def __enter__(self) -> "PdfReportWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Termine le PDF (écrit le fichier)."""
+        if self._canvas is not None:
+            if self.pages == 0:
+                self._canvas.showPage()  # un PDF valide contient au moins une page
+            self._canvas.save()
+            self._canvas = None
+
+    # -----------------------------
+    # Tableaux
+    # -----------------------------
+
+    def add_table(self, df: pd.DataFrame, title: str, quarter_cols: list[str] | None = None,
+                  rows_per_page: int | None = None) -> int:
+        """
+        Écrit un tableau sur autant de pages que nécessaire.
+
+        Params:
+            df (pd.DataFrame): résultat à écrire (colonnes MultiIndex aplaties)
+            title (str): titre répété sur chaque page
+            quarter_cols (list[str] | None): colonnes de clés de trimestre, formatées en "2023Q1"
+            rows_per_page (int | None): lignes par page (None = autant que la hauteur le permet)
+
+        Returns:
+            int: nombre de pages écrites
+        """
+        font_size = self._table_font_size(df, quarter_cols)
+        row_height = font_size * 1.9
+        usable = self.height - 2 * self.margin - 42
+        rows_per_page = rows_per_page or max(1, int(usable // row_height) - 1)
+        total_pages = max(1, math.ceil(len(df) / rows_per_page))
+
+        for page in range(total_pages):
+            start = page * rows_per_page
+            chunk = flatten_columns(format_for_display(df.iloc[start:start + rows_per_page], quarter_cols))
+            header = [str(col) for col in chunk.columns]
+            rows = [[_cell_text(value) for value in row] for row in chunk.itertuples(index=False)]
+            note = f"Lignes {start + 1} à {start + len(rows)} sur {len(df)}" if total_pages > 1 else ""
+            self._draw_title(title, note)
+
+            widths = self._column_widths([header] + rows, font_size)
+            table = Table([header] + rows, colWidths=widths, rowHeights=row_height, repeatRows=1)
+            table.setStyle(TableStyle([
+                ("FONT", (0, 0), (-1, -1), FONT, font_size),
+                ("FONT", (0, 0), (-1, 0), BOLD_FONT, font_size),
+                ("TEXTCOLOR", (0, 0), (-1, 0), HEADER_TEXT_COLOR),
+                ("BACKGROUND", (0, 0), (-1, 0), HEADER_COLOR),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [STRIPE_COLOR, colors.white]),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ]))
+            _, table_height = table.wrapOn(self._canvas, self.width, self.height)
+            x = (self.width - sum(widths)) / 2
+            table.drawOn(self._canvas, x, self.height - self.margin - 42 - table_height)
+            self._end_page()
+        return total_pages
+
+    # -----------------------------
+    # Histogrammes
+    # -----------------------------
+
+    def add_histogram(self, df: pd.DataFrame, col: str, title: str, bins=10) -> None:
+        """
+        Dessine l'histogramme de df[col] en vectoriel sur une page.
+
+        Params:
+            df (pd.DataFrame): DataFrame source
+            col (str): colonne à afficher
+            title (str): titre de la page
+            bins: nombre de classes ou bornes des classes (comme numpy.histogram)
+        """
+        counts, edges = histogram_counts(df[col], bins)
+        self.add_counts(counts, edges, col, title)
+
+    def add_counts(self, counts, edges, xlabel: str, title: str) -> None:
+        """Dessine sur une page un histogramme déjà calculé (voir data_processing.histogram)."""
+        self._draw_title(title)
+        if np.sum(counts) == 0:
+            self._canvas.setFont(FONT, 12)
+            self._canvas.drawCentredString(self.width / 2, self.height / 2, "Aucune donnée")
+        else:
+            self.draw_histogram(counts, edges, xlabel)
+        self._end_page()
+
+    def draw_histogram(self, counts, edges, xlabel: str) -> None:
+        """Trace les barres, axes et libellés des effectifs counts (bornes edges) dans la zone de tracé."""
+        c = self._canvas
+        left, bottom = self.margin + 60, self.margin + 45
+        plot_width = self.width - left - self.margin - 20
+        plot_height = self.height - bottom - self.margin - 60
+        low, high = float(edges[0]), float(edges[-1])
+        span = (high - low) or 1.0
+        top = max(int(np.max(counts)), 1) * 1.1
+        to_x = lambda value: left + (float(value) - low) / span * plot_width
+        to_y = lambda count: bottom + float(count) / top * plot_height
+
+        # grille et graduations de l'axe des fréquences
+        c.setFont(FONT, 9)
+        c.setDash(3, 3)
+        c.setStrokeColor(colors.lightgrey)
+        for tick in _nice_ticks(top):
+            y = to_y(tick)
+            c.line(left, y, left + plot_width, y)
+            c.drawRightString(left - 6, y - 3, f"{tick:g}")
+        c.setDash()
+
+        # barres et effectifs
+        c.setStrokeColor(colors.black)
+        c.setFillColor(TITLE_COLOR, alpha=0.7)
+        for count, start, end in zip(counts, edges[:-1], edges[1:]):
+            c.rect(to_x(start), bottom, to_x(end) - to_x(start), to_y(count) - bottom, stroke=1, fill=1)
+        c.setFillColor(LABEL_COLOR)
+        for count, start, end in zip(counts, edges[:-1], edges[1:]):
+            c.drawCentredString((to_x(start) + to_x(end)) / 2, to_y(count) + 3, f"{int(count)}")
+
+        # axes, bornes des classes et libellés
+        c.setFillColor(colors.black)
+        c.line(left, bottom, left + plot_width, bottom)
+        c.line(left, bottom, left, bottom + plot_height)
+        step = max(1, math.ceil(len(edges) / 12))
+        for edge in edges[::step]:
+            c.line(to_x(edge), bottom, to_x(edge), bottom - 4)
+            c.drawCentredString(to_x(edge), bottom - 14, f"{float(edge):.4g}")
+        c.setFont(FONT, 11)
+        c.drawCentredString(left + plot_width / 2, bottom - 32, str(xlabel))
+        c.saveState()
+        c.translate(left - 42, bottom + plot_height / 2)
+        c.rotate(90)
+        c.drawCentredString(0, 0, "Fréquence")
+        c.restoreState()
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _draw_title(self, title: str, note: str = "") -> None:
+        c = self._canvas
+        c.setFillColor(TITLE_COLOR)
+        c.setFont(BOLD_FONT, 15)
+        c.drawCentredString(self.width / 2, self.height - self.margin - 12, title)
+        if note:
+            c.setFillColor(colors.grey)
+            c.setFont(FONT, 9)
+            c.drawCentredString(self.width / 2, self.height - self.margin - 28, note)
+        c.setFillColor(colors.black)
+
+    def _end_page(self) -> None:
+        self._canvas.showPage()
+        self.pages += 1
+
+    def _table_font_size(self, df: pd.DataFrame, quarter_cols: list[str] | None) -> float:
+        """Taille de police réduite si le tableau (estimé sur ses premières lignes) dépasse la largeur utile."""
+        sample = flatten_columns(format_for_display(df.head(50), quarter_cols))
+        rows = [[str(col) for col in sample.columns]]
+        rows += [[_cell_text(value) for value in row] for row in sample.itertuples(index=False)]
+        needed = sum(self._column_widths(rows, self.font_size, fit=False))
+        available = self.width - 2 * self.margin
+        return self.font_size if needed <= available else max(5.0, self.font_size * available / needed)
+
+    def _column_widths(self, rows: list[list[str]], font_size: float, fit: bool = True) -> list[float]:
+        """Largeur de chaque colonne d'après son texte le plus long, ramenée à la largeur utile si fit."""
+        widths = [max(stringWidth(row[i], BOLD_FONT if r == 0 else FONT, font_size)
+                      for r, row in enumerate(rows)) + 2 * font_size
+                  for i in range(len(rows[0]))]
+        available = self.width - 2 * self.margin
+        if fit and sum(widths) > available:
+            widths = [width * available / sum(widths) for width in widths]
+        return widths
+
+
+def _cell_text(value) -> str:
+    """Texte d'une cellule : décimaux à deux chiffres, valeurs manquantes vides."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.2f}".replace(",", " ")
+    return str(value)
+
+def _nice_ticks(top: float, count: int = 5) -> list[float]:
+    """Graduations « rondes » (1, 2, 5 × 10^n) de 0 à top."""
+    raw = top / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    return [step * i for i in range(int(top // step) + 1)]
+
+def write_report(path: str, jobs: list[dict], tracer=NULL_TRACER) -> int:
+    """
+    Écrit un rapport PDF à partir de travaux de rendu (format de functions.build_job_figure).
+
+    Params:
+        path (str): chemin du PDF
+        jobs (list[dict]): {"kind": "table", "df", "title", "quarter_cols"} ou
+            {"kind": "histogram", "df", "col", "title", "bins"}, dans l'ordre des pages
+        tracer (StageTracer): mesure de chaque travail ("pdf <name>", name = job["name"] ou titre)
+
+    Returns:
+        int: nombre de pages écrites
+    """
+    with PdfReportWriter(path) as report:
+        for job in jobs:
+            with tracer.stage(f"pdf {job.get('name', job['title'])}"):
+                if job["kind"] == "histogram":
+                    report.add_histogram(job["df"], job["col"], job["title"], job.get("bins", 10))
+                else:
+                    report.add_table(job["df"], job["title"], job.get("quarter_cols"))
+        return report.pages
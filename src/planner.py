@@ -0,0 +1,231 @@
+"""
+Planificateur de requêtes pour le dictionnaire QUESTIONS de config.py.
+
+Au lieu d'exécuter chaque question comme une passe pandas indépendante,
+les questions sont regroupées par jeu de clés de groupement :
+    - un filtre sur l'année ("year") est remplacé par une clé de groupement
+      supplémentaire (year_col) suivie d'une sélection sur le résultat agrégé,
+      ce qui donne exactement le même résultat qu'un filtre préalable ;
+    - toutes les agrégations partageant le même jeu de clés sont calculées
+      dans un seul groupby ;
+    - chaque question est ensuite projetée à partir de ce résultat commun.
+
+Avec le QUESTIONS actuel, les 8 questions sont servies par 3 groupby
+([SELLER, YEAR], [SELLER, QUARTER], [SELLER]) au lieu de 8 passes + 3 filtres.
+"""
+
+# === IMPORTS ===
+import pandas as pd          # Pour la manipulation des données tabulaires
+try:
+    from .data_processing.sketch import DEFAULT_ERROR, parse_quantile_func, groupby_approx_quantile
+    from .instrumentation import NULL_TRACER
+except ImportError:  # exécution directe depuis src/ (python main.py)
+    from data_processing.sketch import DEFAULT_ERROR, parse_quantile_func, groupby_approx_quantile
+    from instrumentation import NULL_TRACER
+
+
+SIZE_AGG = "size"  # pseudo-fonction utilisée pour les questions "count_name"
+
+
+# === PLANIFICATION ===
+def question_keys(question: dict, year_col: str) -> tuple:
+    """
+    Retourne le jeu de clés de groupement effectivement utilisé pour une question.
+
+    Params:
+        question (dict): entrée de QUESTIONS
+        year_col (str): nom de la colonne année
+
+    Returns:
+        tuple: colonnes de groupement (year_col ajoutée si la question filtre sur l'année)
+    """
+    keys = list(question["group_cols"])
+    if "year" in question and year_col not in keys:
+        keys.append(year_col)
+    return tuple(keys)
+
+def question_aggregations(question: dict) -> list[tuple]:
+    """
+    Liste les couples (colonne, fonction) nécessaires pour répondre à une question.
+
+    Params:
+        question (dict): entrée de QUESTIONS
+
+    Returns:
+        list[tuple]: couples (colonne, fonction), (None, "size") pour un comptage
+    """
+    if "agg_dict" in question:
+        aggs = []
+        for col, funcs in question["agg_dict"].items():
+            funcs = [funcs] if isinstance(funcs, str) else funcs
+            aggs.extend((col, func) for func in funcs)
+        return aggs
+    if "count_name" in question:
+        return [(None, SIZE_AGG)]
+    return [(question["agg_col"], question["agg_func"])]
+
+def build_plan(questions: dict, year_col: str) -> dict:
+    """
+    Construit le plan d'exécution : un groupby par jeu de clés distinct.
+
+    Params:
+        questions (dict): dictionnaire QUESTIONS
+        year_col (str): nom de la colonne année
+
+    Returns:
+        dict: {clés: {"aggs": [(colonne, fonction), ...], "questions": [id, ...],
+            "sketch_error": erreur des quantiles approchés (la plus fine demandée)}}
+    """
+    plan = {}
+    for qid, question in questions.items():
+        step = plan.setdefault(question_keys(question, year_col),
+                               {"aggs": [], "questions": [], "sketch_error": DEFAULT_ERROR})
+        for agg in question_aggregations(question):
+            if agg not in step["aggs"]:
+                step["aggs"].append(agg)
+        step["questions"].append(qid)
+        step["sketch_error"] = min(step["sketch_error"], question.get("sketch_error", DEFAULT_ERROR))
+    return plan
+
+
+# === EXÉCUTION ===
+def _agg_name(col, func) -> str:
+    """Nom interne de la colonne résultat d'une agrégation."""
+    return SIZE_AGG if func == SIZE_AGG else f"{col}|{func}"
+
+def execute_step(df: pd.DataFrame, keys: tuple, aggs: list[tuple],
+                 sketch_error: float = DEFAULT_ERROR) -> pd.DataFrame:
+    """
+    Exécute un groupby unique calculant toutes les agrégations demandées.
+
+    Params:
+        df (pd.DataFrame): DataFrame source
+        keys (tuple): colonnes de groupement
+        aggs (list[tuple]): couples (colonne, fonction)
+        sketch_error (float): erreur de rang des quantiles approchés ('approx_median'...)
+
+    Returns:
+        pd.DataFrame: une ligne par groupe, une colonne par agrégation (clés en colonnes)
+    """
+    grouped = df.groupby(list(keys), observed=True)
+    named = {_agg_name(col, func): (col, func) for col, func in aggs
+             if func != SIZE_AGG and parse_quantile_func(func) is None}
+    result = grouped.agg(**named) if named else pd.DataFrame(index=grouped.size().index)
+    if (None, SIZE_AGG) in aggs:
+        result[SIZE_AGG] = grouped.size()
+    for col, func in aggs:
+        q = parse_quantile_func(func)
+        if q is not None:
+            result[_agg_name(col, func)] = groupby_approx_quantile(df, list(keys), col, q, sketch_error)
+    return result.reset_index()
+
+def project_question(step_result: pd.DataFrame, question: dict, year_col: str) -> pd.DataFrame:
+    """
+    Extrait le résultat d'une question à partir du résultat d'un groupby partagé.
+
+    Le format est identique à celui de groupby_aggregate, groupby_aggregate_multi
+    et groupby_size de functions.py.
+
+    Params:
+        step_result (pd.DataFrame): résultat de execute_step
+        question (dict): entrée de QUESTIONS
+        year_col (str): nom de la colonne année
+
+    Returns:
+        pd.DataFrame: résultat de la question
+    """
+    group_cols = list(question["group_cols"])
+    result = step_result
+    if "year" in question:
+        result = result[result[year_col] == question["year"]]
+        if year_col not in group_cols:
+            result = result.drop(columns=year_col)
+    result = result.reset_index(drop=True)
+
+    if "agg_dict" in question:
+        aggs = question_aggregations(question)
+        projected = result[group_cols + [_agg_name(col, func) for col, func in aggs]]
+        projected.columns = pd.MultiIndex.from_tuples(
+            [(col, "") for col in group_cols] + list(aggs)
+        )
+        return projected
+    if "count_name" in question:
+        return result[group_cols + [SIZE_AGG]].rename(columns={SIZE_AGG: question["count_name"]})
+
+    agg_col, agg_func = question["agg_col"], question["agg_func"]
+    projected = result[group_cols + [_agg_name(agg_col, agg_func)]]
+    projected = projected.rename(columns={_agg_name(agg_col, agg_func): agg_col})
+    return _sort_result(projected, question)
+
+def _sort_result(result: pd.DataFrame, question: dict) -> pd.DataFrame:
+    """Applique le tri "sort" éventuel d'une question à agrégation simple."""
+    if question.get("sort") == "desc":
+        return result.sort_values(by=question["agg_col"], ascending=False)
+    return result
+
+def answer_from_store(store, question: dict, year_col: str) -> pd.DataFrame | None:
+    """
+    Répond à une question à partir d'un état d'agrégats incrémental, sans rescanner les lignes.
+
+    Params:
+        store (AggregateStore): état couvrant tout l'historique (data_processing.aggregates)
+        question (dict): entrée de QUESTIONS
+        year_col (str): nom de la colonne année
+
+    Returns:
+        pd.DataFrame | None: résultat de la question, ou None si l'état ne sait pas y répondre
+    """
+    group_cols = list(question["group_cols"])
+    filters = {year_col: question["year"]} if "year" in question else None
+    if not all(store.supports(group_cols, col, func, filters) for col, func in question_aggregations(question)):
+        return None
+
+    if "agg_dict" in question:
+        return store.query_multi(group_cols, question["agg_dict"], filters)
+    if "count_name" in question:
+        return store.query_size(group_cols, question["count_name"], filters)
+    result = store.query(group_cols, question["agg_col"], question["agg_func"], filters)
+    return _sort_result(result, question)
+
+def run_questions(df: pd.DataFrame | None, questions: dict, year_col: str, store=None,
+                  tracer=NULL_TRACER, backend=None) -> dict:
+    """
+    Répond à toutes les questions en partageant filtres et groupby.
+
+    Params:
+        df (pd.DataFrame): DataFrame source (issu de load_data)
+        questions (dict): dictionnaire QUESTIONS
+        year_col (str): nom de la colonne année
+        store (AggregateStore | None): état d'agrégats à jour pour df ; les questions
+            qu'il sait servir ne déclenchent aucun groupby sur df
+        tracer (StageTracer): mesures par étape (un groupby partagé, puis chaque question)
+        backend (SQLBackend | None): base locale où exécuter les groupby en SQL
+            (data_processing.sql_backend) ; df peut alors valoir None
+
+    Returns:
+        dict: {id de question: DataFrame résultat}, dans l'ordre de questions
+    """
+    results = {}
+    if store is not None:
+        with tracer.stage("aggregate_store queries"):
+            for qid, question in questions.items():
+                with tracer.stage(qid) as stage:
+                    answer = answer_from_store(store, question, year_col)
+                    if answer is not None:
+                        results[qid] = answer
+                        stage["rows_out"] = len(answer)
+    remaining = {qid: question for qid, question in questions.items() if qid not in results}
+
+    for keys, step in build_plan(remaining, year_col).items():
+        rows_in = backend.rows if backend is not None else len(df)
+        with tracer.stage(f"groupby {list(keys)}", rows_in=rows_in) as stage:
+            if backend is not None:
+                step_result = backend.execute_step(keys, step["aggs"])
+            else:
+                step_result = execute_step(df, keys, step["aggs"], step["sketch_error"])
+            stage["rows_out"] = len(step_result)
+        for qid in step["questions"]:
+            with tracer.stage(qid, rows_in=len(step_result)) as stage:
+                results[qid] = project_question(step_result, remaining[qid], year_col)
+                stage["rows_out"] = len(results[qid])
+    return {qid: results[qid] for qid in questions}
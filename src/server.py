@@ -0,0 +1,288 @@
+"""
+Service d'analyse résident : les données restent chargées en mémoire entre les requêtes.
+
+Le fichier d'entrée est lu une fois (DataLoader + profil compact), un DataAnalyzer
+indexé est gardé prêt, et les réponses à QUESTIONS sont calculées une seule fois par
+version des données. Chaque requête vérifie la date de modification du fichier :
+s'il a changé, les données sont rechargées (hot reload) avant de répondre.
+
+API HTTP locale (JSON) :
+    GET  /health                      état du service (lignes, fichier, version)
+    GET  /questions                   liste des questions de config.QUESTIONS
+    GET  /questions/<id>              résultat d'une question
+    GET  /render/<id>.png             figure d'une question (tableau ou histogramme)
+    GET  /count?condition=...         DataAnalyzer.count_rows
+    GET  /filter?condition=...&limit= DataAnalyzer.filter (limit lignes, 100 par défaut)
+    POST /query                       question ad hoc au format QUESTIONS (corps JSON)
+    POST /reload                      rechargement forcé
+
+Lancement : python server.py --port 8765 (depuis src/), ou python -m src.server
+"""
+
+# === IMPORTS ===
+import argparse
+import io
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import pandas as pd          # Pour la manipulation des données tabulaires
+try:
+    from . import functions as fn
+    from . import planner
+    from .config import FILE_PATH, LOAD_PROFILE, QUARTER_AS_INT, DATE_COL, YEAR_COL, QUARTER_COL, INDEXED_COLS, QUESTIONS
+    from .data_processing.analyzer import DataAnalyzer
+    from .data_processing.loader import DataLoader
+except ImportError:  # exécution directe depuis src/ (python server.py)
+    import functions as fn
+    import planner
+    from config import FILE_PATH, LOAD_PROFILE, QUARTER_AS_INT, DATE_COL, YEAR_COL, QUARTER_COL, INDEXED_COLS, QUESTIONS
+    from data_processing.analyzer import DataAnalyzer
+    from data_processing.loader import DataLoader
+
+
+DEFAULT_PORT = 8765
+DEFAULT_FILTER_LIMIT = 100
+
+
+# === SERVICE ===
+class AnalysisService:
+    """
+    Données chargées et réponses mémorisées, rechargées quand le fichier source change.
+    """
+
+    def __init__(self, file_path: str = FILE_PATH, questions: dict = QUESTIONS,
+                 profile: dict | None = LOAD_PROFILE, quarter_as_int: bool = QUARTER_AS_INT):
+        """
+        Params:
+            file_path (str): fichier de ventes (tout format lu par DataLoader)
+            questions (dict): questions servies par /questions (format de config.QUESTIONS)
+            profile (dict | None): profil de chargement compact
+            quarter_as_int (bool): trimestre codé en entier (voir load_data)
+        """
+        self.file_path = file_path
+        self.questions = questions
+        self.profile = profile
+        self.quarter_as_int = quarter_as_int
+        self.version = 0
+        self._lock = threading.Lock()
+        self._query_lock = threading.Lock()  # cache du DataAnalyzer et pyplot : un thread à la fois
+        self._fingerprint = None
+        self.reload_error = None
+        self._snapshot = (0, None)  # (version, df) : lus ensemble par answer
+        self._results = (0, None)   # (version des données, réponses à self.questions)
+        self.reload()
+
+    def reload(self) -> None:
+        """Relit le fichier source ; les réponses mémorisées sont invalidées."""
+        with self._lock:
+            fingerprint = self._file_fingerprint()
+            with DataLoader(self.file_path, profile=self.profile) as loader:
+                df = fn.add_date_parts(loader.load_data(), DATE_COL, YEAR_COL, QUARTER_COL, self.quarter_as_int)
+            index_cols = [col for col in INDEXED_COLS if col in df.columns]
+            # remplacement en une affectation : les requêtes en cours gardent l'ancienne version
+            self.df, self.analyzer = df, DataAnalyzer(df, index_cols=index_cols)
+            self._fingerprint = fingerprint
+            self.loaded_at = time.time()
+            self.version += 1
+            self._snapshot = (self.version, df)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Recharge les données si le fichier a été modifié depuis le dernier chargement.
+        Si la relecture échoue (fichier en cours d'écriture...), les données précédentes
+        restent servies ; l'erreur figure dans /health et le rechargement est retenté
+        à la requête suivante.
+        """
+        try:
+            if self._file_fingerprint() == self._fingerprint:
+                return False
+            self.reload()
+        except Exception as e:
+            self.reload_error = f"{type(e).__name__}: {e}"
+            return False
+        self.reload_error = None
+        return True
+
+    def answer(self, qid: str) -> pd.DataFrame:
+        """
+        Résultat d'une question de self.questions (toutes calculées ensemble, une fois par version).
+
+        Les réponses sont mémorisées avec la version des données dont elles sont issues :
+        un calcul commencé avant un rechargement ne peut pas être servi pour la nouvelle version.
+        """
+        if qid not in self.questions:
+            raise KeyError(qid)
+        version, df = self._snapshot
+        results_version, results = self._results
+        if results is None or results_version != version:
+            results = planner.run_questions(df, self.questions, YEAR_COL)
+            with self._lock:
+                if self._snapshot[0] == version:
+                    self._results = (version, results)
+        return results[qid]
+
+    def ad_hoc(self, question: dict) -> pd.DataFrame:
+        """Résultat d'une question ad hoc (mêmes clés que les entrées de QUESTIONS)."""
+        if "group_cols" not in question:
+            raise ValueError("La question doit contenir 'group_cols'")
+        return planner.run_questions(self.df, {"query": question}, YEAR_COL)["query"]
+
+    def count(self, condition: str | None = None) -> int:
+        """Nombre de lignes vérifiant condition (DataAnalyzer.count_rows, résultats mémorisés)."""
+        with self._query_lock:
+            return self.analyzer.count_rows(condition)
+
+    def filter(self, condition: str) -> pd.DataFrame:
+        """Lignes vérifiant condition (DataAnalyzer.filter, résultats mémorisés)."""
+        with self._query_lock:
+            return self.analyzer.filter(condition)
+
+    def render_png(self, qid: str) -> bytes:
+        """Figure PNG d'une question (tableau ou histogramme selon son "render")."""
+        question = self.questions[qid]
+        if question.get("render") == "histogram":
+            job = {"kind": "histogram", "df": self.answer(qid), "title": question["title"],
+                   "col": question.get("agg_col", question.get("count_name"))}
+        else:
+            job = {"kind": "table", "df": self.answer(qid), "title": question["title"],
+                   "quarter_cols": [QUARTER_COL]}
+        import matplotlib.pyplot as plt  # importé au premier rendu seulement (démarrage du service)
+        with self._query_lock:  # pyplot n'est pas utilisable depuis plusieurs threads à la fois
+            fig = fn.build_job_figure(job)
+            try:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format="png", bbox_inches="tight")
+                return buffer.getvalue()
+            finally:
+                plt.close(fig)
+
+    def health(self) -> dict:
+        return {"file": self.file_path, "rows": len(self.df), "version": self.version,
+                "loaded_at": self.loaded_at, "reload_error": self.reload_error}
+
+    def _file_fingerprint(self) -> tuple:
+        stat = os.stat(self.file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+
+def frame_to_payload(df: pd.DataFrame) -> dict:
+    """
+    Convertit un résultat en JSON : {"columns": [...], "data": [[...], ...]}.
+    Les trimestres sont formatés ("2023Q1") et les colonnes MultiIndex aplaties ("TOTAL min").
+    """
+    df = fn.flatten_columns(fn.format_for_display(df, [QUARTER_COL]))
+    df = df.astype({col: str for col, dtype in df.dtypes.items() if isinstance(dtype, pd.PeriodDtype)})
+    return json.loads(df.to_json(orient="split", index=False, date_format="iso"))
+
+
+# === HTTP ===
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Routes de l'API ; le service est porté par le serveur (server.service)."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        self._handle(lambda service: self._get(service, parts, params))
+
+    def do_POST(self):
+        parts = [part for part in urlparse(self.path).path.split("/") if part]
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self._handle(lambda service: self._post(service, parts, body))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # -----------------------------
+    # Routes
+    # -----------------------------
+
+    def _get(self, service: AnalysisService, parts: list, params: dict):
+        if parts == ["health"]:
+            return self._send_json(service.health())
+        if parts == ["questions"]:
+            return self._send_json({qid: q["title"] for qid, q in service.questions.items()})
+        if len(parts) == 2 and parts[0] == "questions":
+            return self._send_json(frame_to_payload(service.answer(parts[1])))
+        if len(parts) == 2 and parts[0] == "render" and parts[1].endswith(".png"):
+            return self._send(200, service.render_png(parts[1][:-len(".png")]), "image/png")
+        if parts == ["count"]:
+            return self._send_json({"count": service.count(params.get("condition"))})
+        if parts == ["filter"] and "condition" in params:
+            limit = int(params.get("limit", DEFAULT_FILTER_LIMIT))
+            rows = service.filter(params["condition"])
+            return self._send_json({"count": len(rows), **frame_to_payload(rows.head(limit))})
+        return self._send_json({"error": f"Route inconnue : {self.path}"}, 404)
+
+    def _post(self, service: AnalysisService, parts: list, body: bytes):
+        if parts == ["query"]:
+            return self._send_json(frame_to_payload(service.ad_hoc(json.loads(body or b"{}"))))
+        if parts == ["reload"]:
+            service.reload()
+            return self._send_json(service.health())
+        return self._send_json({"error": f"Route inconnue : {self.path}"}, 404)
+
+    # -----------------------------
+    # Méthodes internes
+    # -----------------------------
+
+    def _handle(self, route):
+        service = self.server.service
+        try:
+            service.reload_if_changed()
+            route(service)
+        except KeyError as e:
+            self._send_json({"error": f"Question inconnue : {e.args[0]}"}, 404)
+        except (ValueError, TypeError, SyntaxError, json.JSONDecodeError) as e:
+            self._send_json({"error": str(e)}, 400)
+        except Exception as e:
+            self._send_json({"error": f"Erreur interne : {type(e).__name__}: {e}"}, 500)
+
+    def _send_json(self, payload, status: int = 200):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                   "application/json; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(service: AnalysisService, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                  verbose: bool = False) -> ThreadingHTTPServer:
+    """
+    Crée le serveur HTTP (port 0 = port libre choisi par le système, voir server.server_address).
+    """
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service d'analyse des ventes (données gardées en mémoire)")
+    parser.add_argument("--file", default=FILE_PATH, help="fichier de ventes à servir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--verbose", action="store_true", help="journaliser chaque requête")
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use("Agg")  # backend non interactif, sans charger pyplot avant le premier rendu
+    server = create_server(AnalysisService(args.file), args.host, args.port, args.verbose)
+    print(f"Service d'analyse : http://{args.host}:{server.server_address[1]} ({args.file})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
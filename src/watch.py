@@ -0,0 +1,192 @@
+"""
+Mode surveillance : recalcul limité aux questions touchées par une modification du fichier.
+
+Le fichier de ventes est découpé en partitions (YEAR, QUARTER) ; chaque partition
+reçoit une empreinte (hachage de ses lignes). D'une exécution à l'autre :
+    - les partitions ajoutées, supprimées ou modifiées sont détectées ;
+    - une question filtrée sur une année ("year") ne dépend que des partitions de
+      cette année (Q5 : 2025, Q4 / Q7 : 2023), les autres dépendent de toutes ;
+    - seules les questions touchées (ou dont la définition a changé) sont recalculées
+      et redessinées, les autres pages du PDF sont reprises du cache de pages
+      (moteur matplotlib) ou reconstruites à partir des résultats conservés (moteur reportlab).
+
+L'état (empreintes des partitions et des questions) est conservé en JSON entre deux exécutions.
+"""
+
+# === IMPORTS ===
+import hashlib
+import json
+import os
+import pickle
+import time
+import pandas as pd          # Pour la manipulation des données tabulaires
+
+
+# === EMPREINTES ===
+def partition_fingerprints(df: pd.DataFrame, year_col: str, quarter_col: str) -> dict:
+    """
+    Empreinte de chaque partition (année, trimestre) : somme des hachages de ses lignes
+    et nombre de lignes (indépendante de l'ordre des lignes dans la partition).
+
+    Params:
+        df (pd.DataFrame): données chargées (avec colonnes année et trimestre)
+        year_col (str): nom de la colonne année
+        quarter_col (str): nom de la colonne trimestre
+
+    Returns:
+        dict: {"année|trimestre": "empreinte"}
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    grouped = hashes.groupby([df[year_col], df[quarter_col].astype(str)], observed=True)
+    sums, counts = grouped.sum(), grouped.size()
+    return {f"{year}|{quarter}": f"{int(sums[(year, quarter)]):x}-{int(counts[(year, quarter)])}"
+            for year, quarter in sums.index}
+
+def question_fingerprint(question: dict) -> str:
+    """Empreinte de la définition d'une question (une question modifiée est recalculée)."""
+    return hashlib.sha256(json.dumps(question, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def changed_partitions(previous: dict, current: dict) -> set:
+    """Partitions ajoutées, supprimées ou modifiées entre deux jeux d'empreintes."""
+    return {key for key in previous.keys() | current.keys() if previous.get(key) != current.get(key)}
+
+def affected_questions(questions: dict, changed: set, previous_questions: dict) -> list:
+    """
+    Questions à recalculer.
+
+    Params:
+        questions (dict): dictionnaire QUESTIONS
+        changed (set): partitions modifiées ("année|trimestre")
+        previous_questions (dict): {id: empreinte} des questions lors de l'exécution précédente
+
+    Returns:
+        list: identifiants des questions touchées, dans l'ordre de questions
+    """
+    changed_years = {key.split("|", 1)[0] for key in changed}
+    affected = []
+    for qid, question in questions.items():
+        if previous_questions.get(qid) != question_fingerprint(question):
+            affected.append(qid)
+        elif "year" in question:
+            if str(question["year"]) in changed_years:
+                affected.append(qid)
+        elif changed:
+            affected.append(qid)
+    return affected
+
+
+# === ÉTAT ===
+def load_state(path: str) -> dict:
+    """État de l'exécution précédente ({} si absent ou illisible)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(path: str, partitions: dict, questions: dict) -> None:
+    """Enregistre les empreintes des partitions et des questions (écriture atomique)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"partitions": partitions,
+                   "questions": {qid: question_fingerprint(q) for qid, q in questions.items()}}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def save_results(result_dir: str, results: dict) -> None:
+    """
+    Conserve les résultats recalculés (écriture atomique) : le moteur PDF reportlab
+    reconstruit tout le rapport à chaque passage, y compris les questions non recalculées.
+
+    Params:
+        result_dir (str): dossier des résultats
+        results (dict): {id de question: DataFrame résultat}
+    """
+    os.makedirs(result_dir, exist_ok=True)
+    for qid, result in results.items():
+        path = os.path.join(result_dir, f"{qid}.pickle")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+def load_results(result_dir: str, qids) -> dict:
+    """
+    Relit les résultats conservés par save_results.
+
+    Params:
+        result_dir (str): dossier des résultats
+        qids (iterable): identifiants des questions à relire
+
+    Returns:
+        dict: {id de question: DataFrame résultat} (résultats absents ou illisibles omis)
+    """
+    results = {}
+    for qid in qids:
+        try:
+            with open(os.path.join(result_dir, f"{qid}.pickle"), "rb") as f:
+                results[qid] = pickle.load(f)
+        except Exception:  # absent, tronqué ou illisible : la question sera recalculée
+            continue
+    return results
+
+
+# === SURVEILLANCE ===
+def watch_file(path: str, interval: float = 2.0, max_events: int | None = None):
+    """
+    Générateur signalant chaque modification du fichier (taille ou date de modification).
+    Le premier événement est émis immédiatement.
+
+    Params:
+        path (str): fichier surveillé
+        interval (float): délai entre deux vérifications, en secondes
+        max_events (int | None): nombre d'événements avant arrêt (None = sans fin)
+
+    Yields:
+        tuple: (taille, date de modification) du fichier
+
+    Un fichier momentanément inaccessible (remplacé pendant un enregistrement, verrouillé)
+    n'interrompt pas la surveillance : l'erreur est affichée et la vérification reprend.
+    """
+    last, events, error = None, 0, None
+    while max_events is None or events < max_events:
+        try:
+            stat = os.stat(path)
+        except Exception as e:
+            if str(e) != error:  # une seule fois par erreur, pas à chaque vérification
+                error = str(e)
+                print(f"Fichier surveillé inaccessible ({type(e).__name__}: {e}), nouvelle tentative...")
+            time.sleep(interval)
+            continue
+        error = None
+        current = (stat.st_size, stat.st_mtime_ns)
+        if current != last:
+            last = current
+            events += 1
+            yield current
+        else:
+            time.sleep(interval)
+
+def watch_loop(path: str, on_change, interval: float = 2.0, max_events: int | None = None) -> int:
+    """
+    Appelle on_change() à chaque modification du fichier (voir watch_file), sans s'arrêter
+    sur une erreur : un passage qui échoue (classeur à moitié écrit, fichier verrouillé...)
+    est signalé puis la surveillance continue jusqu'à la modification suivante.
+
+    Params:
+        path (str): fichier surveillé
+        on_change (callable): traitement sans argument (ex. recalcul incrémental)
+        interval (float): délai entre deux vérifications, en secondes
+        max_events (int | None): nombre d'événements avant arrêt (None = sans fin)
+
+    Returns:
+        int: nombre de passages en échec
+    """
+    failures = 0
+    for _ in watch_file(path, interval, max_events):
+        try:
+            on_change()
+        except Exception as e:
+            failures += 1
+            print(f"Échec du recalcul ({type(e).__name__}: {e}) : en attente de la prochaine modification")
+    return failures
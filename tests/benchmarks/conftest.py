@@ -0,0 +1,66 @@
+"""
+Fixtures des benchmarks : fichiers de ventes synthétiques générés une fois par session.
+
+Les benchmarks sont longs : ils ne s'exécutent qu'avec l'option --benchmark-only
+(pytest tests/benchmarks --benchmark-only), et sont ignorés par un simple pytest.
+
+Taille réglable par la variable d'environnement SALES_BENCH_ROWS (10 000 lignes par défaut,
+limitée à la taille maximale d'une feuille Excel pour le fichier .xlsx).
+"""
+
+import os
+import tracemalloc
+from pathlib import Path
+import pytest
+from src.config import DATE_COL, YEAR_COL, QUARTER_COL, LOAD_PROFILE, QUARTER_AS_INT
+from src.data_processing.utils import write_sales_data, EXCEL_MAX_ROWS
+from src import load_data
+
+BENCH_ROWS = int(os.environ.get("SALES_BENCH_ROWS", 10_000))
+BENCH_SELLERS = int(os.environ.get("SALES_BENCH_SELLERS", 50))
+BENCH_ROUNDS = int(os.environ.get("SALES_BENCH_ROUNDS", 3))
+FORMATS = ("xlsx", "csv", "json", "parquet")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark-only", default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmark : lancer avec --benchmark-only")
+    for item in items:
+        if item.path.is_relative_to(Path(__file__).parent):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def sales_files(tmp_path_factory):
+    """Chemins des fichiers synthétiques {format: chemin}, mêmes données dans chaque format."""
+    folder = tmp_path_factory.mktemp("sales")
+    files = {}
+    for fmt in FORMATS:
+        n_rows = min(BENCH_ROWS, EXCEL_MAX_ROWS) if fmt == "xlsx" else BENCH_ROWS
+        files[fmt] = write_sales_data(str(folder / f"sales.{fmt}"), n_rows, n_sellers=BENCH_SELLERS)
+    return files
+
+@pytest.fixture(scope="session")
+def sales_df(sales_files):
+    """Données chargées comme dans main.py (profil compact, trimestre entier)."""
+    return load_data(sales_files["xlsx"], DATE_COL, YEAR_COL, QUARTER_COL,
+                     profile=LOAD_PROFILE, quarter_as_int=QUARTER_AS_INT)
+
+@pytest.fixture
+def run_benchmark(benchmark):
+    """
+    Mesure func : pic mémoire (tracemalloc, sur un appel) puis temps (BENCH_ROUNDS appels).
+    Le pic et la taille des données sont enregistrés dans extra_info (rapport JSON).
+    """
+    def run(func, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory_mb"] = round(peak / 1e6, 3)
+        benchmark.extra_info["rows"] = BENCH_ROWS
+        return benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=BENCH_ROUNDS, iterations=1)
+    return run
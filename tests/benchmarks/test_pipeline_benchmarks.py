@@ -0,0 +1,82 @@
+"""
+Benchmarks du pipeline sur données synthétiques (pytest-benchmark).
+
+Exemples :
+    SALES_BENCH_ROWS=1000000 pytest tests/benchmarks --benchmark-only --benchmark-autosave
+    pytest tests/benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:10%
+    pytest tests/benchmarks --benchmark-only --benchmark-json=data/output/benchmarks.json
+
+--benchmark-autosave enregistre chaque exécution en JSON dans .benchmarks/ :
+--benchmark-compare compare à la dernière exécution enregistrée (temps et extra_info,
+dont le pic mémoire peak_memory_mb).
+"""
+
+import pandas as pd
+import pytest
+from src.config import QUESTIONS, DATE_COL, YEAR_COL, QUARTER_COL, LOAD_PROFILE
+from src.data_processing.loader import DataLoader
+from src.planner import run_questions
+from src import load_data, save_table_image, save_histogram_image, generate_pdf
+
+pytest.importorskip("pytest_benchmark")
+
+
+# -----------------------------------------------------
+# Chargement
+# -----------------------------------------------------
+
+def test_load_data(run_benchmark, sales_files):
+    df = run_benchmark(load_data, sales_files["xlsx"], DATE_COL, YEAR_COL, QUARTER_COL,
+                       profile=LOAD_PROFILE, quarter_as_int=True)
+    assert len(df) > 0
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_loader(run_benchmark, sales_files, fmt):
+    df = run_benchmark(DataLoader(sales_files[fmt], profile=LOAD_PROFILE).load_data)
+    assert len(df) > 0
+
+def test_read_parquet(run_benchmark, sales_files):
+    df = run_benchmark(pd.read_parquet, sales_files["parquet"], columns=LOAD_PROFILE["usecols"])
+    assert len(df) > 0
+
+
+# -----------------------------------------------------
+# Questions
+# -----------------------------------------------------
+
+@pytest.mark.parametrize("qid", list(QUESTIONS))
+def test_question(run_benchmark, sales_df, qid):
+    results = run_benchmark(run_questions, sales_df, {qid: QUESTIONS[qid]}, YEAR_COL)
+    assert qid in results
+
+def test_all_questions(run_benchmark, sales_df):
+    results = run_benchmark(run_questions, sales_df, QUESTIONS, YEAR_COL)
+    assert set(results) == set(QUESTIONS)
+
+
+# -----------------------------------------------------
+# Rendu
+# -----------------------------------------------------
+
+def test_save_table_image(run_benchmark, sales_df, tmp_path):
+    result = run_questions(sales_df, {"Q1": QUESTIONS["Q1"]}, YEAR_COL)["Q1"].reset_index()
+    run_benchmark(save_table_image, result, QUESTIONS["Q1"]["title"], str(tmp_path / "table.png"),
+                  quarter_cols=[QUARTER_COL])
+    assert (tmp_path / "table.png").exists()
+
+def test_save_histogram_image(run_benchmark, sales_df, tmp_path):
+    question = QUESTIONS["Q8"]
+    result = run_questions(sales_df, {"Q8": question}, YEAR_COL)["Q8"]
+    run_benchmark(save_histogram_image, result, question["count_name"], question["title"],
+                  str(tmp_path / "hist.png"))
+    assert (tmp_path / "hist.png").exists()
+
+@pytest.mark.parametrize("engine", ["matplotlib", "reportlab"])
+def test_generate_pdf(run_benchmark, sales_df, tmp_path, engine):
+    results = run_questions(sales_df, QUESTIONS, YEAR_COL)
+    tables = [(results[qid].reset_index(), q["title"]) for qid, q in QUESTIONS.items()
+              if q.get("render") != "histogram"]
+    histograms = [(results[qid], q.get("agg_col", q.get("count_name")), q["title"])
+                  for qid, q in QUESTIONS.items() if q.get("render") == "histogram"]
+    run_benchmark(generate_pdf, str(tmp_path / "report.pdf"), tables, histograms, engine=engine)
+    assert (tmp_path / "report.pdf").exists()
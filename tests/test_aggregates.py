@@ -0,0 +1,144 @@
+"""
+Tests unitaires pour le module data_processing.aggregates
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.aggregates import AggregateStore
+from src.config import QUESTIONS, YEAR_COL
+from src.planner import run_questions
+from src import groupby_aggregate, groupby_aggregate_multi, groupby_size
+
+
+DIMS = ["SELLER", "YEAR", "QUARTER"]
+MEASURES = ["TOTAL", "QUANTITY", "UNIT_PRICE"]
+
+
+# -----------------------------------------------------
+# Fixtures
+# -----------------------------------------------------
+
+@pytest.fixture
+def sales_data():
+    """Historique de ventes aléatoire (graine fixe) sur 2022-2025."""
+    rng = np.random.default_rng(42)
+    n = 500
+    df = pd.DataFrame({
+        "SELLER": rng.choice(["Alice", "Bob", "Chloé", "David"], n),
+        "DATE": pd.Timestamp("2022-01-01") + pd.to_timedelta(rng.integers(0, 4 * 365, n), unit="D"),
+        "QUANTITY": rng.integers(1, 20, n),
+        "UNIT_PRICE": rng.uniform(1, 100, n).round(2),
+    })
+    df["TOTAL"] = df["QUANTITY"] * df["UNIT_PRICE"]
+    df["YEAR"] = df["DATE"].dt.year
+    df["QUARTER"] = df["DATE"].dt.to_period("Q")
+    return df
+
+
+@pytest.fixture
+def store(sales_data):
+    """État construit en trois lots successifs."""
+    store = AggregateStore(DIMS, MEASURES)
+    for end in (120, 350, len(sales_data)):
+        store.update(sales_data.iloc[:end])
+    return store
+
+
+# -----------------------------------------------------
+# Tests unitaires
+# -----------------------------------------------------
+
+@pytest.mark.parametrize("func", ["count", "sum", "mean", "std", "var", "min", "max"])
+def test_incremental_matches_full_groupby(sales_data, store, func):
+    result = groupby_aggregate(sales_data, ["SELLER", "YEAR"], "TOTAL", func, store=store)
+    expected = sales_data.groupby(["SELLER", "YEAR"])["TOTAL"].agg(func).reset_index()
+    assert list(result.columns) == list(expected.columns)
+    assert np.allclose(result["TOTAL"], expected["TOTAL"])
+
+
+def test_multi_and_size(sales_data, store):
+    multi = groupby_aggregate_multi(sales_data, ["SELLER"], {"TOTAL": ["min", "max", "mean"]}, store=store)
+    expected = sales_data.groupby(["SELLER"]).agg({"TOTAL": ["min", "max", "mean"]}).reset_index()
+    assert list(multi.columns) == list(expected.columns)
+    assert np.allclose(multi[("TOTAL", "mean")], expected[("TOTAL", "mean")])
+
+    size = groupby_size(sales_data, ["SELLER", "QUARTER"], store=store)
+    pd.testing.assert_frame_equal(size, groupby_size(sales_data, ["SELLER", "QUARTER"]))
+
+
+def test_update_only_reads_new_rows(sales_data, store):
+    assert store.update(sales_data) == 0
+    assert store.rows_seen == len(sales_data)
+
+
+def test_rewritten_history_rebuilds(sales_data, store):
+    changed = sales_data.copy()
+    changed.loc[len(changed) - 1, "TOTAL"] = 1e6
+    assert store.update(changed) == len(changed)
+    assert store.query(["SELLER"], "TOTAL", "max")["TOTAL"].max() == 1e6
+
+
+def test_edited_middle_row_rebuilds(sales_data, store):
+    changed = sales_data.copy()
+    changed.loc[10, "TOTAL"] = 1e6  # ligne ancienne corrigée dans le fichier source
+    assert store.update(changed) == len(changed)
+    result = store.query(["SELLER", "YEAR"], "TOTAL", "sum")
+    expected = changed.groupby(["SELLER", "YEAR"])["TOTAL"].sum().reset_index()
+    assert np.allclose(result["TOTAL"], expected["TOTAL"])
+
+def test_edited_row_detected_after_reload(tmp_path, sales_data, store):
+    store.path = str(tmp_path / "aggregates.parquet")
+    store.save()
+    changed = sales_data.copy()
+    changed.loc[200, "QUANTITY"] += 1
+    loaded = AggregateStore.load(store.path, DIMS, MEASURES)
+    assert loaded.update(changed) == len(changed)
+    assert loaded.query(["SELLER"], "QUANTITY", "sum")["QUANTITY"].sum() == changed["QUANTITY"].sum()
+
+
+def test_save_and_load(tmp_path, store):
+    path = str(tmp_path / "aggregates.parquet")
+    store.path = path
+    store.save()
+    loaded = AggregateStore.load(path, DIMS, MEASURES)
+    assert loaded.rows_seen == store.rows_seen
+    pd.testing.assert_frame_equal(loaded.query(["SELLER"], "TOTAL", "std"), store.query(["SELLER"], "TOTAL", "std"))
+
+    # dimensions différentes : état ignoré
+    assert AggregateStore.load(path, ["SELLER"], MEASURES).rows_seen == 0
+
+
+def test_run_questions_with_store(sales_data, store):
+    with_store = run_questions(sales_data, QUESTIONS, YEAR_COL, store=store)
+    without_store = run_questions(sales_data, QUESTIONS, YEAR_COL)
+    for qid in QUESTIONS:
+        pd.testing.assert_frame_equal(
+            with_store[qid].reset_index(drop=True), without_store[qid].reset_index(drop=True),
+            check_dtype=False
+        )
+
+
+def test_cuboids_rolled_up_from_materialized_grains(sales_data, store):
+    sizes = store.materialize()
+    assert len(sizes) == 7  # 2^3 - 1 grains
+    assert sizes[("SELLER",)] == sales_data["SELLER"].nunique()
+    seller_year = store.cuboid(["SELLER", "YEAR"])
+    assert store.cuboid(["SELLER", "YEAR"]) is seller_year
+
+    # requête filtrée servie depuis le grain SELLER × YEAR, identique à un groupby complet
+    for func in ("sum", "std", "max"):
+        result = store.query(["SELLER"], "UNIT_PRICE", func, {"YEAR": 2024})
+        expected = sales_data[sales_data["YEAR"] == 2024].groupby("SELLER")["UNIT_PRICE"].agg(func)
+        assert np.allclose(result["UNIT_PRICE"], expected.to_numpy())
+
+    store.add(sales_data.iloc[:10])  # modification de l'état : grains invalidés
+    assert store.cuboid(["SELLER", "YEAR"]) is not seller_year
+
+
+def test_export_cuboids(tmp_path, store):
+    store.materialize()
+    paths = store.export(str(tmp_path / "cube"))
+    assert len(paths) == 7
+    seller = pd.read_parquet(tmp_path / "cube" / "SELLER.parquet")
+    assert seller["__rows"].sum() == store.rows_seen
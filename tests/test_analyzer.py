@@ -35,6 +35,12 @@ def df_csv():
     return loader.load_data()
 
 
+@pytest.fixture
+def analyzer_stream():
+    """Analyseur en streaming sur le CSV, par blocs de 2 lignes."""
+    return DataAnalyzer.from_loader(DataLoader("data/input/test_data.csv"), chunksize=2)
+
+
 @pytest.fixture
 def analyzer_excel(df_excel):
     return DataAnalyzer(df_excel)
@@ -80,3 +86,77 @@ def test_describe(analyzer_csv):
     desc = analyzer_csv.describe()
     # Vérifie que la colonne Score est dans le DataFrame descriptif
     assert "Score" in desc.columns
+
+
+# -----------------------------------------------------
+# Tests mode streaming
+# -----------------------------------------------------
+
+def test_stream_count_rows(analyzer_stream, analyzer_csv):
+    assert analyzer_stream.count_rows() == analyzer_csv.count_rows()
+    assert analyzer_stream.count_rows("Score > 70") == analyzer_csv.count_rows("Score > 70")
+
+def test_stream_mean_and_filter(analyzer_stream, analyzer_csv):
+    assert analyzer_stream.mean("Score") == pytest.approx(analyzer_csv.mean("Score"))
+    pd.testing.assert_frame_equal(analyzer_stream.filter("Passed == True"),
+                                  analyzer_csv.filter("Passed == True").reset_index(drop=True))
+
+@pytest.mark.parametrize("agg_dict", [
+    {"Score": "mean"},
+    {"Score": ["min", "max", "sum", "std"]},
+])
+def test_stream_groupby(analyzer_stream, analyzer_csv, agg_dict):
+    result = analyzer_stream.groupby(by_columns=["Passed"], agg_dict=agg_dict)
+    expected = analyzer_csv.groupby(by_columns=["Passed"], agg_dict=agg_dict)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+@pytest.mark.parametrize("agg_dict", [
+    {"Score": "max"},
+    {"Score": ["min", "max", "count", "sum"]},
+])
+def test_stream_groupby_keeps_dtypes(analyzer_stream, analyzer_csv, agg_dict):
+    result = analyzer_stream.groupby(by_columns=["Passed"], agg_dict=agg_dict)
+    expected = analyzer_csv.groupby(by_columns=["Passed"], agg_dict=agg_dict)
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_stream_groupby_approx_median(analyzer_stream):
+    grouped = analyzer_stream.groupby(by_columns=["Passed"], agg_dict={"Score": "approx_median"})
+    assert grouped.loc[grouped["Passed"] == True, "Score"].values[0] == (85 + 72) / 2
+
+def test_stream_unsupported(analyzer_stream):
+    with pytest.raises(ValueError):
+        analyzer_stream.groupby(by_columns=["Passed"], agg_dict={"Score": "median"})
+    with pytest.raises(ValueError):
+        analyzer_stream.describe()
+
+
+# -----------------------------------------------------
+# Tests cache des résultats
+# -----------------------------------------------------
+
+def test_cache_hits_on_normalized_condition(analyzer_csv):
+    first = analyzer_csv.filter("Score > 70")
+    second = analyzer_csv.filter("Score>70")
+    assert second is first
+    assert analyzer_csv.count_rows("Score > 70") == 2
+    info = analyzer_csv.cache_info()
+    assert (info["hits"], info["misses"]) == (1, 2)
+
+def test_cache_invalidation(df_csv):
+    analyzer = DataAnalyzer(df_csv)
+    assert analyzer.count_rows("Score > 70") == 2
+    analyzer.df = pd.concat([df_csv, df_csv], ignore_index=True)
+    assert analyzer.count_rows("Score > 70") == 4
+
+    analyzer.df.loc[0, "Score"] = 0  # modification en place : invalidation explicite
+    analyzer.invalidate()
+    assert analyzer.count_rows("Score > 70") == 3
+
+def test_cache_eviction(df_csv):
+    analyzer = DataAnalyzer(df_csv, cache_size=2)
+    for threshold in (50, 60, 70):
+        analyzer.count_rows(f"Score > {threshold}")
+    assert analyzer.cache_info()["entries"] == 2
+    assert analyzer.cache_info()["evictions"] == 1
+    analyzer.count_rows("Score > 50")
+    assert analyzer.cache_info()["hits"] == 0
@@ -0,0 +1,104 @@
+"""
+Tests unitaires pour le mode lot (src/batch.py)
+"""
+
+import os
+import pandas as pd
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+from src import batch, planner
+from src.config import QUESTIONS, YEAR_COL
+from src.data_processing.utils import write_sales_data
+
+
+# === FIXTURES ===
+@pytest.fixture
+def regions(tmp_path):
+    """Deux fichiers régionaux de petite taille, plus un fichier ignoré."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    write_sales_data(str(input_dir / "nord.csv"), 300, n_sellers=4, years=(2023, 2025), seed=1)
+    write_sales_data(str(input_dir / "sud.csv"), 200, n_sellers=3, years=(2023, 2025), seed=2)
+    (input_dir / "notes.txt").write_text("ignoré")
+    return input_dir
+
+
+# === ENTRÉES ===
+def test_resolve_inputs_directory_and_glob(regions):
+    expected = [str(regions / "nord.csv"), str(regions / "sud.csv")]
+    assert batch.resolve_inputs([str(regions)]) == expected
+    assert batch.resolve_inputs([str(regions / "*.csv"), str(regions / "nord.csv")]) == expected
+    assert batch.resolve_inputs([str(regions / "*.xlsx")]) == []
+
+def test_output_dirs_are_distinct_per_input(tmp_path):
+    dirs = batch.output_dirs(["a/nord.csv", "a/nord.xlsx", "a/sud.csv"], str(tmp_path))
+    assert dirs == {"a/nord.csv": str(tmp_path / "nord_csv"), "a/nord.xlsx": str(tmp_path / "nord_xlsx"),
+                    "a/sud.csv": str(tmp_path / "sud")}
+
+def test_output_dirs_same_name_in_different_directories(tmp_path):
+    inputs = ["est/ventes.xlsx", "ouest/ventes.xlsx", "est_ventes.xlsx", "nord/ventes.csv"]
+    dirs = batch.output_dirs(inputs, str(tmp_path))
+    assert len(set(dirs.values())) == len(inputs)
+    assert dirs["est/ventes.xlsx"] == str(tmp_path / "est_ventes_xlsx")
+    assert dirs["ouest/ventes.xlsx"] == str(tmp_path / "ouest_ventes_xlsx")
+
+
+# === LOT ===
+def test_run_batch_writes_one_report_per_input(regions, tmp_path):
+    out = tmp_path / "out"
+    summaries = batch.run_batch(batch.resolve_inputs([str(regions)]), str(out), workers=1, consolidate=True)
+    assert [s["status"] for s in summaries] == ["ok", "ok"]
+    assert [s["rows"] for s in summaries] == [300, 200]
+    for region in ("nord", "sud", batch.CONSOLIDATED_DIR):
+        assert (out / region / "reports" / batch.REPORT_NAME).stat().st_size > 0
+        assert (out / region / "tables" / "Q1.png").exists()
+    assert (out / batch.CONSOLIDATED_DIR / "results" / "resultats.xlsx").exists()
+    assert all("results" not in s for s in summaries)
+
+def test_failed_input_is_reported_not_raised(regions, tmp_path):
+    (regions / "vide.csv").write_text("colonne\n1\n")
+    summaries = batch.run_batch(batch.resolve_inputs([str(regions)]), str(tmp_path / "out"), workers=1,
+                                render=False)
+    status = {os.path.basename(s["input"]): s["status"] for s in summaries}
+    assert status == {"nord.csv": "ok", "sud.csv": "ok", "vide.csv": "error"}
+    assert summaries[-1]["error"]
+
+def test_run_batch_in_process_pool(regions, tmp_path):
+    summaries = batch.run_batch(batch.resolve_inputs([str(regions)]), str(tmp_path / "out"), workers=2,
+                                export_format="csv")
+    assert [s["status"] for s in summaries] == ["ok", "ok"]
+    assert (tmp_path / "out" / "sud" / "results" / "Q1.csv").exists()
+    assert all(s["total_s"] >= s["load_s"] for s in summaries)
+
+
+# === CONSOLIDATION ===
+def test_consolidate_results_adds_region_column(regions):
+    results = {region: planner.run_questions(batch.load_input(str(regions / f"{region}.csv")), QUESTIONS, YEAR_COL)
+               for region in ("nord", "sud")}
+    consolidated = batch.consolidate_results(results)
+    assert list(consolidated) == list(QUESTIONS)
+    for qid, frame in consolidated.items():
+        assert frame.columns[0] in (batch.REGION_COL, (batch.REGION_COL, ""))
+        assert len(frame) == len(results["nord"][qid]) + len(results["sud"][qid])
+    assert consolidated["Q1"][batch.REGION_COL].unique().tolist() == ["nord", "sud"]
+
+def test_consolidated_exports_keep_region(regions, tmp_path):
+    out = tmp_path / "out"
+    batch.run_batch(batch.resolve_inputs([str(regions)]), str(out), workers=1, export_format="csv",
+                    consolidate=True)
+    q1 = pd.read_csv(out / batch.CONSOLIDATED_DIR / "results" / "Q1.csv")
+    assert q1.columns[0] == batch.REGION_COL
+    assert set(q1[batch.REGION_COL]) == {"nord", "sud"}
+    q6 = pd.read_csv(out / batch.CONSOLIDATED_DIR / "results" / "Q6.csv")
+    assert q6.columns[0] == batch.REGION_COL
+
+
+# === RÉSUMÉ ===
+def test_main_writes_summary(regions, tmp_path, capsys):
+    out = tmp_path / "out"
+    assert batch.main([str(regions), "--output", str(out), "--workers", "1", "--no-render"]) == 0
+    summary = pd.read_csv(out / "summary.csv")
+    assert summary["status"].tolist() == ["ok", "ok"]
+    assert set(batch.SUMMARY_FIELDS) == set(summary.columns)
+    assert "2 fichier(s), 0 en échec" in capsys.readouterr().out
@@ -1,11 +1,12 @@
 """
 Tests unitaires pour le module data_processing.loader
 """
+import importlib.util
 import os
 import pytest
 import pandas as pd
 from src.data_processing.loader import DataLoader
-from src.data_processing.utils import ensure_test_data
+from src.data_processing.utils import ensure_test_data, generate_sales_data, write_sales_data
 
 
 # -----------------------------------------------------
@@ -88,6 +89,80 @@ def test_load_json_data(json_loader):
     assert not df.empty
 
 
+# -----------------------------------------------------
+# Tests lecture par blocs
+# -----------------------------------------------------
+
+def test_iter_chunks_csv(csv_loader):
+    chunks = list(csv_loader.iter_chunks(chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), csv_loader.load_data())
+
+def test_iter_chunks_excel(excel_loader):
+    chunks = list(excel_loader.iter_chunks(chunksize=3, sheet_name="Sheet2"))
+    assert [len(chunk) for chunk in chunks] == [3]
+    pd.testing.assert_frame_equal(chunks[0], excel_loader.load_data(sheet_name="Sheet2"))
+
+def test_iter_chunks_excel_skips_blank_rows_and_keeps_profile_columns(tmp_path):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+    path = tmp_path / "blank_rows.xlsx"
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in [("Name", "Age", "Score"), ("Alice", 30, 85), ("Bob", 25, 92)]:
+        sheet.append(row)
+    for row in range(4, 7):  # lignes vides en fin de feuille (cellules mises en forme, sans valeur)
+        sheet.cell(row=row, column=1).font = Font(bold=True)
+    workbook.save(path)
+
+    with DataLoader(str(path), profile=PROFILE) as loader:
+        handle = loader._excel_handle()
+        chunks = list(loader.iter_chunks(chunksize=2))
+        assert loader._workbook is handle
+        expected = loader.load_data()
+    assert [len(chunk) for chunk in chunks] == [2]
+    assert list(chunks[0].columns) == ["Name", "Score"]
+    pd.testing.assert_frame_equal(chunks[0].astype({"Name": "category"}), expected)
+
+def test_iter_chunks_ndjson(tmp_path):
+    path = tmp_path / "data.ndjson"
+    pd.read_csv(TEST_CSV).to_json(path, orient="records", lines=True)
+    loader = DataLoader(str(path))
+    assert loader.file_type == "ndjson"
+    chunks = list(loader.iter_chunks(chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), loader.load_data())
+
+def test_iter_chunks_json_array(json_loader):
+    with pytest.raises(ValueError):
+        next(json_loader.iter_chunks(chunksize=2))
+
+
+# -----------------------------------------------------
+# Tests profil de chargement compact
+# -----------------------------------------------------
+
+PROFILE = {
+    "usecols": ["Name", "Score"],
+    "categories": ["Name"],
+    "downcast": {"Score": "integer"},
+}
+
+def test_load_csv_with_profile(capsys):
+    df = DataLoader(TEST_CSV, profile=PROFILE).load_data()
+    assert list(df.columns) == ["Name", "Score"]
+    assert isinstance(df["Name"].dtype, pd.CategoricalDtype)
+    assert df["Score"].dtype == "int8"
+    assert capsys.readouterr().out == ""
+    DataLoader(TEST_CSV, profile=PROFILE).load_data(verbose=True)
+    assert "Mémoire" in capsys.readouterr().out
+
+def test_iter_chunks_with_profile():
+    chunks = list(DataLoader(TEST_CSV, profile=PROFILE).iter_chunks(chunksize=2))
+    assert all(list(chunk.columns) == ["Name", "Score"] for chunk in chunks)
+    assert all(chunk["Score"].dtype == "int8" for chunk in chunks)
+
+
 # -----------------------------------------------------
 # Tests listing sheets
 # -----------------------------------------------------
@@ -123,3 +198,60 @@ def test_invalid_extension():
     finally:
         # Supprime le fichier après le test
         os.remove(TEST_INVALID)
+
+
+# -----------------------------------------------------
+# Tests moteurs Excel et classeur partagé
+# -----------------------------------------------------
+
+def test_excel_opened_once(excel_loader):
+    excel_loader.list_sheets()
+    handle = excel_loader._workbook
+    excel_loader.load_data(sheet_name="Sheet2")
+    assert excel_loader._workbook is handle
+    excel_loader.close()
+    assert excel_loader._workbook is None
+
+@pytest.mark.parametrize("engine", ["openpyxl", "stream",
+                                    pytest.param("calamine", marks=pytest.mark.skipif(
+                                        importlib.util.find_spec("python_calamine") is None,
+                                        reason="python-calamine non installé"))])
+def test_excel_engines(excel_loader, engine):
+    with DataLoader(TEST_EXCEL, engine=engine) as loader:
+        assert loader.list_sheets() == excel_loader.list_sheets()
+        pd.testing.assert_frame_equal(loader.load_data(sheet_name="Sheet2"),
+                                      excel_loader.load_data(sheet_name="Sheet2"))
+
+def test_excel_unknown_engine():
+    with pytest.raises(ValueError):
+        DataLoader(TEST_EXCEL, engine="xlrd2")
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_all_sheets(excel_loader, workers):
+    sheets = excel_loader.load_all_sheets(workers=workers)
+    assert list(sheets) == excel_loader.list_sheets()
+    for name, df in sheets.items():
+        pd.testing.assert_frame_equal(df, excel_loader.load_data(sheet_name=name))
+
+def test_load_all_sheets_non_excel(csv_loader):
+    with pytest.raises(ValueError):
+        csv_loader.load_all_sheets()
+
+
+# -----------------------------------------------------
+# Tests données synthétiques
+# -----------------------------------------------------
+
+def test_generate_sales_data_seeded():
+    df = generate_sales_data(500, n_sellers=7, years=(2023, 2024), seed=42)
+    pd.testing.assert_frame_equal(df, generate_sales_data(500, n_sellers=7, years=(2023, 2024), seed=42))
+    assert df["SELLER"].nunique() <= 7
+    assert set(df["YEAR"]) <= {2023, 2024}
+    assert (df["TOTAL"] == (df["QUANTITY"] * df["UNIT_PRICE"]).round(2)).all()
+
+@pytest.mark.parametrize("ext", ["csv", "json", "xlsx"])
+def test_write_sales_data_roundtrip(tmp_path, ext):
+    path = write_sales_data(str(tmp_path / f"sales.{ext}"), 250, n_sellers=5, chunksize=100)
+    df = DataLoader(path).load_data()
+    assert len(df) == 250
+    assert df["ID"].tolist() == list(range(1, 251))
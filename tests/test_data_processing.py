@@ -1,4 +1,6 @@
+import os
 import pandas as pd
+import zipfile
 import numpy as np
 import pytest
 from src import (
@@ -7,7 +9,10 @@ from src import (
     groupby_aggregate_multi,
     filter_by_value,
     groupby_size,
+    save_table_image,
+    export_workbook,
 )
+from src.functions import open_pdf, render_figures, format_for_display
 
 # === FIXTURES ===
 @pytest.fixture
@@ -46,6 +51,106 @@ def test_load_data(tmp_path):
     assert str(loaded.loc[0, "QUARTER"]).startswith("2023Q")
 
 
+def test_load_data_quarter_as_int(tmp_path):
+    """Le trimestre est une clé int32 année*10+trimestre, formatée seulement à l'affichage."""
+    df = pd.DataFrame({"DATE": ["2023-01-01", "2023-11-15"], "TOTAL": [100, 200]})
+    file_path = tmp_path / "data.xlsx"
+    df.to_excel(file_path, index=False)
+
+    loaded = load_data(file_path, "DATE", "YEAR", "QUARTER", quarter_as_int=True)
+
+    assert loaded["QUARTER"].dtype == "int32"
+    assert loaded["QUARTER"].tolist() == [20231, 20234]
+    assert format_for_display(loaded, ["QUARTER"])["QUARTER"].tolist() == ["2023Q1", "2023Q4"]
+    assert loaded["QUARTER"].dtype == "int32"  # l'original n'est pas modifié
+
+
+def test_format_for_display_keeps_periods(sample_data):
+    sample_data["QUARTER"] = sample_data["DATE"].dt.to_period("Q")
+    assert format_for_display(sample_data, ["QUARTER"]) is sample_data
+
+
+def test_load_data_with_profile(tmp_path, capsys):
+    """Le profil élague les colonnes, passe SELLER en category et réduit QUANTITY."""
+    df = pd.DataFrame({
+        "ID": [1, 2],
+        "DATE": ["2023-01-01", "2023-04-15"],
+        "SELLER": ["Alice", "Bob"],
+        "QUANTITY": [3, 4],
+        "TOTAL": [100.5, 200.25],
+    })
+    file_path = tmp_path / "data.xlsx"
+    df.to_excel(file_path, index=False)
+    profile = {
+        "usecols": ["DATE", "SELLER", "QUANTITY", "TOTAL"],
+        "categories": ["SELLER"],
+        "downcast": {"QUANTITY": "integer"},
+        "date_format": "%Y-%m-%d",
+    }
+
+    loaded = load_data(file_path, "DATE", "YEAR", "QUARTER", profile=profile)
+
+    assert "ID" not in loaded.columns
+    assert isinstance(loaded["SELLER"].dtype, pd.CategoricalDtype)
+    assert loaded["QUANTITY"].dtype == "int8"
+    assert loaded["TOTAL"].dtype == "float64"
+    assert str(loaded.loc[1, "QUARTER"]) == "2023Q2"
+    assert groupby_aggregate(loaded, ["SELLER"], "TOTAL", "sum")["SELLER"].tolist() == ["Alice", "Bob"]
+    assert capsys.readouterr().out == ""  # silencieux par défaut (verbose=False)
+    load_data(file_path, "DATE", "YEAR", "QUARTER", profile=profile, verbose=True)
+    assert "Mémoire" in capsys.readouterr().out
+
+
+def test_load_data_cache(tmp_path, monkeypatch):
+    """Teste que le second chargement est servi par le cache Parquet et qu'une modification l'invalide."""
+    df = pd.DataFrame({
+        "DATE": ["2023-01-01", "2023-04-15"],
+        "SELLER": ["Alice", "Bob"],
+        "TOTAL": [100, 200],
+    })
+    file_path = tmp_path / "data.xlsx"
+    cache_dir = tmp_path / "cache"
+    df.to_excel(file_path, index=False)
+
+    first = load_data(file_path, "DATE", "YEAR", "QUARTER", cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.parquet"))) == 1
+
+    # un cache valide ne doit plus relire le fichier Excel
+    def fail(*args, **kwargs):
+        raise AssertionError("read_excel ne doit pas être appelé")
+    monkeypatch.setattr(pd, "read_excel", fail)
+    second = load_data(file_path, "DATE", "YEAR", "QUARTER", cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(first, second)
+    monkeypatch.undo()
+
+    # fichier modifié : nouvelle entrée, l'ancienne est purgée
+    df.loc[1, "TOTAL"] = 300
+    df.to_excel(file_path, index=False)
+    os.utime(file_path, ns=(0, os.stat(file_path).st_mtime_ns + 10**9))
+    third = load_data(file_path, "DATE", "YEAR", "QUARTER", cache_dir=cache_dir)
+    assert third.loc[1, "TOTAL"] == 300
+    assert len(list(cache_dir.glob("*.parquet"))) == 1
+
+
+def test_load_data_cache_write_failure_is_not_fatal(tmp_path):
+    """Une colonne de types mélangés (nombres et texte) ne peut pas aller en Parquet : chargement sans cache."""
+    file_path = tmp_path / "mixed.xlsx"
+    pd.DataFrame({"DATE": ["2023-01-01", "2023-04-15"], "REF": [12, "A-7"]}).to_excel(file_path, index=False)
+    cache_dir = tmp_path / "cache"
+    with pytest.warns(RuntimeWarning, match="Cache Parquet non écrit"):
+        loaded = load_data(file_path, "DATE", "YEAR", "QUARTER", cache_dir=cache_dir)
+    assert loaded["REF"].tolist() == [12, "A-7"]
+    assert list(cache_dir.glob("*")) == []
+
+def test_load_data_cache_eviction(tmp_path):
+    cache_dir = tmp_path / "cache"
+    for i in range(3):
+        file_path = tmp_path / f"data{i}.xlsx"
+        pd.DataFrame({"DATE": ["2023-01-01"], "TOTAL": [i]}).to_excel(file_path, index=False)
+        load_data(file_path, "DATE", "YEAR", "QUARTER", cache_dir=cache_dir, max_cache_entries=2)
+    assert len(list(cache_dir.glob("*.parquet"))) == 2
+
+
 def test_groupby_aggregate(sample_data):
     result = groupby_aggregate(sample_data, ["SELLER"], "TOTAL", "sum")
     expected = {"Alice": 3970, "Bob": 5500}
@@ -69,3 +174,138 @@ def test_groupby_size(sample_data):
     result = groupby_size(sample_data, ["SELLER"])
     assert "COUNT" in result.columns
     assert result[result["SELLER"] == "Alice"]["COUNT"].iloc[0] == 3
+
+
+def test_save_table_image_multiple_outputs(sample_data, tmp_path, monkeypatch):
+    """La figure est construite une seule fois puis envoyée vers PNG, SVG et PDF."""
+    import src.functions as functions
+    calls = []
+    build = functions.build_table_figure
+    monkeypatch.setattr(functions, "build_table_figure", lambda *a, **k: calls.append(a) or build(*a, **k))
+
+    pdf_path = tmp_path / "reports" / "report.pdf"
+    with open_pdf(str(pdf_path)) as pdf:
+        save_table_image(sample_data, "Ventes", [str(tmp_path / "t.png"), str(tmp_path / "t.svg"), pdf])
+
+    assert len(calls) == 1
+    assert (tmp_path / "t.png").stat().st_size > 0
+    assert (tmp_path / "t.svg").stat().st_size > 0
+    assert pdf_path.stat().st_size > 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_figures(sample_data, tmp_path, workers):
+    """Le rendu parallèle produit les mêmes images et le même nombre de pages que le rendu séquentiel."""
+    jobs = [
+        {"kind": "table", "df": sample_data, "title": "Ventes", "outputs": [str(tmp_path / "t.png")]},
+        {"kind": "histogram", "df": sample_data, "col": "TOTAL", "title": "CA",
+         "outputs": [str(tmp_path / "h.png")]},
+    ]
+    pdf_path = tmp_path / "report.pdf"
+    render_figures(jobs, str(pdf_path), workers=workers)
+
+    assert (tmp_path / "t.png").stat().st_size > 0
+    assert (tmp_path / "h.png").stat().st_size > 0
+    assert pdf_path.read_bytes().count(b"/Type /Page ") == 2
+
+
+def test_save_table_image_render_cache(sample_data, tmp_path, monkeypatch):
+    """Un tableau identique (données, titre, paramètres) est repris du cache sans reconstruire la figure."""
+    import src.functions as functions
+    calls = []
+    build = functions.build_table_figure
+    monkeypatch.setattr(functions, "build_table_figure", lambda *a, **k: calls.append(a) or build(*a, **k))
+    cache_dir = tmp_path / "render_cache"
+
+    save_table_image(sample_data, "Ventes", str(tmp_path / "a.png"), cache_dir=cache_dir)
+    save_table_image(sample_data, "Ventes", str(tmp_path / "b.png"), cache_dir=cache_dir)
+    assert len(calls) == 1
+    assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+
+    save_table_image(sample_data, "Autre titre", str(tmp_path / "c.png"), cache_dir=cache_dir)
+    changed = sample_data.assign(TOTAL=sample_data["TOTAL"] + 1)
+    save_table_image(changed, "Ventes", str(tmp_path / "d.png"), cache_dir=cache_dir)
+    assert len(calls) == 3
+
+
+def test_render_figures_render_cache(sample_data, tmp_path, monkeypatch):
+    """Au second rendu, images et PDF viennent du cache : aucune figure n'est construite."""
+    import src.functions as functions
+    jobs = [
+        {"kind": "table", "df": sample_data, "title": "Ventes", "outputs": [str(tmp_path / "t.png")]},
+        {"kind": "histogram", "df": sample_data, "col": "TOTAL", "title": "CA",
+         "outputs": [str(tmp_path / "h.png")]},
+    ]
+    cache_dir = tmp_path / "render_cache"
+    render_figures(jobs, str(tmp_path / "first.pdf"), workers=1, cache_dir=cache_dir)
+
+    def fail(job):
+        raise AssertionError("figure reconstruite malgré le cache")
+    monkeypatch.setattr(functions, "build_job_figure", fail)
+    os.remove(tmp_path / "t.png")
+    render_figures(jobs, str(tmp_path / "second.pdf"), workers=1, cache_dir=cache_dir)
+
+    assert (tmp_path / "t.png").stat().st_size > 0
+    assert (tmp_path / "second.pdf").read_bytes() == (tmp_path / "first.pdf").read_bytes()
+
+
+def test_render_cache_is_size_bounded(sample_data, tmp_path):
+    """Au-delà de max_cache_bytes, les rendus les moins récemment utilisés sont évincés."""
+    cache_dir = tmp_path / "render_cache"
+    for i in range(3):
+        save_table_image(sample_data, f"Ventes {i}", str(tmp_path / f"t{i}.png"),
+                         cache_dir=cache_dir, max_cache_bytes=1)
+    # seul le dernier rendu (page + image) est conservé
+    assert len({entry.name.split(".")[0] for entry in cache_dir.iterdir()}) == 1
+
+
+@pytest.mark.parametrize("ext", ["xlsx", "ods"])
+def test_export_workbook_one_sheet_per_result(sample_data, tmp_path, ext):
+    """Chaque résultat devient une feuille ; les trimestres sont formatés et les colonnes aplaties."""
+    quarterly = pd.DataFrame({"SELLER": ["Alice", "Bob & <Co>"], "QUARTER": [20231, 20242], "TOTAL": [1.5, None]})
+    stats = groupby_aggregate_multi(sample_data, ["SELLER"], {"TOTAL": ["min", "max"]})
+    path = tmp_path / f"resultats.{ext}"
+
+    assert export_workbook(path, {"Q2": quarterly, "Q6": stats}, ["QUARTER"]) == ["Q2", "Q6"]
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ["Q2", "Q6"]
+    assert sheets["Q2"]["SELLER"].tolist() == ["Alice", "Bob & <Co>"]
+    assert sheets["Q2"]["QUARTER"].tolist() == ["2023Q1", "2024Q2"]
+    assert sheets["Q2"]["TOTAL"].iloc[0] == 1.5 and pd.isna(sheets["Q2"]["TOTAL"].iloc[1])
+    assert list(sheets["Q6"].columns) == ["SELLER", "TOTAL min", "TOTAL max"]
+    assert len(sheets["Q6"]) == len(stats)
+
+
+def test_export_workbook_ods_non_finite_values_are_empty_cells(tmp_path):
+    """NaN et ±inf ne sont pas des xsd:double : cellules vides, les autres valeurs sont relues telles quelles."""
+    df = pd.DataFrame({"SELLER": ["Alice", "Bob", "Chloé", "Dan"], "RATIO": [0.5, np.nan, np.inf, -np.inf]})
+    path = tmp_path / "ratios.ods"
+
+    export_workbook(path, {"Q1": df})
+
+    with zipfile.ZipFile(path) as archive:
+        content = archive.read("content.xml").decode("utf-8")
+    assert 'office:value="nan"' not in content and 'office:value="inf"' not in content
+    assert 'office:value="-inf"' not in content
+    read = pd.read_excel(path, sheet_name="Q1")
+    assert read["SELLER"].tolist() == df["SELLER"].tolist()
+    assert read["RATIO"].iloc[0] == 0.5 and read["RATIO"].iloc[1:].isna().all()
+
+
+@pytest.mark.parametrize("ext", ["xlsx", "ods"])
+def test_export_workbook_splits_long_results(tmp_path, ext):
+    """Au-delà de max_rows lignes, un résultat continue sur des feuilles numérotées."""
+    df = pd.DataFrame({"ID": range(25), "VALUE": np.arange(25) * 0.5})
+    path = tmp_path / f"long.{ext}"
+
+    sheets = export_workbook(path, {"Q/2": df}, chunksize=4, max_rows=10)
+
+    assert sheets == ["Q_2", "Q_2 (2)", "Q_2 (3)"]
+    read = pd.read_excel(path, sheet_name=None)
+    assert pd.concat(read.values(), ignore_index=True)["ID"].tolist() == list(range(25))
+
+
+def test_export_workbook_rejects_unknown_format(sample_data, tmp_path):
+    with pytest.raises(ValueError):
+        export_workbook(tmp_path / "r.csv", {"Q1": sample_data})
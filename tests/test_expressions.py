@@ -0,0 +1,94 @@
+"""
+Tests unitaires pour le module data_processing.expressions
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing import expressions
+from src.data_processing.expressions import compile_condition, evaluate_conditions
+from src.data_processing.analyzer import DataAnalyzer
+
+
+# -----------------------------------------------------
+# Fixtures
+# -----------------------------------------------------
+
+@pytest.fixture
+def sales_data():
+    return pd.DataFrame({
+        "SELLER": pd.Categorical(["Alice", "Bob", "Alice", "Bob", "Alice", "Chloé"]),
+        "YEAR": [2023, 2024, 2023, 2025, 2024, 2023],
+        "TOTAL": [1000.0, 4000.0, np.nan, 1500.0, 720.0, 300.0],
+        "UNIT PRICE": [10, 20, 15, 30, 12, 5],
+    })
+
+
+# -----------------------------------------------------
+# Tests unitaires
+# -----------------------------------------------------
+
+@pytest.mark.parametrize("condition", [
+    "YEAR == 2023",
+    "YEAR >= 2024 and TOTAL > 1000",
+    "SELLER == 'Alice' or TOTAL < 500",
+    "not (YEAR == 2023)",
+    "(YEAR == 2023) & ~(SELLER == 'Bob')",
+    "TOTAL != 1000",
+    "2023 < YEAR <= 2025",
+    "SELLER in ['Bob', 'Chloé']",
+    "SELLER not in ('Bob',)",
+    "TOTAL / `UNIT PRICE` > 60",
+    "-TOTAL < -1000",
+    "YEAR == 2023 & `UNIT PRICE` > 5",
+    "YEAR != 2023 & `UNIT PRICE` >= 12",
+    "YEAR == 2023 & TOTAL > 100",
+    "YEAR == 2024 | TOTAL < 500 & SELLER == 'Chloé'",
+    "SELLER == ['Alice', 'Bob']",
+    "SELLER != ['Alice']",
+    "['Bob'] == SELLER",
+])
+def test_mask_matches_query(sales_data, condition):
+    expected = sales_data.eval(condition).to_numpy(dtype=bool)
+    np.testing.assert_array_equal(compile_condition(condition)(sales_data), expected)
+
+def test_compiled_once():
+    assert compile_condition("YEAR == 2023") is compile_condition("YEAR == 2023")
+    assert compile_condition("TOTAL / `UNIT PRICE` > 60").columns == ["TOTAL", "UNIT PRICE"]
+
+def test_unsupported_and_unknown_column(sales_data):
+    with pytest.raises(ValueError):
+        compile_condition("SELLER.str.startswith('A')")
+    with pytest.raises(ValueError):
+        compile_condition("CITY == 'Paris'")(sales_data)
+
+def test_evaluate_conditions(sales_data):
+    conditions = ["YEAR == 2023", "TOTAL > 1000", "SELLER == 'Bob'"]
+    masks = evaluate_conditions(sales_data, conditions)
+    assert [int(mask.sum()) for mask in masks] == [3, 2, 2]
+
+def test_analyzer_count_many_with_fallback(sales_data):
+    analyzer = DataAnalyzer(sales_data)
+    conditions = ["YEAR == 2023", "SELLER.str.startswith('A')", "TOTAL > 1000"]
+    assert analyzer.count_many(conditions) == [3, 3, 2]
+    assert analyzer.count_rows("SELLER.str.startswith('A')") == 3
+    pd.testing.assert_frame_equal(analyzer.filter("TOTAL > 1000"), sales_data.query("TOTAL > 1000"))
+
+@pytest.mark.parametrize("condition", [
+    "YEAR == 2023 & `UNIT PRICE` > 5",
+    "YEAR != 2023 & `UNIT PRICE` >= 12",
+    "YEAR == 2023 & TOTAL > 100",
+    "SELLER == ['Alice', 'Bob']",
+])
+def test_analyzer_matches_query(sales_data, condition):
+    analyzer = DataAnalyzer(sales_data)
+    expected = sales_data.query(condition)
+    assert analyzer.count_rows(condition) == len(expected)
+    pd.testing.assert_frame_equal(analyzer.filter(condition), expected)
+
+def test_analyzer_falls_back_on_evaluation_error(sales_data, monkeypatch):
+    def failing(self, df, engine="pandas", columns=None):
+        raise TypeError("évaluation impossible")
+    monkeypatch.setattr(expressions.CompiledCondition, "__call__", failing)
+    analyzer = DataAnalyzer(sales_data)
+    assert analyzer.count_many(["YEAR == 2023", "TOTAL > 1000"]) == [3, 2]
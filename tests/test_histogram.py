@@ -0,0 +1,91 @@
+"""
+Tests unitaires pour le calcul d'histogrammes (src/data_processing/histogram.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from src.data_processing.histogram import (HistogramAccumulator, histogram_counts, streaming_histogram,
+                                           value_range)
+from src.functions import build_histogram_figure, build_counts_figure
+
+
+# === FIXTURES ===
+@pytest.fixture
+def prices():
+    """Prix unitaires avec quelques valeurs manquantes."""
+    values = np.random.default_rng(0).gamma(2.0, 50.0, 10_007)
+    values[::97] = np.nan
+    return values
+
+def chunked(values, size=1_000):
+    """Fabrique de lots (DataFrame) comme DataLoader.iter_chunks."""
+    return lambda: (pd.DataFrame({"UNIT_PRICE": values[i:i + size]}) for i in range(0, len(values), size))
+
+
+# === CALCUL ===
+def test_histogram_counts_match_numpy(prices):
+    counts, edges = histogram_counts(pd.Series(prices), bins=25)
+    expected, expected_edges = np.histogram(prices[~np.isnan(prices)], bins=25)
+    assert np.array_equal(counts, expected)
+    assert np.allclose(edges, expected_edges)
+
+def test_histogram_counts_honours_bin_edges():
+    counts, edges = histogram_counts([1, 2, 2, 7, 10], bins=[0, 5, 10])
+    assert counts.tolist() == [3, 2]
+    assert edges.tolist() == [0, 5, 10]
+
+def test_streaming_histogram_equals_in_memory(prices):
+    expected = histogram_counts(prices, bins=40)
+    counts, edges = streaming_histogram(chunked(prices), "UNIT_PRICE", bins=40)
+    assert np.array_equal(counts, expected[0])
+    assert np.allclose(edges, expected[1])
+
+def test_value_range(prices):
+    assert value_range(chunked(prices)(), "UNIT_PRICE") == (np.nanmin(prices), np.nanmax(prices))
+    assert value_range(chunked(np.array([np.nan]))(), "UNIT_PRICE") is None
+
+
+# === ACCUMULATEUR ===
+def test_accumulator_counts_out_of_range_and_missing():
+    accumulator = HistogramAccumulator([0, 5, 10]).update([-1, 0, 5, 10, 12, np.nan])
+    assert accumulator.counts.tolist() == [1, 2]
+    assert (accumulator.underflow, accumulator.overflow, accumulator.missing) == (1, 1, 1)
+    assert accumulator.total == 3
+
+def test_accumulator_merge_partitions(prices):
+    full = HistogramAccumulator.from_range(0, 600, 30).update(prices)
+    left = HistogramAccumulator.from_range(0, 600, 30).update(prices[:4000])
+    right = HistogramAccumulator.from_range(0, 600, 30).update(prices[4000:])
+    merged = left.merge(right)
+    assert np.array_equal(merged.counts, full.counts)
+    assert merged.missing == full.missing
+    with pytest.raises(ValueError):
+        left.merge(HistogramAccumulator.from_range(0, 500, 30))
+
+def test_accumulator_rejects_invalid_edges():
+    with pytest.raises(ValueError):
+        HistogramAccumulator([1.0])
+    with pytest.raises(ValueError):
+        HistogramAccumulator([0, 2, 1])
+
+
+# === DESSIN ===
+def test_histogram_figure_uses_bins():
+    df = pd.DataFrame({"TOTAL": np.arange(100.0)})
+    fig = build_histogram_figure(df, "TOTAL", "CA", bins=7)
+    try:
+        assert len(fig.axes[0].patches) == 7
+    finally:
+        plt.close(fig)
+
+def test_counts_figure_from_precomputed_counts():
+    fig = build_counts_figure(np.array([3, 0, 5]), np.array([0.0, 1.0, 2.0, 3.0]), "UNIT_PRICE", "Prix")
+    try:
+        heights = [patch.get_height() for patch in fig.axes[0].patches]
+        assert heights == [3, 0, 5]
+    finally:
+        plt.close(fig)
@@ -0,0 +1,73 @@
+"""
+Tests unitaires pour le module data_processing.index
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.index import PartitionIndex
+from src.data_processing.analyzer import DataAnalyzer
+from src import filter_by_value
+
+
+# -----------------------------------------------------
+# Fixtures
+# -----------------------------------------------------
+
+@pytest.fixture
+def sales_data():
+    return pd.DataFrame({
+        "SELLER": ["Alice", "Bob", "Alice", "Bob", "Alice", "Chloé"],
+        "YEAR": [2023, 2024, 2023, 2025, 2024, 2023],
+        "TOTAL": [1000, 4000, 2250, 1500, 720, 300],
+    })
+
+
+# -----------------------------------------------------
+# Tests unitaires
+# -----------------------------------------------------
+
+def test_filter_matches_mask(sales_data):
+    index = PartitionIndex(sales_data, ["YEAR", "SELLER"])
+    for col in ("YEAR", "SELLER"):
+        for value in sales_data[col].unique():
+            pd.testing.assert_frame_equal(index.filter(col, value), sales_data[sales_data[col] == value])
+            assert index.count(col, value) == (sales_data[col] == value).sum()
+
+
+def test_sorted_partitions_are_slices(sales_data):
+    index = PartitionIndex(sales_data, ["YEAR"], sort_by="YEAR")
+    assert index.df["YEAR"].is_monotonic_increasing
+    assert index.positions("YEAR", 2023) == slice(0, 3)
+    year_2023 = index.filter("YEAR", 2023)
+    assert np.shares_memory(year_2023["TOTAL"].to_numpy(), index.df["TOTAL"].to_numpy())
+
+
+def test_missing_value_and_column(sales_data):
+    index = PartitionIndex(sales_data, ["YEAR"])
+    assert index.filter("YEAR", 1999).empty
+    with pytest.raises(KeyError):
+        index.filter("SELLER", "Bob")
+    with pytest.raises(ValueError):
+        PartitionIndex(sales_data, ["REGION"])
+
+
+def test_filter_by_value_uses_index(sales_data):
+    index = PartitionIndex(sales_data, ["YEAR"])
+    pd.testing.assert_frame_equal(filter_by_value(sales_data, "YEAR", 2024, index=index),
+                                  filter_by_value(sales_data, "YEAR", 2024))
+
+
+def test_analyzer_indexed_conditions(sales_data):
+    analyzer = DataAnalyzer(sales_data, index_cols=["YEAR", "SELLER"])
+    plain = DataAnalyzer(sales_data)
+    for condition in ("YEAR == 2023", "`SELLER` == 'Bob'", "YEAR == 2023 and TOTAL > 500"):
+        pd.testing.assert_frame_equal(analyzer.filter(condition), plain.filter(condition))
+        assert analyzer.count_rows(condition) == plain.count_rows(condition)
+
+@pytest.mark.parametrize("condition", ["SELLER == ['Alice', 'Bob']", "SELLER == ('Chloé',)", "YEAR == [2023]"])
+def test_analyzer_indexed_column_with_list_literal(sales_data, condition):
+    analyzer = DataAnalyzer(sales_data, index_cols=["YEAR", "SELLER"])
+    expected = sales_data.query(condition)
+    assert analyzer.count_rows(condition) == len(expected) > 0
+    pd.testing.assert_frame_equal(analyzer.filter(condition), expected)
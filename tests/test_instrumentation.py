@@ -0,0 +1,68 @@
+"""
+Tests unitaires pour l'instrumentation par étape (src/instrumentation.py)
+"""
+
+import json
+import pandas as pd
+import pytest
+from src.instrumentation import StageTracer, NULL_TRACER
+from src.config import QUESTIONS, YEAR_COL
+from src.planner import run_questions
+from src.data_processing.utils import generate_sales_data
+
+
+# === TESTS ===
+def test_stage_records_nested_measures():
+    tracer = StageTracer()
+    try:
+        with tracer.stage("outer", rows_in=10) as outer:
+            with tracer.stage("inner") as inner:
+                data = bytearray(2_000_000)
+                inner["rows_out"] = len(data)
+            del data
+            outer["rows_out"] = 3
+    finally:
+        tracer.close()
+    inner, outer = tracer.records
+    assert (inner["stage"], inner["parent"], inner["rows_out"]) == ("inner", "outer", 2_000_000)
+    assert (outer["stage"], outer["parent"], outer["rows_in"], outer["rows_out"]) == ("outer", None, 10, 3)
+    assert inner["peak_mb"] >= 2 and outer["peak_mb"] >= inner["peak_mb"]
+    assert outer["wall_s"] >= inner["wall_s"] >= 0
+
+def test_disabled_tracer_records_nothing():
+    with NULL_TRACER.stage("load_data") as stage:
+        stage["rows_out"] = 1
+    NULL_TRACER.record("render", 1.0, 1.0)
+    assert NULL_TRACER.records == []
+
+@pytest.mark.parametrize("ext", ["json", "csv"])
+def test_write_trace(tmp_path, ext):
+    tracer = StageTracer(trace_memory=False)
+    with tracer.stage("load_data") as stage:
+        stage["rows_out"] = 5
+    path = tracer.write(str(tmp_path / f"trace.{ext}"))
+    records = json.load(open(path)) if ext == "json" else pd.read_csv(path).to_dict("records")
+    assert records[0]["stage"] == "load_data" and records[0]["rows_out"] == 5
+
+def test_run_questions_traced():
+    df = generate_sales_data(300, n_sellers=4, years=(2023, 2025))
+    df["QUARTER"] = df["DATE"].dt.to_period("Q")
+    tracer = StageTracer(trace_memory=False)
+    results = run_questions(df, QUESTIONS, YEAR_COL, tracer=tracer)
+    stages = tracer.summary().set_index("stage")
+    for qid in QUESTIONS:
+        assert stages.loc[qid, "rows_out"] == len(results[qid])
+    assert stages.filter(like="groupby", axis=0)["rows_in"].eq(300).all()
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_figures_traced(tmp_path, workers):
+    from src.functions import render_figures
+    df = pd.DataFrame({"SELLER": ["A", "B"], "TOTAL": [1.0, 2.0]})
+    jobs = [{"kind": "table", "name": "T", "df": df, "title": "Table"},
+            {"kind": "histogram", "df": df, "col": "TOTAL", "title": "Histo"}]
+    tracer = StageTracer(trace_memory=False)
+    render_figures(jobs, str(tmp_path / "report.pdf"), workers=workers, tracer=tracer)
+    names = [record["stage"] for record in tracer.records]
+    assert names[:2] == ["render T", "render Histo"]
+    # le rendu ne traite pas de lignes : pas de débit trompeur dans le récapitulatif
+    assert all(record["rows_in"] is None and record["rows_out"] is None for record in tracer.records)
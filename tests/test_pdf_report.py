@@ -0,0 +1,92 @@
+"""
+Tests unitaires pour le rapport PDF reportlab (src/pdf_report.py)
+"""
+
+import re
+import numpy as np
+import pandas as pd
+import pytest
+from src.functions import generate_pdf
+from src.pdf_report import PdfReportWriter, write_report, _nice_ticks
+
+
+def count_pages(path) -> int:
+    return len(re.findall(rb"/Type /Page\b", path.read_bytes()))
+
+
+# === FIXTURES ===
+@pytest.fixture
+def quarterly():
+    """Résultat de 75 lignes (comme Q2 : vendeur × trimestre)."""
+    return pd.DataFrame({
+        "SELLER": [f"Vendeur {i // 15}" for i in range(75)],
+        "QUARTER": [20221 + (i % 15) // 4 * 10 + (i % 4) for i in range(75)],
+        "TOTAL": np.linspace(10.0, 500.0, 75),
+    })
+
+
+# === TABLEAUX ===
+def test_table_is_paginated_not_truncated(quarterly, tmp_path):
+    path = tmp_path / "report.pdf"
+    with PdfReportWriter(str(path)) as report:
+        assert report.add_table(quarterly, "CA moyen", quarter_cols=["QUARTER"], rows_per_page=30) == 3
+        assert report.add_table(quarterly.head(5), "Court") == 1
+    assert report.pages == 4
+    assert count_pages(path) == 4
+
+def test_table_rows_per_page_follow_page_height(quarterly, tmp_path):
+    path = tmp_path / "report.pdf"
+    long = pd.concat([quarterly] * 8, ignore_index=True)
+    with PdfReportWriter(str(path)) as report:
+        pages = report.add_table(long, "600 lignes")
+    assert 1 < pages < len(long)
+    assert count_pages(path) == pages
+
+def test_wide_table_font_is_reduced_to_fit(tmp_path):
+    wide = pd.DataFrame(np.random.default_rng(0).random((10, 40)) * 1e6)
+    with PdfReportWriter(str(tmp_path / "wide.pdf")) as report:
+        narrow_size = report._table_font_size(wide.iloc[:, :3], None)
+        wide_size = report._table_font_size(wide, None)
+        report.add_table(wide, "40 colonnes")
+    assert narrow_size == report.font_size
+    assert 5.0 <= wide_size < report.font_size
+
+def test_multiindex_columns_are_flattened(tmp_path):
+    columns = pd.MultiIndex.from_tuples([("SELLER", ""), ("TOTAL", "min"), ("TOTAL", "max")])
+    df = pd.DataFrame([["Alice", 1.0, 5.0]], columns=columns)
+    with PdfReportWriter(str(tmp_path / "q6.pdf")) as report:
+        assert report.add_table(df, "Min, Max") == 1
+
+
+# === HISTOGRAMMES ===
+def test_histogram_pages(quarterly, tmp_path):
+    path = tmp_path / "histo.pdf"
+    with PdfReportWriter(str(path)) as report:
+        report.add_histogram(quarterly, "TOTAL", "CA", bins=20)
+        report.add_histogram(quarterly, "TOTAL", "CA", bins=[0, 100, 250, 600])
+        report.add_histogram(quarterly.iloc[:0], "TOTAL", "Vide")
+    assert count_pages(path) == 3
+
+def test_nice_ticks():
+    assert _nice_ticks(11.0) == [0, 5, 10]
+    assert _nice_ticks(4.4) == [0, 1, 2, 3, 4]
+    assert _nice_ticks(55.0) == [0, 20, 40]
+
+
+# === RAPPORT COMPLET ===
+def test_write_report_from_render_jobs(quarterly, tmp_path):
+    jobs = [{"kind": "table", "name": "Q2", "df": quarterly, "title": "CA", "quarter_cols": ["QUARTER"]},
+            {"kind": "histogram", "name": "Q4", "df": quarterly, "col": "TOTAL", "title": "Dispersion"}]
+    path = tmp_path / "rapport.pdf"
+    pages = write_report(str(path), jobs)
+    assert pages == count_pages(path) >= 3
+
+def test_generate_pdf_engines(quarterly, tmp_path):
+    generate_pdf(str(tmp_path / "mpl.pdf"), [(quarterly, "CA")], [(quarterly, "TOTAL", "Histo")])
+    generate_pdf(str(tmp_path / "rl.pdf"), [(quarterly, "CA")], [(quarterly, "TOTAL", "Histo")],
+                 engine="reportlab")
+    # matplotlib : tableau tronqué à 30 lignes sur une page ; reportlab : toutes les lignes
+    assert count_pages(tmp_path / "mpl.pdf") == 2
+    assert count_pages(tmp_path / "rl.pdf") > 2
+    with pytest.raises(ValueError):
+        generate_pdf(str(tmp_path / "x.pdf"), [], [], engine="inconnu")
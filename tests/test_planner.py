@@ -0,0 +1,59 @@
+"""
+Tests unitaires pour le planificateur de requêtes (src/planner.py)
+"""
+
+import pandas as pd
+import pytest
+from src import groupby_aggregate, groupby_aggregate_multi, filter_by_value, groupby_size
+from src.config import QUESTIONS, SELLER_COL, YEAR_COL, QUARTER_COL
+from src.planner import build_plan, run_questions
+
+
+# === FIXTURES ===
+@pytest.fixture
+def sales_data():
+    """DataFrame de ventes couvrant plusieurs vendeurs et les années des questions."""
+    dates = pd.to_datetime([
+        "2023-01-10", "2023-04-12", "2024-02-20", "2024-05-15", "2023-03-08",
+        "2025-01-05", "2025-07-19", "2023-11-30", "2025-02-14", "2024-09-01",
+    ])
+    df = pd.DataFrame({
+        "SELLER": ["Alice", "Bob", "Alice", "Bob", "Alice", "Chloé", "Bob", "Chloé", "Alice", "Chloé"],
+        "DATE": dates,
+        "QUANTITY": [10, 20, 15, 5, 8, 3, 7, 12, 9, 4],
+        "UNIT_PRICE": [100.0, 200.0, 150.0, 300.0, 90.0, 50.0, 80.0, 60.0, 110.0, 70.0],
+    })
+    df["TOTAL"] = df["QUANTITY"] * df["UNIT_PRICE"]
+    df[YEAR_COL] = df["DATE"].dt.year
+    df[QUARTER_COL] = df["DATE"].dt.to_period("Q")
+    return df
+
+
+def reference_answer(df, question):
+    """Réponse calculée question par question avec les fonctions de functions.py."""
+    if "year" in question:
+        df = filter_by_value(df, YEAR_COL, question["year"])
+    if "agg_dict" in question:
+        return groupby_aggregate_multi(df, question["group_cols"], question["agg_dict"])
+    if "count_name" in question:
+        return groupby_size(df, question["group_cols"], question["count_name"])
+    result = groupby_aggregate(df, question["group_cols"], question["agg_col"], question["agg_func"])
+    if question.get("sort") == "desc":
+        result = result.sort_values(by=question["agg_col"], ascending=False)
+    return result
+
+
+# === TESTS ===
+def test_plan_shares_groupbys():
+    plan = build_plan(QUESTIONS, YEAR_COL)
+    assert set(plan) == {(SELLER_COL, YEAR_COL), (SELLER_COL, QUARTER_COL), (SELLER_COL,)}
+    assert plan[(SELLER_COL, YEAR_COL)]["questions"] == ["Q1", "Q4", "Q5", "Q7", "Q8"]
+
+
+@pytest.mark.parametrize("qid", list(QUESTIONS))
+def test_run_questions_matches_reference(sales_data, qid):
+    results = run_questions(sales_data, QUESTIONS, YEAR_COL)
+    expected = reference_answer(sales_data, QUESTIONS[qid])
+    pd.testing.assert_frame_equal(
+        results[qid].reset_index(drop=True), expected.reset_index(drop=True)
+    )
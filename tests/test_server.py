@@ -0,0 +1,109 @@
+"""
+Tests unitaires pour le service d'analyse résident (src/server.py)
+"""
+
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import pandas as pd
+import pytest
+from src.config import QUESTIONS, YEAR_COL
+from src.data_processing.utils import write_sales_data
+from src import server as server_module
+from src.server import AnalysisService, create_server
+
+
+# === FIXTURES ===
+@pytest.fixture
+def sales_file(tmp_path):
+    return write_sales_data(str(tmp_path / "sales.csv"), 400, n_sellers=5, years=(2023, 2025))
+
+@pytest.fixture
+def server(sales_file):
+    service = AnalysisService(sales_file)
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def request(server, path, body=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+        payload = response.read()
+        return json.loads(payload) if response.headers["Content-Type"].startswith("application/json") else payload
+
+
+# === TESTS ===
+def test_questions_and_queries(server):
+    service = server.service
+    assert set(request(server, "/questions")) == set(QUESTIONS)
+    q1 = request(server, "/questions/Q1")
+    assert q1["columns"] == ["SELLER", "YEAR", "TOTAL"]
+    assert len(q1["data"]) == len(service.answer("Q1"))
+    assert request(server, "/questions/Q6")["columns"] == ["SELLER", "TOTAL min", "TOTAL max", "TOTAL mean"]
+
+    assert request(server, "/count?condition=YEAR%20%3D%3D%202024")["count"] == int((service.df[YEAR_COL] == 2024).sum())
+    filtered = request(server, "/filter?condition=TOTAL%20%3E%20500&limit=3")
+    assert filtered["count"] == int((service.df["TOTAL"] > 500).sum()) and len(filtered["data"]) <= 3
+
+    adhoc = request(server, "/query", {"group_cols": ["YEAR"], "agg_col": "QUANTITY", "agg_func": "sum"})
+    assert sum(row[1] for row in adhoc["data"]) == service.df["QUANTITY"].sum()
+    assert request(server, "/render/Q8.png")[:8] == b"\x89PNG\r\n\x1a\n"
+
+def test_errors(server):
+    for path in ("/questions/Q99", "/unknown"):
+        with pytest.raises(urllib.error.HTTPError) as error:
+            request(server, path)
+        assert error.value.code == 404
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/count?condition=UNKNOWN%20%3E%201")
+    assert error.value.code == 400
+
+def test_hot_reload(server, sales_file):
+    before = request(server, "/health")
+    df = pd.read_csv(sales_file)
+    pd.concat([df, df]).to_csv(sales_file, index=False)
+    os.utime(sales_file, ns=(os.stat(sales_file).st_atime_ns, os.stat(sales_file).st_mtime_ns + 10**9))
+    after = request(server, "/health")
+    assert after["rows"] == 2 * before["rows"]
+    assert after["version"] == before["version"] + 1
+
+def test_results_computed_before_reload_are_not_kept(sales_file, monkeypatch):
+    service = AnalysisService(sales_file)
+    run_questions = server_module.planner.run_questions
+
+    def reload_during_computation(df, questions, year_col):
+        results = run_questions(df, questions, year_col)
+        # le fichier change et est rechargé pendant le calcul des réponses de l'ancienne version
+        pd.concat([df, df]).to_csv(sales_file, index=False)
+        monkeypatch.setattr(server_module.planner, "run_questions", run_questions)
+        service.reload()
+        return results
+
+    monkeypatch.setattr(server_module.planner, "run_questions", reload_during_computation)
+    stale = service.answer("Q8")
+    fresh = service.answer("Q8")
+    assert fresh["TRANSACTIONS"].sum() == 2 * stale["TRANSACTIONS"].sum()
+
+def test_failed_reload_keeps_previous_data(server, sales_file, monkeypatch):
+    before = request(server, "/health")
+    with open(sales_file, "a", encoding="utf-8") as f:
+        f.write("ligne en cours d'écriture\n")
+    def busy(self):
+        raise OSError("fichier occupé")
+    monkeypatch.setattr(server_module.DataLoader, "load_data", busy)
+    after = request(server, "/health")
+    assert after["rows"] == before["rows"] and after["version"] == before["version"]
+    assert "OSError" in after["reload_error"]
+
+def test_unexpected_error_returns_500(server, monkeypatch):
+    monkeypatch.setattr(AnalysisService, "answer", lambda self, qid: 1 / 0)
+    with pytest.raises(urllib.error.HTTPError) as error:
+        request(server, "/questions/Q1")
+    assert error.value.code == 500
+    assert "ZeroDivisionError" in json.loads(error.value.read())["error"]
@@ -0,0 +1,71 @@
+"""
+Tests unitaires pour le module data_processing.sketch
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_processing.sketch import (
+    KLLSketch,
+    parse_quantile_func,
+    groupby_sketches,
+    merge_group_sketches,
+)
+from src import groupby_aggregate
+
+
+# -----------------------------------------------------
+# Tests unitaires
+# -----------------------------------------------------
+
+def test_exact_below_capacity():
+    values = np.array([5.0, 1.0, 4.0, 2.0, np.nan])
+    sketch = KLLSketch(k=200).update(values)
+    assert sketch.n == 4
+    assert sketch.median() == pd.Series(values).median()
+
+
+@pytest.mark.parametrize("q", [0.1, 0.5, 0.9])
+def test_rank_error_chunked_and_merged(q):
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(3, 1, 200_000)
+
+    # deux partitions construites par chunks, puis fusionnées
+    left, right = KLLSketch.from_error(0.01), KLLSketch.from_error(0.01, seed=1)
+    for chunk in np.array_split(values[:120_000], 12):
+        left.update(chunk)
+    for chunk in np.array_split(values[120_000:], 8):
+        right.update(chunk)
+    sketch = left.merge(right)
+
+    assert sketch.n == values.size
+    assert sum(level.size for level in sketch.levels) < 3 * sketch.k
+    rank = np.mean(values <= sketch.quantile(q))
+    assert abs(rank - q) <= 2 * sketch.error
+
+
+def test_parse_quantile_func():
+    assert parse_quantile_func("approx_median") == 0.5
+    assert parse_quantile_func("approx_quantile:0.9") == 0.9
+    assert parse_quantile_func("median") is None
+    with pytest.raises(ValueError):
+        parse_quantile_func("approx_quantile:2")
+
+
+def test_groupby_aggregate_approx_median():
+    df = pd.DataFrame({
+        "SELLER": ["Alice", "Bob", "Alice", "Bob", "Alice"],
+        "TOTAL": [1000, 4000, 2250, 1500, 720],
+    })
+    approx = groupby_aggregate(df, ["SELLER"], "TOTAL", "approx_median")
+    exact = groupby_aggregate(df, ["SELLER"], "TOTAL", "median")
+    pd.testing.assert_frame_equal(approx, exact, check_dtype=False)
+
+
+def test_merge_group_sketches():
+    first = pd.DataFrame({"SELLER": ["Alice", "Bob"], "TOTAL": [1.0, 2.0]})
+    second = pd.DataFrame({"SELLER": ["Alice", "Chloé"], "TOTAL": [3.0, 4.0]})
+    merged = merge_group_sketches(groupby_sketches(first, ["SELLER"], "TOTAL"),
+                                  groupby_sketches(second, ["SELLER"], "TOTAL"))
+    assert list(merged.index) == ["Alice", "Bob", "Chloé"]
+    assert merged["Alice"].median() == 2.0
@@ -0,0 +1,65 @@
+"""
+Tests unitaires pour le module data_processing.sql_backend
+"""
+
+import pandas as pd
+import pytest
+from src.config import QUESTIONS, DATE_COL, YEAR_COL, QUARTER_COL, LOAD_PROFILE, INDEXED_COLS
+from src.data_processing.sql_backend import SQLBackend
+from src.data_processing.utils import generate_sales_data, apply_load_profile
+from src.functions import add_date_parts
+from src.planner import execute_step, run_questions
+
+
+# -----------------------------------------------------
+# Fixtures
+# -----------------------------------------------------
+
+@pytest.fixture
+def raw_sales():
+    # moins de ~165 ventes par groupe : les médianes approchées du chemin pandas sont exactes
+    return generate_sales_data(600, n_sellers=6, years=(2022, 2025), seed=3)
+
+def prepare(df, quarter_as_int, categories=True):
+    df = apply_load_profile(df.reset_index(drop=True), LOAD_PROFILE, categories=categories)
+    return add_date_parts(df, DATE_COL, YEAR_COL, QUARTER_COL, quarter_as_int)
+
+def ingest(raw_sales, quarter_as_int, source=None):
+    backend = SQLBackend(":memory:", engine="sqlite")
+    chunks = (prepare(raw_sales.iloc[i:i + 170], quarter_as_int, categories=False)
+              for i in range(0, len(raw_sales), 170))
+    backend.ingest(chunks, index_cols=INDEXED_COLS, categories=LOAD_PROFILE["categories"], source=source)
+    return backend
+
+
+# -----------------------------------------------------
+# Tests unitaires
+# -----------------------------------------------------
+
+@pytest.mark.parametrize("quarter_as_int", [True, False])
+def test_questions_identical_to_pandas(raw_sales, quarter_as_int):
+    expected = run_questions(prepare(raw_sales, quarter_as_int), QUESTIONS, YEAR_COL)
+    with ingest(raw_sales, quarter_as_int) as backend:
+        assert backend.rows == len(raw_sales)
+        results = run_questions(None, QUESTIONS, YEAR_COL, backend=backend)
+    for qid in QUESTIONS:
+        pd.testing.assert_frame_equal(results[qid], expected[qid])
+
+def test_execute_step_all_functions(raw_sales):
+    aggs = [("TOTAL", func) for func in ("sum", "mean", "min", "max", "count", "std", "var", "median")]
+    aggs += [("QUANTITY", "sum"), ("QUANTITY", "max"), (None, "size")]
+    expected = execute_step(prepare(raw_sales, True), ("SELLER", "YEAR"), aggs)
+    with ingest(raw_sales, True) as backend:
+        pd.testing.assert_frame_equal(backend.execute_step(("SELLER", "YEAR"), aggs), expected)
+
+def test_unsupported_function(raw_sales):
+    with ingest(raw_sales, True) as backend, pytest.raises(ValueError):
+        backend.execute_step(("SELLER",), [("TOTAL", "nunique")])
+
+def test_persistent_database(raw_sales, tmp_path):
+    path = str(tmp_path / "sales.db")
+    with SQLBackend(path, engine="sqlite") as backend:
+        backend.ingest([prepare(raw_sales, True, categories=False)], source="v1")
+    with SQLBackend(path, engine="sqlite") as backend:
+        assert backend.is_current("v1") and not backend.is_current("v2")
+        assert backend.rows == len(raw_sales)
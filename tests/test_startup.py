@@ -0,0 +1,78 @@
+"""
+Tests du démarrage de src/main.py (et src/server.py) : matplotlib n'est chargé qu'au premier rendu,
+et le temps d'import reste sous un budget (SALES_STARTUP_BUDGET secondes, 3 par défaut).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pandas as pd
+import pytest
+from src.functions import export_table
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+STARTUP_BUDGET = float(os.environ.get("SALES_STARTUP_BUDGET", "3.0"))
+
+
+def run_in_src(code: str) -> dict:
+    """Exécute code dans un interpréteur neuf lancé depuis src/ (comme python main.py) ; renvoie son JSON."""
+    completed = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True,
+                               text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# === DÉMARRAGE ===
+def test_main_import_is_fast_and_skips_matplotlib():
+    info = run_in_src(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps({'elapsed': elapsed, 'matplotlib': 'matplotlib' in sys.modules}))\n"
+    )
+    assert not info["matplotlib"]
+    assert info["elapsed"] < STARTUP_BUDGET, f"import de main.py : {info['elapsed']:.2f} s"
+
+def test_server_import_skips_matplotlib():
+    info = run_in_src("import json, sys\nimport server\nprint(json.dumps({'matplotlib': 'matplotlib' in sys.modules}))\n")
+    assert not info["matplotlib"]
+
+def test_export_path_does_not_load_matplotlib(tmp_path):
+    info = run_in_src(
+        "import json, sys\n"
+        "import pandas as pd\n"
+        "import functions as fn\n"
+        "df = pd.DataFrame({'SELLER': ['Alice'], 'QUARTER': [20231], 'TOTAL': [10.0]})\n"
+        f"fn.export_table(df, {str(tmp_path / 'q.csv')!r}, ['QUARTER'])\n"
+        f"fn.export_table(df, {str(tmp_path / 'q.json')!r}, ['QUARTER'])\n"
+        "print(json.dumps({'matplotlib': 'matplotlib' in sys.modules}))\n"
+    )
+    assert not info["matplotlib"]
+    assert (tmp_path / "q.csv").exists() and (tmp_path / "q.json").exists()
+
+def test_main_rejects_watch_with_no_render():
+    completed = subprocess.run([sys.executable, "main.py", "--watch", "--no-render"], cwd=SRC_DIR,
+                               capture_output=True, text=True)
+    assert completed.returncode == 2
+    assert "--watch" in completed.stderr
+
+
+# === EXPORT BRUT ===
+def test_export_table_formats_quarters_and_flattens_columns(tmp_path):
+    # colonnes d'un résultat agg_dict (Q6) : clés sur un niveau, statistiques sur deux
+    columns = pd.MultiIndex.from_tuples([("SELLER", ""), ("QUARTER", ""), ("TOTAL", "min"), ("TOTAL", "max")])
+    df = pd.DataFrame([["Alice", 20231, 1.0, 5.0], ["Bob", 20242, 2.0, 6.0]], columns=columns)
+
+    export_table(df, tmp_path / "r.csv", ["QUARTER"])
+    export_table(df, tmp_path / "r.json", ["QUARTER"])
+
+    csv = pd.read_csv(tmp_path / "r.csv")
+    assert list(csv.columns) == ["SELLER", "QUARTER", "TOTAL min", "TOTAL max"]
+    assert list(csv["QUARTER"]) == ["2023Q1", "2024Q2"]
+    records = json.loads((tmp_path / "r.json").read_text(encoding="utf-8"))
+    assert records[1] == {"SELLER": "Bob", "QUARTER": "2024Q2", "TOTAL min": 2.0, "TOTAL max": 6.0}
+
+def test_export_table_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_table(pd.DataFrame({"A": [1]}), tmp_path / "r.xml")
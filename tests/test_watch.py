@@ -0,0 +1,143 @@
+"""
+Tests unitaires pour le mode surveillance (src/watch.py) et le dossier de pages de render_figures
+"""
+
+import os
+import re
+import pandas as pd
+import pytest
+import matplotlib
+matplotlib.use("Agg")
+from src import functions as fn
+from src.config import QUESTIONS, YEAR_COL, QUARTER_COL
+from src import watch
+from src.watch import (partition_fingerprints, question_fingerprint, changed_partitions,
+                       affected_questions, load_state, save_state, save_results, load_results,
+                       watch_file, watch_loop)
+
+
+# === FIXTURES ===
+@pytest.fixture
+def sales_data():
+    """Ventes réparties sur plusieurs années et trimestres."""
+    dates = pd.to_datetime(["2023-01-10", "2023-04-12", "2024-02-20", "2025-01-05", "2025-07-19"])
+    df = pd.DataFrame({
+        "SELLER": ["Alice", "Bob", "Alice", "Chloé", "Bob"],
+        "DATE": dates,
+        "TOTAL": [100.0, 200.0, 150.0, 50.0, 80.0],
+    })
+    df[YEAR_COL] = df["DATE"].dt.year
+    df[QUARTER_COL] = fn.quarter_key(df["DATE"])
+    return df
+
+
+# === EMPREINTES ===
+def test_partition_fingerprints_one_entry_per_partition(sales_data):
+    fingerprints = partition_fingerprints(sales_data, YEAR_COL, QUARTER_COL)
+    assert sorted(fingerprints) == ["2023|20231", "2023|20232", "2024|20241", "2025|20251", "2025|20253"]
+
+def test_partition_fingerprints_ignore_row_order(sales_data):
+    shuffled = sales_data.iloc[::-1].reset_index(drop=True)
+    assert partition_fingerprints(shuffled, YEAR_COL, QUARTER_COL) == \
+        partition_fingerprints(sales_data, YEAR_COL, QUARTER_COL)
+
+def test_changed_partitions_detects_modified_and_added_rows(sales_data):
+    before = partition_fingerprints(sales_data, YEAR_COL, QUARTER_COL)
+    updated = sales_data.copy()
+    updated.loc[3, "TOTAL"] = 999.0
+    extra = sales_data.iloc[[0]].assign(DATE=pd.Timestamp("2024-11-02"), YEAR=2024, QUARTER=20244)
+    updated = pd.concat([updated, extra], ignore_index=True)
+    after = partition_fingerprints(updated, YEAR_COL, QUARTER_COL)
+    assert changed_partitions(before, after) == {"2025|20251", "2024|20244"}
+    assert changed_partitions(after, before) == {"2025|20251", "2024|20244"}
+    assert changed_partitions(before, before) == set()
+
+
+# === DÉPENDANCES DES QUESTIONS ===
+def test_affected_questions_follow_year_filters():
+    known = {qid: question_fingerprint(q) for qid, q in QUESTIONS.items()}
+    unfiltered = [qid for qid, q in QUESTIONS.items() if "year" not in q]
+
+    assert affected_questions(QUESTIONS, set(), known) == []
+    assert affected_questions(QUESTIONS, {"2024|20242"}, known) == unfiltered
+    assert "Q5" in affected_questions(QUESTIONS, {"2025|20253"}, known)
+    assert not {"Q4", "Q7"} & set(affected_questions(QUESTIONS, {"2025|20253"}, known))
+    assert {"Q4", "Q7"} <= set(affected_questions(QUESTIONS, {"2023|20231"}, known))
+
+def test_affected_questions_include_changed_definitions():
+    known = {qid: question_fingerprint(q) for qid, q in QUESTIONS.items()}
+    known["Q4"] = "ancienne définition"
+    assert affected_questions(QUESTIONS, set(), known) == ["Q4"]
+    assert affected_questions(QUESTIONS, set(), {}) == list(QUESTIONS)
+
+
+# === ÉTAT ET SURVEILLANCE ===
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "watch" / "state.json")
+    assert load_state(path) == {}
+    save_state(path, {"2023|20231": "abc-2"}, QUESTIONS)
+    state = load_state(path)
+    assert state["partitions"] == {"2023|20231": "abc-2"}
+    assert state["questions"]["Q1"] == question_fingerprint(QUESTIONS["Q1"])
+
+def test_results_round_trip_for_reportlab_rebuild(tmp_path, sales_data):
+    result_dir = str(tmp_path / "results")
+    pivot = sales_data.pivot_table(index="SELLER", columns=YEAR_COL, values=["TOTAL"], aggfunc="sum")
+    save_results(result_dir, {"Q1": sales_data, "Q6": pivot})
+    (tmp_path / "results" / "Q2.pickle").write_bytes((tmp_path / "results" / "Q1.pickle").read_bytes()[:50])
+    loaded = load_results(result_dir, ["Q1", "Q2", "Q3", "Q6"])
+    assert list(loaded) == ["Q1", "Q6"]
+    pd.testing.assert_frame_equal(loaded["Q1"], sales_data)
+    pd.testing.assert_frame_equal(loaded["Q6"], pivot)
+
+def test_watch_file_yields_on_change(tmp_path):
+    path = tmp_path / "ventes.csv"
+    path.write_text("a\n1\n")
+    events = watch_file(str(path), interval=0.01, max_events=2)
+    first = next(events)
+    path.write_text("a\n1\n2\n")
+    assert next(events) != first
+    assert list(events) == []
+
+def test_watch_file_survives_missing_file(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "ventes.csv"  # remplacé pendant un enregistrement : momentanément absent
+    monkeypatch.setattr(watch.time, "sleep", lambda seconds: path.write_text("a\n1\n"))
+    assert len(list(watch_file(str(path), interval=0.01, max_events=1))) == 1
+    assert "FileNotFoundError" in capsys.readouterr().out
+
+def test_watch_loop_continues_after_failed_pass(tmp_path, capsys):
+    path = tmp_path / "ventes.csv"
+    path.write_text("a\n1\n")
+    calls = []
+
+    def on_change():
+        calls.append(len(calls))
+        path.write_text("a\n" + "1\n" * (len(calls) + 1))  # modification suivante du fichier
+        if len(calls) == 1:
+            raise OSError("classeur à moitié écrit")
+
+    assert watch_loop(str(path), on_change, interval=0.01, max_events=3) == 1
+    assert len(calls) == 3
+    assert "classeur à moitié écrit" in capsys.readouterr().out
+
+
+# === PAGES DU PDF ===
+def test_render_figures_reuses_cached_pages(tmp_path, sales_data):
+    page_dir = tmp_path / "pages"
+    jobs = [{"kind": "table", "name": "T", "df": sales_data, "title": "Table",
+             "outputs": [str(tmp_path / "T.png")]},
+            {"kind": "histogram", "name": "H", "df": sales_data, "col": "TOTAL", "title": "Histo",
+             "outputs": [str(tmp_path / "H.png")]}]
+    fn.render_figures(jobs, str(tmp_path / "full.pdf"), workers=1, page_dir=page_dir)
+    assert sorted(os.listdir(page_dir)) == ["H.pickle", "T.pickle"]
+
+    os.remove(tmp_path / "T.png")
+    partial = [{"name": "T", "title": "Table", "reuse": True}, jobs[1]]
+    fn.render_figures(partial, str(tmp_path / "partial.pdf"), workers=1, page_dir=page_dir)
+    assert not (tmp_path / "T.png").exists()
+    pages = lambda path: len(re.findall(rb"/Type /Page\b", path.read_bytes()))
+    assert pages(tmp_path / "partial.pdf") == pages(tmp_path / "full.pdf") == 2
+
+def test_render_figures_reuse_requires_page_dir(tmp_path):
+    with pytest.raises(ValueError):
+        fn.render_figures([{"name": "T", "title": "Table", "reuse": True}], None)